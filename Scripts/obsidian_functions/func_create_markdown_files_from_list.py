@@ -1,6 +1,6 @@
 import os
 import re
-import frontmatter
+from shared_functions.frontmatter_codec import compose_frontmatter
 
 def create_markdown_files_from_list(
     item_list: list[str],
@@ -31,17 +31,10 @@ def create_markdown_files_from_list(
         # 2. Generate the title for the frontmatter
         title_with_spaces = item.replace('_', ' ').title()
         
-        # 3. Create a frontmatter post and write it to the file
+        # 3. Write an empty note with the title in its frontmatter
         try:
-            # Create an empty post object
-            post = frontmatter.Post(content="")
-            
-            # Add the title to the post's metadata
-            post.metadata['title'] = title_with_spaces
-
-            # Write the post to the file, which includes the YAML frontmatter
             with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(frontmatter.dumps(post))
+                f.write(compose_frontmatter({'title': title_with_spaces}, "", default_flow_style=False, allow_unicode=True))
                 
             print(f"Successfully created file: {file_path}")
             print(f"  Frontmatter title added: '{title_with_spaces}'")
@@ -1,6 +1,7 @@
 import pandas as pd
 import os
 import re
+from shared_functions.frontmatter_codec import compose_frontmatter
 
 def df_to_md_files(
     df: pd.DataFrame,
@@ -36,29 +37,29 @@ def df_to_md_files(
         
         file_path = os.path.join(output_dir, f"{cleaned_name}.md")
 
-        # --- 2. Prepare Markdown content ---
-        markdown_content = "---\n"
+        # --- 2. Prepare the frontmatter ---
+        frontmatter = {}
         for col_name in frontmatter_cols:
-            if col_name in row and pd.notna(row[col_name]):
-                value = row[col_name]
+            if col_name not in row:
+                continue
+            value = row[col_name]
+            # Lists first: pd.notna of a list is an array, which has no truth value.
+            if isinstance(value, list):
+                frontmatter[col_name] = [link_format.format(value=item) for item in value]
+            elif pd.notna(value):
                 if isinstance(value, str):
-                    formatted_value = link_format.format(value=value)
-                    # Wrap the formatted value in quotes for correct YAML parsing
-                    markdown_content += f"{col_name}: \n - \"{formatted_value}\"\n"
-                elif isinstance(value, list):
-                    markdown_content += f"{col_name}:\n"
-                    for item in value:
-                        formatted_item = link_format.format(value=item)
-                        # Wrap each list item in quotes
-                        markdown_content += f" - \"{formatted_item}\"\n"
+                    frontmatter[col_name] = [link_format.format(value=value)]
+                elif hasattr(value, "item"):
+                    # NumPy scalars from the DataFrame become plain Python values
+                    frontmatter[col_name] = value.item()
                 else:
-                    markdown_content += f"{col_name}: {value}\n"
-        markdown_content += "---\n\n"
+                    frontmatter[col_name] = value if isinstance(value, (int, float, bool)) else str(value)
 
         # --- 3. Add title and main content ---
-        markdown_content += title_template.format(filename=base_name)
+        body = "\n" + title_template.format(filename=base_name)
         if main_content_col and main_content_col in row and pd.notna(row[main_content_col]):
-            markdown_content += str(row[main_content_col])
+            body += str(row[main_content_col])
+        markdown_content = compose_frontmatter(frontmatter, body, default_flow_style=False, allow_unicode=True)
 
         # --- 4. Write to file ---
         try:
@@ -1,6 +1,6 @@
 import os
 import re
-import frontmatter
+from shared_functions.frontmatter_codec import parse_frontmatter, compose_frontmatter
 
 def normalize_rename_update_aliases(directory_path: str):
     """
@@ -32,21 +32,21 @@ def normalize_rename_update_aliases(directory_path: str):
                 try:
                     # Read the file and update its frontmatter
                     with open(old_path, 'r', encoding='utf-8') as f:
-                        post = frontmatter.load(f)
+                        metadata, body = parse_frontmatter(f.read())
 
                     # Ensure the aliases key exists and is a list
-                    aliases = post.metadata.get('aliases', [])
+                    aliases = metadata.get('aliases', [])
                     if not isinstance(aliases, list):
                         aliases = [str(aliases)]  # Convert to a list if it's a single string
                     
                     # Add the original filename if it's not already in the list
                     if name_without_ext not in aliases:
                         aliases.append(name_without_ext)
-                        post.metadata['aliases'] = aliases
+                        metadata['aliases'] = aliases
                         
                         # Write the changes back to the original file
                         with open(old_path, 'w', encoding='utf-8') as f:
-                            f.write(frontmatter.dumps(post))
+                            f.write(compose_frontmatter(metadata, body, default_flow_style=False, allow_unicode=True))
                         print(f"  Updated frontmatter for: '{filename}'")
                         updated_count += 1
                         
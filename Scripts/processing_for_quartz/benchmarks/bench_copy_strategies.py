@@ -0,0 +1,95 @@
+"""
+Benchmarks the copy strategies of main() step 4 against the original copy-everything behaviour.
+
+Each strategy stages a synthetic vault into an empty destination (cold run) and
+then again over its own output (warm run). Every staged page is read back and
+rewritten with write_text_if_changed, standing in for the rendering stage. Source
+files are hashed on both runs, as the pipeline does.
+
+Usage (from the Scripts directory):
+    python -m processing_for_quartz.benchmarks.bench_copy_strategies --pages 5000 --output copy.json
+"""
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from ..copy_strategies import COPY_STRATEGIES, stage_source_file
+from ..markdown.read_write_clean_md import write_text_if_changed
+from ..build_manifest import hash_file
+
+def make_source_vault(source_dir: str, page_count: int, page_size: int):
+    """Writes 'page_count' Markdown files of roughly 'page_size' bytes, spread over a few folders."""
+    paragraph = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4 + "\n\n"
+    body = paragraph * max(1, page_size // len(paragraph))
+    for i in range(page_count):
+        folder = os.path.join(source_dir, f"folder_{i % 10}")
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"page_{i}.md"), "w", encoding="utf-8") as f:
+            f.write(f"---\ntitle: page_{i}\n---\n\n{body}")
+
+def run_stage(source_dir: str, dest_dir: str, strategy: str, source_hashes: dict) -> dict:
+    """
+    Stages every source file with 'strategy', then reads and rewrites it as the
+    rendering stage would. 'source_hashes' stands in for the build manifest: it
+    holds the source hashes of the previous pass and is updated with this one's.
+    """
+    written = 0
+    start = time.perf_counter()
+    for root, _, files in os.walk(source_dir):
+        for file_name in files:
+            source_path = os.path.join(root, file_name)
+            dest_path = os.path.join(dest_dir, os.path.relpath(source_path, source_dir))
+            source_hash = hash_file(source_path)
+            read_path = stage_source_file(source_path, dest_path, strategy,
+                                          source_hash, source_hashes.get(source_path))
+            source_hashes[source_path] = source_hash
+            with open(read_path, "r", encoding="utf-8") as f:
+                content = f.read()
+            if not content.endswith("<!-- rendered -->\n"):
+                content += "\n<!-- rendered -->\n"
+            if write_text_if_changed(dest_path, content):
+                written += 1
+    return {"seconds": round(time.perf_counter() - start, 4), "written": written}
+
+def benchmark_copy_strategies(page_count: int, page_size: int, work_dir: str = None) -> list[dict]:
+    """Runs a cold and a warm pass of every copy strategy and returns one result per strategy."""
+    results = []
+    base_dir = tempfile.mkdtemp(prefix="bench_copy_", dir=work_dir)
+    try:
+        source_dir = os.path.join(base_dir, "source")
+        make_source_vault(source_dir, page_count, page_size)
+        for strategy in COPY_STRATEGIES:
+            dest_dir = os.path.join(base_dir, f"dest_{strategy}")
+            source_hashes = {}
+            cold = run_stage(source_dir, dest_dir, strategy, source_hashes)
+            warm = run_stage(source_dir, dest_dir, strategy, source_hashes)
+            results.append({"strategy": strategy, "pages": page_count, "page_size": page_size,
+                            "cold": cold, "warm": warm})
+            shutil.rmtree(dest_dir)
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SOURCE_DIR -> DESTINATION_DIR copy strategies.")
+    parser.add_argument("--pages", type=int, default=2000, help="Number of synthetic pages.")
+    parser.add_argument("--page-size", type=int, default=4000, help="Approximate size of each page in bytes.")
+    parser.add_argument("--work-dir", default=None, help="Directory for the temporary vault (use the real vault's filesystem).")
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    results = benchmark_copy_strategies(args.pages, args.page_size, args.work_dir)
+    baseline = next(result for result in results if result["strategy"] == "copy")
+    print(f"{'strategy':<16}{'cold s':>10}{'warm s':>10}{'warm written':>14}{'warm vs copy':>14}")
+    for result in results:
+        speedup = baseline["warm"]["seconds"] / result["warm"]["seconds"] if result["warm"]["seconds"] else float("inf")
+        print(f"{result['strategy']:<16}{result['cold']['seconds']:>10.3f}{result['warm']['seconds']:>10.3f}"
+              f"{result['warm']['written']:>14}{speedup:>13.2f}x")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
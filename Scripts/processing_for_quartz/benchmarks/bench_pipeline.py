@@ -0,0 +1,149 @@
+"""
+Benchmarks the whole preprocessing pipeline on a synthetic vault and graph.
+
+The generated graph has a hub-heavy degree distribution (see synthetic_data.py).
+Each run times every stage of run_pipeline twice: a cold full rebuild with an
+empty graph cache and manifest, then a warm incremental run over its own output.
+The results are written as JSON, so two commits can be compared with --compare.
+
+Usage (from the Scripts directory):
+    python -m processing_for_quartz.benchmarks.bench_pipeline --size 1k --output before.json
+    python -m processing_for_quartz.benchmarks.bench_pipeline --size 1k --output after.json --compare before.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from contextlib import redirect_stdout
+import rdflib
+from ..main import run_pipeline
+from ..stage_timer import StageTimer
+from ..copy_strategies import COPY_STRATEGIES
+from .synthetic_data import SIZE_PRESETS, generate_dataset
+
+# Stages faster than this are too noisy to flag as regressions.
+MIN_COMPARED_SECONDS = 0.05
+
+def git_commit() -> str:
+    """Returns the current commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def count_pages(directory: str) -> int:
+    return sum(1 for _, _, files in os.walk(directory) for file_name in files if file_name.endswith(".md"))
+
+def time_pipeline_run(dataset: dict, run_dir: str, full_rebuild: bool, jobs: int, copy_strategy: str,
+                      verbose: bool = False) -> dict:
+    """Runs the pipeline once on the dataset and returns the per-stage wall times in seconds."""
+    stage_timer = StageTimer()
+    with open(os.devnull, "w") as devnull, redirect_stdout(sys.stdout if verbose else devnull):
+        run_pipeline(dataset["source_dir"], os.path.join(run_dir, "output"), dataset["ttl_dir"],
+                     full_rebuild=full_rebuild, jobs=jobs, copy_strategy=copy_strategy,
+                     graph_cache_dir=os.path.join(run_dir, "graph_cache"), parse_jobs=jobs,
+                     manifest_path=os.path.join(run_dir, "build_manifest.json"), stage_timer=stage_timer)
+    return {
+        "stages": {name: round(seconds, 4) for name, seconds in stage_timer.stages.items()},
+        "total": round(stage_timer.total(), 4),
+    }
+
+def benchmark_pipeline(page_count: int, triple_count: int, seed: int = 0, jobs: int = 1,
+                       copy_strategy: str = "copy", work_dir: str = None, verbose: bool = False) -> dict:
+    """Generates a dataset, times a cold and a warm pipeline run on it and returns the results."""
+    base_dir = tempfile.mkdtemp(prefix="bench_pipeline_", dir=work_dir)
+    try:
+        start = time.perf_counter()
+        dataset = generate_dataset(os.path.join(base_dir, "data"), page_count, triple_count, seed)
+        generate_seconds = time.perf_counter() - start
+        run_dir = os.path.join(base_dir, "run")
+        cold = time_pipeline_run(dataset, run_dir, True, jobs, copy_strategy, verbose)
+        warm = time_pipeline_run(dataset, run_dir, False, jobs, copy_strategy, verbose)
+        rendered_pages = count_pages(os.path.join(run_dir, "output"))
+        cold["render_seconds_per_page"] = round(cold["stages"]["render"] / rendered_pages, 6) if rendered_pages else None
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "rdflib": rdflib.__version__,
+        "params": {"pages": page_count, "triples": triple_count, "seed": seed, "jobs": jobs,
+                   "copy_strategy": copy_strategy},
+        "dataset": {"pages": rendered_pages, "entities": dataset["entities"], "triples": dataset["triples"],
+                    "generate_seconds": round(generate_seconds, 4)},
+        "runs": {"cold": cold, "warm": warm},
+    }
+
+def compare_results(previous: dict, current: dict, threshold: float) -> list[str]:
+    """Prints the per-stage change against a previous result and returns the stages that regressed."""
+    if previous.get("params") != current["params"]:
+        print(f"Warning: the previous results used different parameters: {previous.get('params')}")
+    regressions = []
+    print(f"{'run':<6}{'stage':<12}{'before s':>10}{'after s':>10}{'change':>10}")
+    for run_name, run in current["runs"].items():
+        previous_run = previous.get("runs", {}).get(run_name, {})
+        previous_stages = dict(previous_run.get("stages", {}), total=previous_run.get("total"))
+        for stage_name, seconds in list(run["stages"].items()) + [("total", run["total"])]:
+            before = previous_stages.get(stage_name)
+            if not before:
+                print(f"{run_name:<6}{stage_name:<12}{'-':>10}{seconds:>10.3f}{'-':>10}")
+                continue
+            change = (seconds - before) / before * 100
+            print(f"{run_name:<6}{stage_name:<12}{before:>10.3f}{seconds:>10.3f}{change:>+9.1f}%")
+            if change > threshold and before >= MIN_COMPARED_SECONDS:
+                regressions.append(f"{run_name}/{stage_name}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the preprocessing pipeline on a synthetic vault.")
+    parser.add_argument("--size", choices=SIZE_PRESETS, default="1k",
+                        help="Preset vault size in pages (default: %(default)s).")
+    parser.add_argument("--pages", type=int, default=None, help="Override the number of pages of the preset.")
+    parser.add_argument("--triples", type=int, default=None, help="Override the number of triples of the preset.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data generator.")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes for parsing and rendering.")
+    parser.add_argument("--copy-strategy", choices=COPY_STRATEGIES, default="copy",
+                        help="Copy strategy passed to the pipeline (default: %(default)s).")
+    parser.add_argument("--work-dir", default=None, help="Directory for the temporary vault and output.")
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file.")
+    parser.add_argument("--compare", default=None, help="Compare against a previous JSON result file.")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Percent slowdown of a stage that counts as a regression with --compare.")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own output.")
+    args = parser.parse_args()
+
+    page_count, triple_count = SIZE_PRESETS[args.size]
+    page_count = args.pages or page_count
+    triple_count = args.triples or triple_count
+    results = benchmark_pipeline(page_count, triple_count, args.seed, args.jobs, args.copy_strategy,
+                                 args.work_dir, args.verbose)
+
+    dataset = results["dataset"]
+    print(f"{dataset['pages']} pages, {dataset['entities']} entities, {dataset['triples']} triples "
+          f"(generated in {dataset['generate_seconds']:.1f}s)")
+    print(f"{'stage':<12}{'cold s':>10}{'warm s':>10}")
+    cold, warm = results["runs"]["cold"], results["runs"]["warm"]
+    for stage_name, seconds in cold["stages"].items():
+        print(f"{stage_name:<12}{seconds:>10.3f}{warm['stages'].get(stage_name, 0.0):>10.3f}")
+    print(f"{'total':<12}{cold['total']:>10.3f}{warm['total']:>10.3f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        regressions = compare_results(previous, results, args.threshold)
+        if regressions:
+            print(f"Regressions over {args.threshold:.0f}%: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import os
+import random
+from bisect import bisect
+from itertools import accumulate
+
+# (pages, triples) presets, from a small vault up to the size we expect the GC thesaurus vault to reach.
+SIZE_PRESETS = {
+    "1k": (1_000, 100_000),
+    "5k": (5_000, 500_000),
+    "20k": (20_000, 2_000_000),
+}
+
+BENCH_NS = "https://example.org/bench#"
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+RDFS_LABEL = "http://www.w3.org/2000/01/rdf-schema#label"
+RDFS_COMMENT = "http://www.w3.org/2000/01/rdf-schema#comment"
+RDFS_SUBCLASSOF = "http://www.w3.org/2000/01/rdf-schema#subClassOf"
+RDFS_CLASS = "http://www.w3.org/2000/01/rdf-schema#Class"
+OWL_CLASS = "http://www.w3.org/2002/07/owl#Class"
+OWL_OBJECT_PROPERTY = "http://www.w3.org/2002/07/owl#ObjectProperty"
+OWL_DATATYPE_PROPERTY = "http://www.w3.org/2002/07/owl#DatatypeProperty"
+OWL_INVERSE_OF = "http://www.w3.org/2002/07/owl#inverseOf"
+SCHEMA_THING = "https://schema.org/Thing"
+SKOS_BROADER = "http://www.w3.org/2004/02/skos/core#broader"
+DCTERMS_HAS_PART = "http://purl.org/dc/terms/hasPart"
+
+RELATIONSHIP_PREDICATE_COUNT = 40
+INVERSE_PAIR_COUNT = 10
+DATATYPE_PROPERTY_COUNT = 5
+ROOT_CLASS_COUNT = 20
+
+def _entity_uri(index: int) -> str:
+    return f"<{BENCH_NS}concept_{index}>"
+
+def _zipf_cum_weights(count: int, exponent: float = 1.1) -> list[float]:
+    """Cumulative Zipf weights, so index 0 is the biggest hub and the tail is long."""
+    return list(accumulate(1.0 / (rank + 1) ** exponent for rank in range(count)))
+
+def write_ontology_file(ttl_path: str):
+    """Writes the predicate declarations: object properties with labels and inverses, and datatype properties."""
+    lines = []
+    for i in range(RELATIONSHIP_PREDICATE_COUNT):
+        predicate = f"<{BENCH_NS}rel_{i}>"
+        lines.append(f"{predicate} <{RDF_TYPE}> <{OWL_OBJECT_PROPERTY}> .")
+        lines.append(f'{predicate} <{RDFS_LABEL}> "rel_{i}" .')
+    for i in range(INVERSE_PAIR_COUNT):
+        lines.append(f"<{BENCH_NS}rel_{2 * i}> <{OWL_INVERSE_OF}> <{BENCH_NS}rel_{2 * i + 1}> .")
+    for i in range(DATATYPE_PROPERTY_COUNT):
+        predicate = f"<{BENCH_NS}attr_{i}>"
+        lines.append(f"{predicate} <{RDF_TYPE}> <{OWL_DATATYPE_PROPERTY}> .")
+        lines.append(f'{predicate} <{RDFS_LABEL}> "attr_{i}" .')
+    with open(ttl_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+def write_synthetic_graph(ttl_dir: str, entity_count: int, triple_count: int, seed: int = 0,
+                          file_count: int = 4) -> int:
+    """
+    Writes a synthetic graph of roughly 'triple_count' triples over 'entity_count'
+    entities, split across 'file_count' Turtle files plus an ontology file. Objects
+    of hierarchy and relationship triples are drawn from a Zipf distribution, so a
+    few hub entities are linked from a large share of the graph, as in ochro.ttl.
+    Returns the number of triples written.
+    """
+    rng = random.Random(seed)
+    os.makedirs(ttl_dir, exist_ok=True)
+    write_ontology_file(os.path.join(ttl_dir, "ontology.ttl"))
+
+    cum_weights = _zipf_cum_weights(entity_count)
+    entity_indexes = range(entity_count)
+    relationship_predicates = [f"<{BENCH_NS}rel_{i}>" for i in range(RELATIONSHIP_PREDICATE_COUNT)]
+    datatype_predicates = [f"<{BENCH_NS}attr_{i}>" for i in range(DATATYPE_PROPERTY_COUNT)]
+    hierarchy_predicates = [f"<{SKOS_BROADER}>", f"<{DCTERMS_HAS_PART}>"]
+
+    # Every entity gets a type, a label and a parent class; the rest of the budget is links and literals.
+    base_triples_per_entity = 3
+    extra_triples = max(0, triple_count - entity_count * base_triples_per_entity)
+    extra_per_entity = extra_triples / entity_count if entity_count else 0
+
+    files = [open(os.path.join(ttl_dir, f"data_{i}.ttl"), "w", encoding="utf-8") for i in range(file_count)]
+    written = 0
+    try:
+        for index in entity_indexes:
+            subject = _entity_uri(index)
+            lines = []
+            class_type = RDFS_CLASS if index < ROOT_CLASS_COUNT * 5 else OWL_CLASS
+            lines.append(f"{subject} <{RDF_TYPE}> <{class_type}> .")
+            lines.append(f'{subject} <{RDFS_LABEL}> "Concept {index}" .')
+            if index < ROOT_CLASS_COUNT:
+                lines.append(f"{subject} <{RDFS_SUBCLASSOF}> <{SCHEMA_THING}> .")
+            else:
+                # Parents are earlier entities, drawn hub-first, which keeps the hierarchy acyclic.
+                # Draws as rng.choices(range(index), cum_weights=cum_weights[:index]) would,
+                # without copying the weights of every earlier entity.
+                parent = bisect(cum_weights, rng.random() * cum_weights[index - 1], 0, index - 1)
+                lines.append(f"{subject} <{RDFS_SUBCLASSOF}> {_entity_uri(parent)} .")
+
+            link_count = int(extra_per_entity) + (1 if rng.random() < extra_per_entity % 1 else 0)
+            targets = rng.choices(entity_indexes, cum_weights=cum_weights, k=link_count)
+            for target in targets:
+                roll = rng.random()
+                if roll < 0.15:
+                    predicate = rng.choice(datatype_predicates)
+                    lines.append(f'{subject} {predicate} "Value {target} of {index}" .')
+                elif roll < 0.20:
+                    lines.append(f'{subject} <{RDFS_COMMENT}> "Comment {target} about concept {index}." .')
+                elif roll < 0.35:
+                    lines.append(f"{subject} {rng.choice(hierarchy_predicates)} {_entity_uri(target)} .")
+                elif target != index:
+                    lines.append(f"{subject} {rng.choice(relationship_predicates)} {_entity_uri(target)} .")
+            files[index % file_count].write("\n".join(lines) + "\n")
+            written += len(lines)
+    finally:
+        for f in files:
+            f.close()
+    return written
+
+def write_synthetic_vault(source_dir: str, page_count: int, entity_count: int, seed: int = 0) -> list[str]:
+    """
+    Writes 'page_count' Markdown notes named after graph entities. The biggest hubs
+    always get a page; the rest are sampled from the whole graph. Some notes carry
+    old generated sections and footnotes so the body cleaner has work to do.
+    Returns the page names.
+    """
+    rng = random.Random(seed + 1)
+    hub_count = min(page_count // 10, entity_count)
+    page_indexes = list(range(hub_count))
+    page_indexes += rng.sample(range(hub_count, entity_count), min(page_count - hub_count, entity_count - hub_count))
+    folders = ["", "concepts", "concepts/policy", "people", "services/digital"]
+    paragraph = "This note describes the concept and how it relates to the rest of the vault. " * 3
+    page_names = []
+    for page_number, index in enumerate(page_indexes):
+        name = f"concept_{index}"
+        page_names.append(name)
+        folder = os.path.join(source_dir, rng.choice(folders))
+        os.makedirs(folder, exist_ok=True)
+        frontmatter = f"---\ntitle: {name}\ntags:\n- bench\n"
+        if page_number % 20 == 0:
+            frontmatter += "mermaid_layers: 2\n"
+        frontmatter += "---\n"
+        body = f"# {name}\n\n" + "\n\n".join(paragraph for _ in range(rng.randint(1, 6))) + "\n"
+        if page_number % 3 == 0:
+            body += ("\n## Related Links\n\n- [[concept_0]]\n- [[concept_1]]\n"
+                     "\n## Semantic Connections\n\n```mermaid\ngraph TD\n  a-->b\n```\n")
+        if page_number % 4 == 0:
+            body += "\n## Footnotes\n\n[^1]: A footnote.\n"
+        with open(os.path.join(folder, f"{name}.md"), "w", encoding="utf-8") as f:
+            f.write(frontmatter + body)
+    return page_names
+
+def generate_dataset(base_dir: str, page_count: int, triple_count: int, seed: int = 0) -> dict:
+    """
+    Generates a synthetic vault and graph under 'base_dir' and returns their paths
+    and sizes. There are about twenty triples per entity and at least two entities
+    per page, so most diagram nodes do not have a page of their own.
+    """
+    entity_count = max(page_count * 2, triple_count // 20)
+    source_dir = os.path.join(base_dir, "source")
+    ttl_dir = os.path.join(base_dir, "ttl")
+    triples_written = write_synthetic_graph(ttl_dir, entity_count, triple_count, seed)
+    write_synthetic_vault(source_dir, page_count, entity_count, seed)
+    return {
+        "source_dir": source_dir,
+        "ttl_dir": ttl_dir,
+        "pages": page_count,
+        "entities": entity_count,
+        "triples": triples_written,
+        "seed": seed,
+    }
@@ -0,0 +1,114 @@
+import os
+import json
+import hashlib
+from rdflib import Graph, URIRef
+
+# Bump when the manifest layout or the meaning of its fields changes.
+MANIFEST_VERSION = 2
+
+def hash_file(file_path: str) -> str:
+    """Returns the SHA-256 hex digest of a file's content."""
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def compute_build_digest(*parts) -> str:
+    """
+    Hashes the build-wide inputs that affect every page (predicate sets, config values).
+    Sets are sorted so the digest does not depend on iteration order.
+    """
+    normalized_parts = [sorted(part) if isinstance(part, (set, frozenset)) else part for part in parts]
+    payload = json.dumps([MANIFEST_VERSION, normalized_parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def load_build_manifest(manifest_path: str, build_digest: str) -> dict:
+    """
+    Loads the per-page entries of the build manifest. Returns an empty dict, which
+    forces a full rebuild, if the manifest is missing, unreadable or was written
+    with different build-wide inputs.
+    """
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable build manifest {manifest_path}: {e}")
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("build_digest") != build_digest:
+        print("Build inputs changed since the last run. Rebuilding every page.")
+        return {}
+    return manifest.get("pages", {})
+
+def save_build_manifest(manifest_path: str, build_digest: str, pages: dict):
+    """Writes the build manifest atomically so an interrupted run never leaves a partial file."""
+    manifest = {"version": MANIFEST_VERSION, "build_digest": build_digest, "pages": pages}
+    temp_path = f"{manifest_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+
+class DependencyDigests:
+    """
+    Lazily computes a digest of the triples that mention each URI, as subject or
+    object, and memoizes it for the rest of the run. A page's diagram and
+    frontmatter only change if the triples around the URIs it depends on change.
+    """
+    def __init__(self, graph: Graph):
+        self.graph = graph
+        self._uri_digests = {}
+
+    def uri_digest(self, uri: str) -> str:
+        if uri not in self._uri_digests:
+            uri_ref = URIRef(uri)
+            triple_lines = [f"{s.n3()} {p.n3()} {o.n3()}" for s, p, o in self.graph.triples((uri_ref, None, None))]
+            triple_lines.extend(f"{s.n3()} {p.n3()} {o.n3()}" for s, p, o in self.graph.triples((None, None, uri_ref)))
+            self._uri_digests[uri] = hashlib.sha256("\n".join(sorted(triple_lines)).encode("utf-8")).hexdigest()
+        return self._uri_digests[uri]
+
+    def digest(self, uris) -> str:
+        combined = hashlib.sha256()
+        for uri in sorted(uris):
+            combined.update(f"{uri} {self.uri_digest(uri)}\n".encode("utf-8"))
+        return combined.hexdigest()
+
+def build_page_entry(source_hash: str, output_path: str, page_uri: URIRef, should_skip_inverse: bool,
+                     node_uris: dict, linked_node_ids: list, dependencies: set,
+                     dependency_digests: DependencyDigests, entities: list) -> dict:
+    """
+    Records what a generated page was built from. 'node_uris' maps each diagram node
+    id to its resolved URI; 'entities' is the page's frontmatter entity list, kept
+    so the frontmatter sync does not have to read the page back.
+    """
+    return {
+        "source_hash": source_hash,
+        "output_hash": hash_file(output_path),
+        "page_uri": str(page_uri),
+        "skip_inverse": should_skip_inverse,
+        "node_uris": node_uris,
+        "linked_node_ids": sorted(linked_node_ids),
+        "dependencies": sorted(dependencies),
+        "dependency_digest": dependency_digests.digest(dependencies),
+        "entities": entities,
+    }
+
+def is_page_up_to_date(entry: dict, source_hash: str, output_path: str, page_uri: URIRef,
+                       should_skip_inverse: bool, all_source_markdown_basenames_lower: set,
+                       resolve_uri, dependency_digests: DependencyDigests) -> bool:
+    """
+    Checks a page's manifest entry against the current run. The page is up to date
+    only if its source and output are unchanged, it resolves to the same URI and
+    scope, its wikilink targets and node URIs resolve the same way, and no triple
+    around any URI it depends on changed.
+    """
+    if entry is None or not os.path.exists(output_path):
+        return False
+    if entry["source_hash"] != source_hash or entry["output_hash"] != hash_file(output_path):
+        return False
+    if entry["page_uri"] != str(page_uri) or entry["skip_inverse"] != should_skip_inverse:
+        return False
+    linked_node_ids = sorted(node_id for node_id in entry["node_uris"] if node_id.lower() in all_source_markdown_basenames_lower)
+    if linked_node_ids != entry["linked_node_ids"]:
+        return False
+    if any(str(resolve_uri(node_id)) != uri for node_id, uri in entry["node_uris"].items()):
+        return False
+    return dependency_digests.digest(entry["dependencies"]) == entry["dependency_digest"]
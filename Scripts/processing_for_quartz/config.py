@@ -5,4 +5,28 @@ SOURCE_DIR = "/home/hide/quartz/heidi2/publish"
 DESTINATION_DIR = "/home/hide/quartz/content"
 TTL_DIR = "/home/hide/Documents/dmatdefine/ttl/publish"
 DRAFT_STATUS = False 
-BASE_URI = "https://heidingaway.github.io/heidi2/"
\ No newline at end of file
+BASE_URI = "https://heidingaway.github.io/heidi2/"
+# Parsed TTL triples are cached here between runs. Safe to delete at any time.
+GRAPH_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "dmatdefine", "graph_cache")
+# Number of processes used to parse changed TTL files.
+TTL_PARSE_JOBS = os.cpu_count() or 1
+# Incremental build manifest, kept next to (not inside) DESTINATION_DIR.
+BUILD_MANIFEST_PATH = os.path.normpath(DESTINATION_DIR) + ".build_manifest.json"
+# Maximum number of URIs kept in the URI term table; the least recently used are
+# evicted past it so memory stays flat on very large graphs. None keeps every term.
+URI_TERM_TABLE_SIZE = 100000
+# How source files reach the processing stage: "direct", "copy", "skip-unchanged" or "link".
+# "direct" leaves the previous output in place until a page is rendered, so pages whose
+# content did not change are not rewritten; the others overwrite it first (see copy_strategies.py).
+COPY_STRATEGY = "direct"
+# Where --profile writes its JSON report when no path is given.
+PROFILE_REPORT_PATH = os.path.normpath(DESTINATION_DIR) + ".profile.json"
+# Maximum number of one-hop expansions kept by the Mermaid neighbourhood cache. None keeps every expansion.
+NEIGHBOURHOOD_CACHE_SIZE = 20000
+# How often watch mode checks the source and TTL folders when it polls instead of using file system events.
+WATCH_POLL_INTERVAL = 1.0
+# Watch mode waits this long after the last file system event before applying a batch of changes.
+WATCH_DEBOUNCE_SECONDS = 0.2
+# Load each TTL file into its own named graph of an rdflib Dataset, read through their union.
+# Lets watch mode swap one file's triples without working out which triples other files share.
+DATASET_MODE = False
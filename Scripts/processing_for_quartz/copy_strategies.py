@@ -0,0 +1,86 @@
+import os
+import shutil
+
+# How main() step 4 makes each source Markdown file available to the processing stage:
+#   copy           - copy every file with shutil.copy2, then process the copy (the original behaviour).
+#                    The copy replaces the previous output, so every processed page is rewritten.
+#   skip-unchanged - copy only when the source's content changed since the destination was
+#                    last rendered; otherwise read the source without copying it
+#   link           - reflink the file where the filesystem supports it, else hardlink it, else copy it
+#   direct         - do not copy at all; read the source file and write the result to the destination
+#                    (the default, see config.COPY_STRATEGY)
+COPY_STRATEGIES = ("copy", "skip-unchanged", "link", "direct")
+
+# Linux ioctl that makes a copy-on-write clone of a file (btrfs, XFS, ...).
+FICLONE = 0x40049409
+
+def is_source_unchanged(source_hash: str, previous_source_hash: str) -> bool:
+    """
+    Returns True if the source's content hash is the one the build manifest recorded
+    when its page was last rendered. Content is compared rather than mtimes, which a
+    checkout, 'rsync -t' or a restore from backup can set to before the last build.
+    """
+    return source_hash is not None and source_hash == previous_source_hash
+
+def _reflink_file(source_path: str, target_path: str) -> bool:
+    """Clones a file with FICLONE. Returns False if the platform or filesystem does not support it."""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(source_path, "rb") as src, open(target_path, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    except OSError:
+        if os.path.exists(target_path):
+            os.remove(target_path)
+        return False
+    shutil.copystat(source_path, target_path)
+    return True
+
+def link_or_copy_file(source_path: str, dest_path: str) -> str:
+    """
+    Places a reflink of the source at the destination, or a hardlink, or failing
+    both a regular copy. Returns the method used. Hardlinks are only safe because
+    the processing stage replaces output files by renaming instead of writing in place.
+    """
+    temp_path = f"{dest_path}.{os.getpid()}.link"
+    if _reflink_file(source_path, temp_path):
+        method = "reflink"
+    else:
+        try:
+            os.link(source_path, temp_path)
+            method = "hardlink"
+        except OSError:
+            shutil.copy2(source_path, dest_path)
+            return "copy"
+    os.replace(temp_path, dest_path)
+    return method
+
+def stage_source_file(source_path: str, dest_path: str, strategy: str = "copy",
+                      source_hash: str = None, previous_source_hash: str = None) -> str:
+    """
+    Makes a source Markdown file available for processing with the given copy
+    strategy and returns the path the processing stage should read from. The
+    result is always written to 'dest_path'. "skip-unchanged" needs the source's
+    content hash and the one recorded in the build manifest (see build_manifest.hash_file);
+    without a recorded hash the file is copied.
+
+    The previous output is never processed again in place of the source: rendering
+    a rendered page does not give the same page back (clean_markdown_body removes
+    the generated headings but keeps e.g. the Related Links items).
+    """
+    if strategy not in COPY_STRATEGIES:
+        raise ValueError(f"Unknown copy strategy '{strategy}'. Expected one of: {', '.join(COPY_STRATEGIES)}")
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    if strategy == "direct":
+        return source_path
+    if strategy == "copy":
+        shutil.copy2(source_path, dest_path)
+    elif strategy == "skip-unchanged":
+        if is_source_unchanged(source_hash, previous_source_hash):
+            return source_path
+        shutil.copy2(source_path, dest_path)
+    elif strategy == "link":
+        link_or_copy_file(source_path, dest_path)
+    return dest_path
@@ -1,107 +1,86 @@
-import os
-import glob
-import shutil
-from rdflib import Graph, URIRef
-from .markdown.read_write_clean_md import read_markdown_file, write_markdown_file, clean_markdown_body
-from .markdown.generate_md_body import generate_body_content, update_frontmatter
-from .markdown.frontmatter_sync import update_source_yaml_with_related_entities
-from .mermaid.generate_mermaid import generate_mermaid_syntax
-from .rdf.parse_graph import load_dynamic_predicates
-from .rdf.rdf_helpers import find_uri_for_filename, get_subclass_depth
-from .config import SOURCE_DIR, DESTINATION_DIR, TTL_DIR, DRAFT_STATUS, BASE_URI
+import argparse
+from .rdf.rdf_helpers import set_uri_term_table_size
+from .pipeline import Pipeline
+from .watch import WatchSession, watch
+from .copy_strategies import COPY_STRATEGIES
+from .stage_timer import StageTimer
+from .profiling import PipelineProfiler
+from .config import (SOURCE_DIR, DESTINATION_DIR, TTL_DIR, GRAPH_CACHE_DIR, TTL_PARSE_JOBS, BUILD_MANIFEST_PATH,
+                     URI_TERM_TABLE_SIZE, COPY_STRATEGY, PROFILE_REPORT_PATH, WATCH_POLL_INTERVAL, DATASET_MODE)
 
-def main():
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    """Parses the command line options of the preprocessing workflow."""
+    parser = argparse.ArgumentParser(description="Preprocess Markdown notes and RDF graphs for Quartz.")
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help="Regenerate every page instead of only the pages whose inputs changed.")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N",
+                        help="Render pages in N worker processes that share the loaded graph.")
+    parser.add_argument("--copy-strategy", choices=COPY_STRATEGIES, default=COPY_STRATEGY,
+                        help="How source files reach the processing stage (default: %(default)s).")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_REPORT_PATH, default=None, metavar="REPORT_PATH",
+                        help="Record time and peak memory per stage and time per page, and write a JSON "
+                             "report (default path: %(const)s).")
+    parser.add_argument("--dataset", action="store_true", default=DATASET_MODE,
+                        help="Load each TTL file into its own named graph, read through their union, so "
+                             "watch mode can replace one file's triples on their own.")
+    parser.add_argument("--watch", action="store_true",
+                        help="After the first run, keep the graph loaded and regenerate the affected pages "
+                             "whenever a source note or TTL file changes.")
+    parser.add_argument("--poll", nargs="?", type=float, const=WATCH_POLL_INTERVAL, default=None, metavar="SECONDS",
+                        help="With --watch, poll the folders every SECONDS (default: %(const)s) instead of "
+                             "using file system events.")
+    args = parser.parse_args(argv)
+    if args.watch and args.profile:
+        parser.error("--profile cannot be combined with --watch")
+    if args.poll is not None and not args.watch:
+        parser.error("--poll requires --watch")
+    return args
+
+def run_pipeline(source_dir: str, destination_dir: str, ttl_dir: str, *, full_rebuild: bool = False,
+                 jobs: int = 1, copy_strategy: str = COPY_STRATEGY, graph_cache_dir: str = GRAPH_CACHE_DIR,
+                 parse_jobs: int = TTL_PARSE_JOBS, manifest_path: str = BUILD_MANIFEST_PATH,
+                 stage_timer: StageTimer = None, dataset_mode: bool = DATASET_MODE):
     """
-    Main function to orchestrate the preprocessing and synchronization workflow.
+    Runs the preprocessing and synchronization workflow on the given directories.
+    By default only pages whose source file or dependent triples changed since the
+    last run are regenerated. Pass a StageTimer to record how long each stage takes,
+    or a PipelineProfiler to also record memory and per-page timings. With
+    'dataset_mode' each TTL file is loaded into its own named graph.
     """
-    # 1. Setup and RDF Graph Loading
-    os.makedirs(DESTINATION_DIR, exist_ok=True)
-    
-    ttl_files = glob.glob(os.path.join(TTL_DIR, "**/*.ttl"), recursive=True)
-    g = Graph()
-    for ttl_file in ttl_files:
-        try:
-            g.parse(ttl_file, format="turtle")
-        except Exception as e:
-            print(f"Error parsing {ttl_file}: {e}")
-            continue
-
-    # 2. Get Predicate Sets
-    RELATIONSHIP_PREDICATES, METADATA_PREDICATES, LITERAL_PROPERTIES_FOR_NODE_DISPLAY, \
-    RELATIONSHIP_PREDICATES_LOWER, METADATA_PREDICATES_LOWER, LITERAL_PROPERTIES_FOR_NODE_DISPLAY_LOWER = load_dynamic_predicates(g)
-
-    # 3. Pre-collect source file names
-    all_source_markdown_basenames_lower = set()
-    for md_file_path_in_source in glob.glob(os.path.join(SOURCE_DIR, "**/*.md"), recursive=True):
-        filename_no_ext = os.path.splitext(os.path.basename(md_file_path_in_source))[0].lower()
-        all_source_markdown_basenames_lower.add(filename_no_ext)
-
-    # 4. Copy source files to destination
-    source_md_files = glob.glob(os.path.join(SOURCE_DIR, "**/*.md"), recursive=True)
-    for md_file_path_src in source_md_files:
-        relative_path = os.path.relpath(md_file_path_src, SOURCE_DIR)
-        dest_file_path = os.path.join(DESTINATION_DIR, relative_path)
-        os.makedirs(os.path.dirname(dest_file_path), exist_ok=True)
-        shutil.copy2(md_file_path_src, dest_file_path)
-
-    # 5. Process each Markdown file in the destination folder
-    GENERIC_ROOT_CLASSES = {
-        URIRef("https://schema.org/Thing"),
-        URIRef("http://www.w3.org/2002/07/owl#Thing"),
-        URIRef("http://www.w3.org/2000/01/rdf-schema#Resource"),
-    }
-    RDF_TYPE = URIRef("http://www.w3.org/1999/02/22-rdf-syntax-ns#type")
-    RDFS_CLASS = URIRef("http://www.w3.org/2000/01/rdf-schema#Class")
-    
-    dest_md_files = glob.glob(os.path.join(DESTINATION_DIR, "**/*.md"), recursive=True)
-    for md_file_path_in_dest in dest_md_files:
-        filename_with_ext = os.path.basename(md_file_path_in_dest)
-        filename = os.path.splitext(filename_with_ext)[0]
-        
-        # Determine the URI and class depth
-        file_uri_ref = find_uri_for_filename(filename, g, BASE_URI)
-        class_depth = get_subclass_depth(file_uri_ref, g, GENERIC_ROOT_CLASSES)
-        is_rdfs_class = (file_uri_ref, RDF_TYPE, RDFS_CLASS) in g
-        should_skip_inverse_relationships = (class_depth <= 1 and class_depth != -1) or is_rdfs_class
-
-        # Read, clean, and process the file
-        existing_frontmatter, raw_markdown_body = read_markdown_file(md_file_path_in_dest)
-        
-        clean_body = clean_markdown_body(raw_markdown_body, existing_frontmatter.get("title", filename))
+    Pipeline(source_dir, destination_dir, ttl_dir, full_rebuild=full_rebuild, jobs=jobs, copy_strategy=copy_strategy,
+             graph_cache_dir=graph_cache_dir, parse_jobs=parse_jobs, manifest_path=manifest_path,
+             stage_timer=stage_timer, dataset_mode=dataset_mode).run()
 
-        # Generate Mermaid syntax and get related entities
-        # The mermaid_layers variable must be an integer from your frontmatter.
-        mermaid_layers = existing_frontmatter.get("mermaid_layers", 1)
-
-        mermaid_syntax_content, graph_node_ids = generate_mermaid_syntax(
-            current_page_title=existing_frontmatter.get("title", filename),
-            graph=g,
-            RELATIONSHIP_PREDICATES=RELATIONSHIP_PREDICATES,
-            METADATA_PREDICATES=METADATA_PREDICATES,
-            LITERAL_PROPERTIES_FOR_NODE_DISPLAY=LITERAL_PROPERTIES_FOR_NODE_DISPLAY,
-            RELATIONSHIP_PREDICATES_LOWER=RELATIONSHIP_PREDICATES_LOWER,
-            METADATA_PREDICATES_LOWER=METADATA_PREDICATES_LOWER,
-            LITERAL_PROPERTIES_FOR_NODE_DISPLAY_LOWER=LITERAL_PROPERTIES_FOR_NODE_DISPLAY_LOWER,
-            current_page_full_uri=file_uri_ref,
-            should_skip_inverse_relationships=should_skip_inverse_relationships,
-            max_layers=mermaid_layers
-        )
-
-        # Generate new body content (Mermaid and wikilinks)
-        body_append_content = generate_body_content(mermaid_syntax_content, graph_node_ids, all_source_markdown_basenames_lower)
-        
-        # Update frontmatter
-        updated_frontmatter = update_frontmatter(
-            existing_frontmatter, g, filename, graph_node_ids, file_uri_ref, DRAFT_STATUS, BASE_URI)
-            
-        # Write the final file
-        final_body = clean_body + body_append_content
-        write_markdown_file(md_file_path_in_dest, updated_frontmatter, final_body)
-
-    print("Preprocessing complete!")
-    
-    # 6. Synchronize frontmatter back to source files
-    update_source_yaml_with_related_entities(SOURCE_DIR, DESTINATION_DIR)
+def main(argv: list[str] = None):
+    """
+    Main function to orchestrate the preprocessing and synchronization workflow.
+    By default only pages whose source file or dependent triples changed since the
+    last run are regenerated; pass --full-rebuild to regenerate every page and
+    --jobs N to render them in N worker processes. --profile writes a JSON report
+    of where the time and memory went. --watch keeps running and applies every later
+    change to the source notes and TTL files as it happens.
+    """
+    args = parse_args(argv)
+    set_uri_term_table_size(URI_TERM_TABLE_SIZE)
+    if args.watch:
+        watch(WatchSession(SOURCE_DIR, DESTINATION_DIR, TTL_DIR, full_rebuild=args.full_rebuild, jobs=args.jobs,
+                           copy_strategy=args.copy_strategy, graph_cache_dir=GRAPH_CACHE_DIR,
+                           parse_jobs=TTL_PARSE_JOBS, manifest_path=BUILD_MANIFEST_PATH,
+                           dataset_mode=args.dataset), args.poll)
+        return
+    profiler = PipelineProfiler() if args.profile else None
+    if profiler:
+        profiler.start()
+    try:
+        run_pipeline(SOURCE_DIR, DESTINATION_DIR, TTL_DIR, full_rebuild=args.full_rebuild, jobs=args.jobs,
+                     copy_strategy=args.copy_strategy, graph_cache_dir=GRAPH_CACHE_DIR, parse_jobs=TTL_PARSE_JOBS,
+                     manifest_path=BUILD_MANIFEST_PATH, stage_timer=profiler, dataset_mode=args.dataset)
+    finally:
+        if profiler:
+            profiler.stop()
+    if profiler:
+        profiler.print_summary()
+        profiler.write_report(args.profile)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,36 +1,52 @@
 import os
-import re
 import yaml
 import glob
 
 from ..rdf.rdf_helpers import get_uri_last_part
+from .read_write_clean_md import write_text_if_changed, read_frontmatter_header
+from shared_functions.frontmatter_codec import load_frontmatter_yaml, compose_frontmatter
+
+def filter_entities_to_targets(entity_uris: list, valid_target_basenames: set[str]) -> list[dict]:
+    """Keeps the entities whose URI last part names a page in 'valid_target_basenames'."""
+    entities = []
+    for uri in entity_uris:
+        last_section = get_uri_last_part(uri)
+        if last_section.lower() not in valid_target_basenames:
+            continue
+        entities.append({
+            'uri': uri,
+            'last_section': last_section
+        })
+    return entities
+
+def extract_entities_from_page_map(entities_by_page: dict, valid_target_basenames: set[str]) -> dict:
+    """
+    Same result as 'extract_entity_uris_from_markdown_yaml', but from a map of
+    relative page path to frontmatter entity URIs handed over by the processing
+    loop, so nothing is read from the destination directory.
+    """
+    extracted_data = {}
+    for relative_file_path, entity_uris in entities_by_page.items():
+        entities_in_file = filter_entities_to_targets(entity_uris, valid_target_basenames)
+        if entities_in_file:
+            extracted_data[relative_file_path] = entities_in_file
+    return extracted_data
 
 def extract_entity_uris_from_markdown_yaml(destination_dir: str, valid_target_basenames: set[str]) -> dict:
     # (Implementation remains the same)
     extracted_data = {}
-    yaml_front_matter_regex = re.compile(r"^-{3}\s*\n(.*?)\n-{3}\s*\n", re.DOTALL)
     for root, _, files in os.walk(destination_dir):
         for file_name in files:
             if file_name.endswith(".md"):
                 file_path = os.path.join(root, file_name)
                 relative_file_path = os.path.relpath(file_path, destination_dir)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                match = yaml_front_matter_regex.match(content)
-                if match:
-                    yaml_string = match.group(1)
+                # Only the frontmatter is read; long page bodies stay on disk.
+                yaml_string = read_frontmatter_header(file_path).yaml_text
+                if yaml_string is not None:
                     try:
-                        data = yaml.safe_load(yaml_string)
+                        data = load_frontmatter_yaml(yaml_string)
                         if data and 'entities' in data and isinstance(data['entities'], list):
-                            entities_in_file = []
-                            for uri in data['entities']:
-                                last_section = get_uri_last_part(uri)
-                                if last_section.lower() not in valid_target_basenames:
-                                    continue
-                                entities_in_file.append({
-                                    'uri': uri,
-                                    'last_section': last_section
-                                })
+                            entities_in_file = filter_entities_to_targets(data['entities'], valid_target_basenames)
                             if entities_in_file:
                                 extracted_data[relative_file_path] = entities_in_file
                     except yaml.YAMLError as e:
@@ -39,22 +55,41 @@ def extract_entity_uris_from_markdown_yaml(destination_dir: str, valid_target_ba
                         print(f"An unexpected error occurred processing {relative_file_path}: {e}")
     return extracted_data
 
-def update_source_yaml_with_related_entities(source_dir: str, destination_dir: str):
-    # (Implementation remains the same, but imports 'get_uri_last_part' from the new location)
-    print(f"Step 1: Pre-collecting Markdown basenames from '{destination_dir}' for filtering...")
-    all_destination_markdown_basenames_lower = set()
-    for md_file_path_in_dest in glob.glob(os.path.join(destination_dir, "**/*.md"), recursive=True):
-        filename_no_ext = os.path.splitext(os.path.basename(md_file_path_in_dest))[0].lower()
-        all_destination_markdown_basenames_lower.add(filename_no_ext)
-    
-    print(f"\nStep 2: Extracting entities from Markdown files in '{destination_dir}'...")
-    extracted_entities_map = extract_entity_uris_from_markdown_yaml(destination_dir, all_destination_markdown_basenames_lower)
+def update_source_yaml_with_related_entities(source_dir: str, destination_dir: str,
+                                             entities_by_page: dict = None, relative_paths: set = None) -> list[str]:
+    """
+    Writes each page's related links back to the 'related' key of its source file.
+    Pass 'entities_by_page' (relative path of every destination page -> its
+    frontmatter entity URIs) to use what the processing loop already computed;
+    without it the destination directory is scanned and every page's YAML is read.
+    Source files whose 'related' list is unchanged are not rewritten, and with
+    'relative_paths' given only those source files are considered. Returns the
+    relative paths of the source files that were rewritten.
+    """
+    if entities_by_page is None:
+        print(f"Step 1: Pre-collecting Markdown basenames from '{destination_dir}' for filtering...")
+        all_destination_markdown_basenames_lower = set()
+        for md_file_path_in_dest in glob.glob(os.path.join(destination_dir, "**/*.md"), recursive=True):
+            filename_no_ext = os.path.splitext(os.path.basename(md_file_path_in_dest))[0].lower()
+            all_destination_markdown_basenames_lower.add(filename_no_ext)
+
+        print(f"\nStep 2: Extracting entities from Markdown files in '{destination_dir}'...")
+        extracted_entities_map = extract_entity_uris_from_markdown_yaml(destination_dir, all_destination_markdown_basenames_lower)
+    else:
+        print(f"Step 1: Using the entities of the {len(entities_by_page)} pages in '{destination_dir}' from the processing stage...")
+        all_destination_markdown_basenames_lower = {
+            os.path.splitext(os.path.basename(relative_file_path))[0].lower() for relative_file_path in entities_by_page}
+        extracted_entities_map = extract_entities_from_page_map(entities_by_page, all_destination_markdown_basenames_lower)
     print(f"Found entities in {len(extracted_entities_map)} files in destination directory (after filtering).")
-
-    yaml_front_matter_and_content_regex = re.compile(r"^-{3}\s*\n(.*?)\n-{3}\s*\n(.*)", re.DOTALL)
+    if relative_paths is not None:
+        extracted_entities_map = {relative_file_path: entities_list
+                                  for relative_file_path, entities_list in extracted_entities_map.items()
+                                  if relative_file_path in relative_paths}
 
     print(f"\nStep 3: Updating YAML in source files in '{source_dir}'...")
     updated_count = 0
+    unchanged_count = 0
+    updated_paths = []
     
     for relative_file_path, entities_list in extracted_entities_map.items():
         source_file_path = os.path.join(source_dir, relative_file_path)
@@ -64,18 +99,15 @@ def update_source_yaml_with_related_entities(source_dir: str, destination_dir: s
             continue
 
         try:
-            with open(source_file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            match = yaml_front_matter_and_content_regex.match(content)
-            if not match:
+            # The body is only read if the 'related' list changed and the file is rewritten.
+            header = read_frontmatter_header(source_file_path)
+            if header.yaml_text is None:
                 print(f"  Warning: No YAML front matter found in source file '{relative_file_path}'. Skipping update.")
                 continue
 
-            yaml_string = match.group(1)
-            remaining_content = match.group(2)
+            yaml_string = header.yaml_text
 
-            source_yaml_data = yaml.safe_load(yaml_string)
+            source_yaml_data = load_frontmatter_yaml(yaml_string)
             if source_yaml_data is None:
                 source_yaml_data = {}
 
@@ -91,18 +123,23 @@ def update_source_yaml_with_related_entities(source_dir: str, destination_dir: s
                         new_related_links_dict[entity_basename_lower] = formatted_link
 
             final_related_links = sorted(list(new_related_links_dict.values()))
+            if source_yaml_data.get('related') == final_related_links:
+                unchanged_count += 1
+                continue
             source_yaml_data['related'] = final_related_links
 
-            updated_yaml_string = yaml.dump(source_yaml_data, sort_keys=False, default_flow_style=False, allow_unicode=True)
-            new_content = f"---\n{updated_yaml_string}---\n{remaining_content}"
+            new_content = compose_frontmatter(source_yaml_data, header.body(), default_flow_style=False, allow_unicode=True)
 
-            with open(source_file_path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
-            updated_count += 1
+            if write_text_if_changed(source_file_path, new_content):
+                updated_count += 1
+                updated_paths.append(relative_file_path)
+            else:
+                unchanged_count += 1
 
         except yaml.YAMLError as e:
             print(f"  Error parsing YAML in source file '{relative_file_path}': {e}")
         except Exception as e:
             print(f"  An unexpected error occurred while updating '{relative_file_path}': {e}")
 
-    print(f"\nFinished updating. Successfully updated {updated_count} source files.")
\ No newline at end of file
+    print(f"\nFinished updating. Successfully updated {updated_count} source files, {unchanged_count} were already up to date.")
+    return updated_paths
\ No newline at end of file
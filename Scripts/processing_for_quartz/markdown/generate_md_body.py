@@ -22,16 +22,18 @@ def generate_body_content(mermaid_syntax_content: str, graph_node_ids: set, all_
     return body_append_content
 
 def update_frontmatter(existing_frontmatter: dict, graph: Graph, filename: str,
-                       graph_node_ids: set, current_page_full_uri: URIRef, draft_status: bool, base_uri: str) -> dict:
+                       graph_node_ids: set, current_page_full_uri: URIRef, draft_status: bool, base_uri: str,
+                       uri_index: dict = None) -> dict:
     """
     Updates the frontmatter dictionary with new entities and draft status.
+    'uri_index' is the optional lookup index from 'build_filename_uri_index'.
     """
     from ..rdf.rdf_helpers import find_uri_for_filename  # Import here to avoid circular dependency
     
     related_for_frontmatter = set()
 
     for node_id in graph_node_ids:
-        related_entity_uri = find_uri_for_filename(node_id, graph, base_uri)
+        related_entity_uri = find_uri_for_filename(node_id, graph, base_uri, uri_index)
         if related_entity_uri:
             related_for_frontmatter.add(str(related_entity_uri))
             
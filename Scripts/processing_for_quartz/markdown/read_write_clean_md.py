@@ -1,5 +1,11 @@
+import os
 import re
+import hashlib
+import tempfile
+import shutil
+import itertools
 import yaml
+from shared_functions.frontmatter_codec import match_frontmatter_block, load_frontmatter_yaml, dump_frontmatter_yaml
 
 def read_markdown_file(file_path: str) -> tuple[dict, str]:
     """
@@ -16,7 +22,7 @@ def read_markdown_file(file_path: str) -> tuple[dict, str]:
             yaml_end_index = content.find("---", 3)
             if yaml_end_index != -1:
                 yaml_str = content[3:yaml_end_index].strip()
-                existing_frontmatter = yaml.safe_load(yaml_str) or {}
+                existing_frontmatter = load_frontmatter_yaml(yaml_str) or {}
                 if False in existing_frontmatter:
                     del existing_frontmatter[False]
                 markdown_body = content[yaml_end_index + 3:].strip()
@@ -26,36 +32,330 @@ def read_markdown_file(file_path: str) -> tuple[dict, str]:
     
     return existing_frontmatter, markdown_body
 
-def write_markdown_file(file_path: str, frontmatter: dict, body: str):
+FRONTMATTER_DELIMITER_LINE_REGEX = re.compile(r"-{3}\s*\n")
+# A closing delimiter on the last line of the file, without a newline.
+FRONTMATTER_LAST_DELIMITER_LINE_REGEX = re.compile(r"-{3}[^\S\n]*")
+LEADING_WHITESPACE_REGEX = re.compile(r"\s*")
+
+class FrontmatterHeader:
+    """
+    The YAML frontmatter of a Markdown file, read without reading the body. 'yaml_text'
+    is None if the file has no frontmatter block. The body is read from disk only
+    when body() is called.
+    """
+    def __init__(self, file_path: str, yaml_text: str = None, body_offset=None, body: str = None):
+        self.file_path = file_path
+        self.yaml_text = yaml_text
+        self._body_offset = body_offset
+        self._body = body
+
+    def body(self) -> str:
+        """Returns the text after the closing delimiter line, as match_frontmatter_block splits it."""
+        if self._body is None:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                f.seek(self._body_offset)
+                rest = f.read()
+            # The closing delimiter's trailing whitespace runs up to its last newline.
+            last_newline = rest.rfind("\n", 0, LEADING_WHITESPACE_REGEX.match(rest).end())
+            self._body = rest[last_newline + 1:]
+        return self._body
+
+def read_frontmatter_header(file_path: str) -> FrontmatterHeader:
+    """
+    Reads a Markdown file line by line up to the closing '---' of its frontmatter and
+    returns the header, with the same result as match_frontmatter_block on the
+    whole file. If the opening line is followed by a blank line, where
+    the regex's backtracking decides the block, the whole file is read and matched.
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        first_line = f.readline()
+        if not FRONTMATTER_DELIMITER_LINE_REGEX.fullmatch(first_line):
+            return FrontmatterHeader(file_path)
+        yaml_lines = [f.readline()]
+        if yaml_lines[0].strip() and not yaml_lines[0].startswith("---"):
+            while True:
+                line = f.readline()
+                if not line:
+                    return FrontmatterHeader(file_path)
+                if FRONTMATTER_DELIMITER_LINE_REGEX.fullmatch(line):
+                    return FrontmatterHeader(file_path, "".join(yaml_lines)[:-1], body_offset=f.tell())
+                if not line.endswith("\n") and FRONTMATTER_LAST_DELIMITER_LINE_REGEX.fullmatch(line):
+                    return FrontmatterHeader(file_path, "".join(yaml_lines)[:-1], body="")
+                yaml_lines.append(line)
+        content = first_line + yaml_lines[0] + f.read()
+    block = match_frontmatter_block(content)
+    if block is None:
+        return FrontmatterHeader(file_path)
+    return FrontmatterHeader(file_path, block[0], body=block[1])
+
+# Permissions of files write_text_if_changed creates. Files it replaces keep their own.
+NEW_FILE_MODE = 0o644
+
+def write_text_if_changed(file_path: str, content: str) -> bool:
+    """
+    Writes text to a file only if its hash differs from the file already on disk,
+    so unchanged files keep their mtime. Changed files are written to a temporary
+    file in the same directory and renamed into place. Returns True if written.
+    """
+    # Encode as text mode would, so the comparison matches what ends up on disk.
+    new_bytes = content.replace("\n", os.linesep).encode("utf-8")
+    if os.path.exists(file_path):
+        with open(file_path, "rb") as f:
+            if hashlib.sha256(f.read()).digest() == hashlib.sha256(new_bytes).digest():
+                return False
+
+    directory = os.path.dirname(file_path) or "."
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(new_bytes)
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, temp_path)
+        else:
+            # mkstemp creates the file as 0600; give new files the usual permissions.
+            os.chmod(temp_path, NEW_FILE_MODE)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return True
+
+def write_markdown_file(file_path: str, frontmatter: dict, body: str) -> bool:
     """
     Combines frontmatter and body, then writes the content to a Markdown file.
+    Returns False without touching the file if its content would not change.
     """
-    frontmatter_yaml = yaml.dump(frontmatter, sort_keys=False).strip()
+    frontmatter_yaml = dump_frontmatter_yaml(frontmatter).strip()
     new_content = f"---\n{frontmatter_yaml}\n---\n\n{body}"
     new_content = re.sub(r'\n\n\n+', '\n\n', new_content).strip() + '\n'
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(new_content)
+    return write_text_if_changed(file_path, new_content)
 
-def clean_markdown_body(body: str, title: str) -> str:
+# Lines removed by clean_markdown_body. Each has to fit on one line, as the title
+# heading does; the old regexes also let '\s' run across a line break inside them.
+SEMANTIC_CONNECTIONS_HEADING_REGEX = re.compile(r"##\s*Semantic\s*Connections\s*")
+RELATED_LINKS_HEADING_REGEX = re.compile(r"##\s*Related\s*Links\s*", re.IGNORECASE)
+FOOTNOTES_HEADING_REGEX = re.compile(r"\s*#+\s*Footnotes\s*", re.IGNORECASE)
+LINK_ITEM_START_REGEX = re.compile(r"\s*-\s*\[\[")
+
+def _blank_runs(lines, keep_indent: bool = False):
     """
-    Removes existing Mermaid and Related Links sections from the body.
+    Yields (blank_lines, line) for every non-blank line of the stripped text, with
+    the blank lines before it. Each stage below reads its input this way.
+    'keep_indent' keeps the whitespace before the first line.
     """
-    mermaid_block_pattern = re.compile(
-        r'(?:\s*^##\s*Semantic\s*Connections\s*$\s*)?^\s*```mermaid\s*$\n.*?\n^\s*```\s*$', re.DOTALL | re.MULTILINE)
-    related_links_block_pattern = re.compile(
-        r'(?:\s*^##\s*Related\s*Links\s*$\s*)?(?:^\s*-\s*\[\[.*?\]\]\s*$\n)*', re.DOTALL | re.MULTILINE | re.IGNORECASE)
-    footnotes_header_pattern = re.compile(r'^\s*#+\s*Footnotes\s*$', re.MULTILINE | re.IGNORECASE)
+    pending, blank_lines = None, []
+    for line in lines:
+        if not line.strip():
+            if pending is not None:
+                blank_lines.append(line)
+        elif pending is None:
+            pending = ([], line if keep_indent else line.lstrip())
+        else:
+            yield pending
+            pending, blank_lines = (blank_lines, line), []
+    if pending is not None:
+        yield pending[0], pending[1].rstrip()
+
+def _lines(runs):
+    for blank_lines, line in runs:
+        yield from blank_lines
+        yield line
 
+def _remove_title_heading(lines, title: str):
+    """
+    Replaces the first '# <title>' line, matched case-insensitively, and the blank
+    lines around it with an empty line. Reads the body before it is stripped.
+    """
+    heading = re.compile(r"\s*#\s*" + re.escape(title) + r"\s*", re.IGNORECASE)
+    blank_title = not title.strip()
+    lines = iter(lines)
+    blank_lines = []
+    for line in lines:
+        content = line.lstrip()
+        if not content:
+            blank_lines.append(line)
+            continue
+        # A blank title can only match a heading with nothing but whitespace after the '#'.
+        if content.startswith("#") and (not blank_title or content[1:].isspace()) and heading.fullmatch(line):
+            yield ""
+            for line in lines:
+                if line.strip():
+                    yield line
+                    break
+            yield from lines
+            return
+        yield from blank_lines
+        yield line
+        blank_lines = []
+    yield from blank_lines
+
+def _read_mermaid_block(runs) -> tuple[list, list]:
+    """
+    Reads the runs after a '```mermaid' line and returns (block, rest): the runs up to
+    the '```' line that closes the block, and any read after it. The block closes at
+    the first '```' line after its first line, or at that first line itself if a
+    blank line separates it from the opening. 'block' is None if it never closes.
+    """
+    block = list(itertools.islice(runs, 1))
+    for run in runs:
+        block.append(run)
+        if run[1].strip() == "```":
+            return block, []
+    if block and block[0][0] and block[0][1].strip() == "```":
+        return block[:1], block[1:]
+    return None, block
+
+def _remove_mermaid_blocks(runs):
+    """
+    Replaces Mermaid blocks and the blank lines around them with an empty line. A
+    '## Semantic Connections' heading right before a block goes with it, and then
+    no empty line is left: the line after the block follows the line before the heading.
+    """
+    runs = iter(runs)
+    previous = None
+    # Whether the last block ended on an empty line: a block right after it then takes the newline in between.
+    merge = False
+    run = next(runs, None)
+    while run is not None:
+        blank_lines, line = run
+        heading = SEMANTIC_CONNECTIONS_HEADING_REGEX.fullmatch(line)
+        opening = next(runs, None) if heading else run
+        if opening is not None and opening[1].strip() == "```mermaid":
+            block, rest = _read_mermaid_block(runs)
+            if block is None:
+                # No block can close after this one, so the rest of the text is kept as it is.
+                if previous is not None:
+                    yield previous
+                yield from _lines([run, opening] if heading else [run])
+                yield from _lines(rest)
+                return
+            if heading:
+                previous = (previous or "").rstrip()
+            elif not merge:
+                if previous is not None:
+                    yield previous
+                previous = ""
+            runs = itertools.chain(rest, runs)
+            run = next(runs, None)
+            # The blank lines after the block go with it.
+            merge = run is not None and run[0][-1:] == [""]
+            if run is not None:
+                run = ([], run[1])
+            continue
+        if previous is not None:
+            yield previous
+        yield from blank_lines
+        previous, merge = line, False
+        run = opening if heading else next(runs, None)
+    if previous is not None:
+        yield previous
+
+def _read_link_item(run, runs) -> tuple:
+    """
+    Reads a '- [[...' item that starts at 'run' and returns (next_run, read). The
+    item runs to the first line ending in ']]', even a later one, and 'next_run' is
+    the run after it, or None if there is no such line with another after it. 'read'
+    holds the runs read past 'run'.
+    """
+    read = []
+    while not run[1].rstrip().endswith("]]"):
+        run = next(runs, None)
+        if run is None:
+            return None, read
+        read.append(run)
+    next_run = next(runs, None)
+    if next_run is None:
+        return None, read
+    return next_run, read
+
+def _remove_related_links(runs):
+    """
+    Removes '## Related Links' headings, with the whitespace around them, and every run
+    of '- [[...]]' items, under a heading or not. A heading joins the line before it
+    with the line after it, or with the items after it if they start the next line.
+    """
+    runs = iter(runs)
+    previous = None
+    # Whether the next line continues 'previous' because a removal took the newline before it.
+    joined = False
+    # Set once an item has no ']]' line end after it; no later item has one either.
+    items_possible = True
+    run = next(runs, None)
+    while run is not None:
+        blank_lines, line = run
+        if RELATED_LINKS_HEADING_REGEX.fullmatch(line):
+            previous = (previous or "").rstrip()
+            run = next(runs, None)
+            if run is not None and run[1][0].isspace():
+                # Items only count if they start the line; otherwise the heading takes the indentation too.
+                previous += run[1].lstrip()
+                joined, run = False, next(runs, None)
+            elif run is not None:
+                joined, run = True, ([], run[1])
+            continue
+        if items_possible and LINK_ITEM_START_REGEX.match(line):
+            next_run, read = _read_link_item(run, runs)
+            if next_run is not None:
+                if not joined:
+                    if previous is not None:
+                        yield previous
+                    previous = ""
+                # The blank lines after an item go with it, and the line after continues the removed items' line.
+                joined, run = True, ([], next_run[1])
+                continue
+            items_possible = False
+            runs = iter(read)
+        if joined:
+            previous += line
+        else:
+            if previous is not None:
+                yield previous
+            yield from blank_lines
+            previous = line
+        joined, run = False, next(runs, None)
+    if previous is not None:
+        yield previous
+
+def _remove_footnotes_headings(runs):
+    """Replaces Footnotes headings of any level and the blank lines around them with an empty line."""
+    previous = None
+    after_heading = False
+    for blank_lines, line in runs:
+        # The blank lines after a heading go with it; if the last is empty, a heading right after takes the newline.
+        merge = after_heading and blank_lines[-1:] == [""]
+        if after_heading:
+            blank_lines = []
+        after_heading = bool(FOOTNOTES_HEADING_REGEX.fullmatch(line))
+        if after_heading:
+            if not merge:
+                if previous is not None:
+                    yield previous
+                previous = ""
+            continue
+        if previous is not None:
+            yield previous
+        yield from blank_lines
+        previous = line
+    if previous is not None:
+        yield previous
+
+def clean_markdown_body(body: str, title: str) -> str:
+    """
+    Removes the title heading and existing Mermaid and Related Links sections from the body.
+    The lines are read once: each goes through the title, Mermaid, Related Links and
+    Footnotes stages in turn, and each stage only holds the lines it has not decided
+    on yet, so cleaning takes linear time. The stages reproduce the regex passes they
+    replaced, including where those joined lines.
+    The expected output is pinned by the fixtures in tests/fixtures/clean_markdown_body.
+    """
     if title:
-        title_heading_pattern = re.compile(
-            r'^\s*#\s*' + re.escape(title) + r'\s*$', 
-            re.MULTILINE | re.IGNORECASE
-        )
-        body = title_heading_pattern.sub('', body, count=1).strip()
-
-    body = mermaid_block_pattern.sub('', body).strip()
-    body = related_links_block_pattern.sub('', body).strip()
-    body = footnotes_header_pattern.sub('', body).strip()
-    body = re.sub(r'\n\s*\n', '\n\n', body).strip()
-    
-    return body
\ No newline at end of file
+        runs = _blank_runs(_remove_title_heading(body.split("\n"), title))
+    else:
+        # Without a title the Mermaid stage reads the body unstripped, and an indented heading is no heading.
+        runs = _blank_runs(body.split("\n"), keep_indent=True)
+    runs = _blank_runs(_remove_mermaid_blocks(runs))
+    runs = _blank_runs(_remove_related_links(runs))
+    runs = _blank_runs(_remove_footnotes_headings(runs))
+    # Runs of blank lines become a single empty line.
+    return "\n".join(_lines(([""] if blank_lines else [], line) for blank_lines, line in runs))
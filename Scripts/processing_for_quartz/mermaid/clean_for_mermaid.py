@@ -29,17 +29,18 @@ def get_entity_properties_for_mermaid(graph: Graph, entity_uri: str,
     Queries the graph for direct properties of a given entity and formats them
     as plain text for Mermaid node display.
     """
-    from ..rdf.rdf_helpers import get_uri_last_part  # Avoids circular import
+    from ..rdf.rdf_helpers import get_uri_last_part, get_term_last_part  # Avoids circular import
     properties_list = []
     entity_ref = URIRef(entity_uri)
     for s, p, o in graph.triples((entity_ref, None, None)):
         prop_name = get_uri_last_part(str(p))
-        prop_value = get_uri_last_part(str(o))
+        prop_value = get_term_last_part(o)
         if prop_name in LITERAL_PROPERTIES_FOR_NODE_DISPLAY and isinstance(o, Literal):
             properties_list.append(f"+ {prop_name}: {prop_value}")
         elif prop_name in LITERAL_PROPERTIES_FOR_NODE_DISPLAY and isinstance(o, URIRef):
             if prop_name not in RELATIONSHIP_PREDICATES and prop_name not in METADATA_PREDICATES:
                 properties_list.append(f"+ {prop_name}: {prop_value}")
     if properties_list:
-        return "<br>" + "<br>".join(properties_list)
+        # rdflib yields an entity's triples in no fixed order.
+        return "<br>" + "<br>".join(sorted(properties_list))
     return ""
\ No newline at end of file
@@ -1,6 +1,8 @@
 from rdflib import Graph, URIRef
 from .clean_for_mermaid import get_mermaid_safe_label, get_entity_properties_for_mermaid
 from .traverse_ttl_to_mermaid import traverse_ttl_to_mermaid
+from .node_cache import MermaidNodeCache
+from .neighbourhood_cache import NeighbourhoodCache
 from ..rdf.rdf_helpers import get_uri_last_part
 
 def generate_mermaid_syntax(current_page_title: str, 
@@ -13,9 +15,13 @@ def generate_mermaid_syntax(current_page_title: str,
                             LITERAL_PROPERTIES_FOR_NODE_DISPLAY_LOWER: set,
                             current_page_full_uri: URIRef,
                             should_skip_inverse_relationships: bool,
-                            max_layers: int) -> tuple[str, set]:
+                            max_layers: int,
+                            node_cache: MermaidNodeCache,
+                            neighbourhood_cache: NeighbourhoodCache) -> tuple[str, set, set]:
     """
     Generates a Mermaid graph syntax string based on a central entity and its relationships.
+    Returns the syntax, the node ids (URI last parts) and the full URIs of the rendered nodes.
+    The caches are build-scoped and shared by every page (see PageRenderContext).
     """
     predicates = {
         'RELATIONSHIP': RELATIONSHIP_PREDICATES,
@@ -28,7 +34,7 @@ def generate_mermaid_syntax(current_page_title: str,
 
     nodes_to_render, edges_to_render = traverse_ttl_to_mermaid(
         current_page_title, graph, predicates, current_page_full_uri,
-        should_skip_inverse_relationships, max_layers
+        should_skip_inverse_relationships, max_layers, node_cache, neighbourhood_cache
     )
 
     current_page_id = nodes_to_render[str(current_page_full_uri)]["id"]
@@ -40,8 +46,9 @@ def generate_mermaid_syntax(current_page_title: str,
         else:
             mermaid_syntax_lines.append(f"  {data['id']}[\"{data['label']}{data['props']}\"]")
     
-    for source_id, predicate_label, target_id in edges_to_render:
+    # Sorted, since the edges are collected in a set.
+    for source_id, predicate_label, target_id in sorted(edges_to_render):
         mermaid_syntax_lines.append(f"  {source_id}-->|\" {predicate_label} \"|{target_id}")
 
     final_node_ids = {get_uri_last_part(uri) for uri in nodes_to_render.keys()}
-    return "\n".join(mermaid_syntax_lines), final_node_ids
\ No newline at end of file
+    return "\n".join(mermaid_syntax_lines), final_node_ids, set(nodes_to_render.keys())
\ No newline at end of file
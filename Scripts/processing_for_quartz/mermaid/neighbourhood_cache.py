@@ -0,0 +1,61 @@
+from collections import OrderedDict
+from .node_cache import MermaidNodeCache
+from .relationship_adjacency import RelationshipAdjacency
+
+class NeighbourhoodCache:
+    """
+    Build-scoped LRU cache of one-hop expansions. The expansion of an entity is
+    its relationship edges (forward, then inverse unless skipped) with each
+    neighbour's URI, predicate label and, for nodes that may be drawn, its
+    resolved (label, Mermaid-safe label, properties). It does not depend on the
+    page or the layer the entity is reached at, so overlapping pages and deeper
+    layers reuse it. With 'max_size' set, the least recently used expansions are
+    evicted once more than 'max_size' are held; None keeps every expansion.
+    """
+    def __init__(self, adjacency: RelationshipAdjacency, node_cache: MermaidNodeCache, max_size: int = None):
+        if max_size is not None and max_size < 1:
+            raise ValueError(f"Neighbourhood cache size must be at least 1 or None, got {max_size}.")
+        self.adjacency = adjacency
+        self.node_cache = node_cache
+        self.max_size = max_size
+        self._hops = OrderedDict() if max_size is not None else {}
+        self.hits = 0
+        self.misses = 0
+
+    def _neighbour(self, is_forward: bool, node: int, predicate_label: str) -> tuple:
+        adjacency = self.adjacency
+        uri_str = adjacency.node_strs[node]
+        display = None
+        if adjacency.node_is_candidate[node]:
+            label, safe_label = self.node_cache.get_labels(adjacency.node_terms[node])
+            display = (label, safe_label, self.node_cache.get_properties(uri_str))
+        return is_forward, uri_str, predicate_label, display
+
+    def get_hop(self, node: int, skip_inverse: bool) -> list[tuple]:
+        """Returns the (is_forward, neighbour URI, predicate label, display or None) entries of a node."""
+        key = (node, skip_inverse)
+        hops = self._hops
+        try:
+            hop = hops[key]
+        except KeyError:
+            self.misses += 1
+            hop = [self._neighbour(True, target, predicate_label)
+                   for target, predicate_label in self.adjacency.forward_edges(node)]
+            if not skip_inverse:
+                hop += [self._neighbour(False, source, predicate_label)
+                        for source, predicate_label in self.adjacency.inverse_edges(node)]
+            hops[key] = hop
+            if self.max_size is not None and len(hops) > self.max_size:
+                hops.popitem(last=False)
+            return hop
+        self.hits += 1
+        if self.max_size is not None:
+            hops.move_to_end(key)
+        return hop
+
+    def stats(self) -> tuple[int, int]:
+        """Returns the (hits, misses) counters."""
+        return self.hits, self.misses
+
+    def __len__(self) -> int:
+        return len(self._hops)
@@ -0,0 +1,51 @@
+from rdflib import Graph, URIRef
+from ..rdf.rdf_helpers import find_label_for_uri
+from .clean_for_mermaid import get_mermaid_safe_label, get_entity_properties_for_mermaid
+
+class MermaidNodeCache:
+    """
+    Build-scoped cache of what a Mermaid node shows for an entity: its resolved
+    label, its sanitized Mermaid label and its rendered property string. Values
+    are computed on first use and shared by every page rendered in the run, so
+    hub entities are only queried once. The predicate sets must not change while
+    the cache is in use.
+    """
+    def __init__(self, graph: Graph, RELATIONSHIP_PREDICATES: set, METADATA_PREDICATES: set,
+                 LITERAL_PROPERTIES_FOR_NODE_DISPLAY: set):
+        self.graph = graph
+        self.RELATIONSHIP_PREDICATES = RELATIONSHIP_PREDICATES
+        self.METADATA_PREDICATES = METADATA_PREDICATES
+        self.LITERAL_PROPERTIES_FOR_NODE_DISPLAY = LITERAL_PROPERTIES_FOR_NODE_DISPLAY
+        self._labels = {}
+        self._properties = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_labels(self, entity) -> tuple[str, str]:
+        """Returns the (label, Mermaid-safe label) of an entity term."""
+        try:
+            labels = self._labels[entity]
+            self.hits += 1
+        except KeyError:
+            self.misses += 1
+            label = find_label_for_uri(entity, self.graph)
+            labels = (label, get_mermaid_safe_label(label))
+            self._labels[entity] = labels
+        return labels
+
+    def get_properties(self, entity_uri: str) -> str:
+        """Returns the rendered property string of an entity, as 'get_entity_properties_for_mermaid' would."""
+        try:
+            properties = self._properties[entity_uri]
+            self.hits += 1
+        except KeyError:
+            self.misses += 1
+            properties = get_entity_properties_for_mermaid(
+                self.graph, entity_uri, self.RELATIONSHIP_PREDICATES, self.METADATA_PREDICATES,
+                self.LITERAL_PROPERTIES_FOR_NODE_DISPLAY)
+            self._properties[entity_uri] = properties
+        return properties
+
+    def stats(self) -> tuple[int, int]:
+        """Returns the (hits, misses) counters."""
+        return self.hits, self.misses
@@ -0,0 +1,115 @@
+from array import array
+from rdflib import Graph, URIRef, Literal
+from ..rdf.rdf_helpers import get_uri_term
+from ..rdf.parse_graph import PredicateCatalogue
+
+try:
+    import numpy as np
+except ImportError:  # Plain Python arrays behave the same, just with a little more overhead
+    np = None
+
+def _int_array(values: list[int]):
+    if np is not None:
+        return np.asarray(values, dtype=np.int32)
+    return array("i", values)
+
+class RelationshipAdjacency:
+    """
+    Compressed sparse row (CSR) adjacency of the relationship edges of a graph,
+    built once per run. Every subject and object of a relationship edge gets an
+    integer id; the forward arrays hold each node's outgoing edges and the inverse
+    arrays its incoming edges, with predicates already filtered to the relationship
+    set. Each row is sorted by predicate label, then neighbour URI. rdflib yields a
+    node's edges in an order that depends on the hash seed and on the order triples
+    were added, so sorted rows keep diagrams the same from run to run and after a
+    TTL file is reloaded in watch mode. The distinct predicates are taken from the
+    graph's PredicateCatalogue instead of a scan of every triple. Uses NumPy arrays
+    when NumPy is installed.
+    """
+    def __init__(self, graph: Graph, predicate_catalogue: PredicateCatalogue,
+                 RELATIONSHIP_PREDICATES: set, METADATA_PREDICATES: set,
+                 RELATIONSHIP_PREDICATES_LOWER: set, METADATA_PREDICATES_LOWER: set):
+        self.node_index = {}
+        self.node_terms = []
+
+        # Predicates whose last part is a relationship and not metadata, as traversal checks per edge.
+        predicate_index = {}
+        self.predicate_labels = []
+        for predicate_uri, predicate_label in predicate_catalogue.predicate_labels.items():
+            if predicate_label in RELATIONSHIP_PREDICATES and predicate_label not in METADATA_PREDICATES:
+                predicate_index[URIRef(predicate_uri)] = len(self.predicate_labels)
+                self.predicate_labels.append(predicate_label)
+
+        # Ordered sets of the nodes with outgoing and incoming relationship edges.
+        subjects, objects = {}, {}
+        for predicate in predicate_index:
+            for s, o in graph.subject_objects(predicate):
+                subjects[self._intern(s)] = None
+                objects[self._intern(o)] = None
+
+        forward_rows = {}
+        for subject_node in subjects:
+            forward_rows[subject_node] = [
+                (self.node_index[o], predicate_index[p])
+                for p, o in graph.predicate_objects(self.node_terms[subject_node]) if p in predicate_index]
+        inverse_rows = {}
+        for object_node in objects:
+            inverse_rows[object_node] = [
+                (self.node_index[s], predicate_index[p])
+                for s, p in graph.subject_predicates(self.node_terms[object_node]) if p in predicate_index]
+        predicate_uris = list(predicate_index)
+        def edge_key(edge: tuple) -> tuple:
+            other_node, predicate = edge
+            return self.predicate_labels[predicate], str(self.node_terms[other_node]), str(predicate_uris[predicate])
+        for rows in (forward_rows, inverse_rows):
+            for row in rows.values():
+                row.sort(key=edge_key)
+        self._forward_indptr, self._forward_nodes, self._forward_predicates = self._build_csr(forward_rows)
+        self._inverse_indptr, self._inverse_nodes, self._inverse_predicates = self._build_csr(inverse_rows)
+
+        self.node_strs = [str(term) for term in self.node_terms]
+        # Whether a node may be added to a diagram at all; the per-page checks are done during traversal.
+        self.node_is_candidate = [
+            not isinstance(term, Literal) and
+            get_uri_term(term_str)[1] not in METADATA_PREDICATES_LOWER and
+            get_uri_term(term_str)[1] not in RELATIONSHIP_PREDICATES_LOWER
+            for term, term_str in zip(self.node_terms, self.node_strs)
+        ]
+
+    def _intern(self, term) -> int:
+        node = self.node_index.get(term)
+        if node is None:
+            node = self.node_index[term] = len(self.node_terms)
+            self.node_terms.append(term)
+        return node
+
+    def _build_csr(self, rows: dict) -> tuple:
+        indptr, nodes, predicates = [0], [], []
+        for node in range(len(self.node_terms)):
+            for other_node, predicate in rows.get(node, ()):
+                nodes.append(other_node)
+                predicates.append(predicate)
+            indptr.append(len(nodes))
+        return _int_array(indptr), _int_array(nodes), _int_array(predicates)
+
+    def __len__(self) -> int:
+        return len(self.node_terms)
+
+    def edge_count(self) -> int:
+        return len(self._forward_nodes)
+
+    def lookup(self, uri_str: str):
+        """Returns the node id of a URI, or None if it has no relationship edges."""
+        return self.node_index.get(URIRef(uri_str))
+
+    def forward_edges(self, node: int) -> list[tuple[int, str]]:
+        """Returns the (target node, predicate label) pairs of a node's outgoing relationship edges."""
+        start, end = self._forward_indptr[node], self._forward_indptr[node + 1]
+        return list(zip(self._forward_nodes[start:end].tolist(),
+                        [self.predicate_labels[p] for p in self._forward_predicates[start:end].tolist()]))
+
+    def inverse_edges(self, node: int) -> list[tuple[int, str]]:
+        """Returns the (source node, predicate label) pairs of a node's incoming relationship edges."""
+        start, end = self._inverse_indptr[node], self._inverse_indptr[node + 1]
+        return list(zip(self._inverse_nodes[start:end].tolist(),
+                        [self.predicate_labels[p] for p in self._inverse_predicates[start:end].tolist()]))
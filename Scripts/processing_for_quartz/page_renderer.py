@@ -0,0 +1,181 @@
+import os
+import time
+import multiprocessing
+from rdflib import Graph, URIRef
+from .markdown.read_write_clean_md import read_markdown_file, clean_markdown_body
+from .markdown.generate_md_body import generate_body_content, update_frontmatter
+from .mermaid.generate_mermaid import generate_mermaid_syntax
+from .mermaid.node_cache import MermaidNodeCache
+from .mermaid.relationship_adjacency import RelationshipAdjacency
+from .mermaid.neighbourhood_cache import NeighbourhoodCache
+from .rdf.rdf_helpers import find_uri_for_filename, get_subclass_depth, compute_subclass_depths
+from .rdf.hierarchy_closure import TransitiveClosure
+from .rdf.parse_graph import PredicateCatalogue
+
+GENERIC_ROOT_CLASSES = {
+    URIRef("https://schema.org/Thing"),
+    URIRef("http://www.w3.org/2002/07/owl#Thing"),
+    URIRef("http://www.w3.org/2000/01/rdf-schema#Resource"),
+}
+RDF_TYPE = URIRef("http://www.w3.org/1999/02/22-rdf-syntax-ns#type")
+RDFS_CLASS = URIRef("http://www.w3.org/2000/01/rdf-schema#Class")
+
+class PageRenderContext:
+    """
+    Everything needed to render a page once the graph is loaded: the graph, its
+    predicate catalogue and six predicate sets, the filename index and the source
+    basenames. Apart from the build-scoped node and neighbourhood caches it is
+    only read while rendering, so forked workers can share it. Class depths are
+    looked up in 'subclass_closure' when one is given, as a watch session keeps its
+    rdfs:subClassOf closure up to date between changes.
+    """
+    def __init__(self, graph: Graph, predicate_catalogue: PredicateCatalogue, filename_uri_index: dict,
+                 all_source_markdown_basenames_lower: set, draft_status: bool, base_uri: str,
+                 neighbourhood_cache_size: int = None, subclass_closure: TransitiveClosure = None):
+        self.graph = graph
+        self.predicate_catalogue = predicate_catalogue
+        self.predicate_sets = predicate_catalogue.predicate_sets
+        self.filename_uri_index = filename_uri_index
+        self.all_source_markdown_basenames_lower = all_source_markdown_basenames_lower
+        self.draft_status = draft_status
+        self.base_uri = base_uri
+        self.node_cache = MermaidNodeCache(graph, self.predicate_sets[0], self.predicate_sets[1], self.predicate_sets[2])
+        # Without a closure, class depths are computed once for the whole run, as is rdfs:Class membership.
+        self.subclass_closure = subclass_closure
+        self.subclass_depths = compute_subclass_depths(graph, GENERIC_ROOT_CLASSES) if subclass_closure is None else None
+        self.rdfs_classes = set(graph.subjects(RDF_TYPE, RDFS_CLASS))
+        # Set by the pipeline when --profile is on; adds timings and diagram sizes to each result.
+        self.profile_pages = False
+        self.neighbourhood_cache_size = neighbourhood_cache_size
+        self._adjacency = None
+        self._neighbourhood_cache = None
+
+    @property
+    def adjacency(self) -> RelationshipAdjacency:
+        """The relationship adjacency used for diagram traversal, built the first time a page is rendered."""
+        if self._adjacency is None:
+            RELATIONSHIP_PREDICATES, METADATA_PREDICATES, _, RELATIONSHIP_PREDICATES_LOWER, METADATA_PREDICATES_LOWER, _ = self.predicate_sets
+            self._adjacency = RelationshipAdjacency(self.graph, self.predicate_catalogue,
+                                                    RELATIONSHIP_PREDICATES, METADATA_PREDICATES,
+                                                    RELATIONSHIP_PREDICATES_LOWER, METADATA_PREDICATES_LOWER)
+        return self._adjacency
+
+    @property
+    def neighbourhood_cache(self) -> NeighbourhoodCache:
+        if self._neighbourhood_cache is None:
+            self._neighbourhood_cache = NeighbourhoodCache(self.adjacency, self.node_cache, self.neighbourhood_cache_size)
+        return self._neighbourhood_cache
+
+    def resolve_uri(self, filename: str) -> URIRef:
+        return find_uri_for_filename(filename, self.graph, self.base_uri, self.filename_uri_index)
+
+    def resolve_page_scope(self, filename: str) -> tuple[URIRef, bool]:
+        """Returns the page URI and whether its inverse relationships should be skipped."""
+        # Determine the URI and class depth
+        file_uri_ref = self.resolve_uri(filename)
+        if self.subclass_closure is not None:
+            class_depth = get_subclass_depth(file_uri_ref, self.graph, GENERIC_ROOT_CLASSES, self.subclass_closure)
+        else:
+            class_depth = self.subclass_depths.get(file_uri_ref, -1)
+        is_rdfs_class = file_uri_ref in self.rdfs_classes
+        should_skip_inverse_relationships = (class_depth <= 1 and class_depth != -1) or is_rdfs_class
+        return file_uri_ref, should_skip_inverse_relationships
+
+def render_page(md_file_path: str, context: PageRenderContext) -> dict:
+    """
+    Renders one Markdown page: cleans the body, generates the Mermaid diagram and
+    related links, and updates the frontmatter. Nothing is written to disk.
+    """
+    RELATIONSHIP_PREDICATES, METADATA_PREDICATES, LITERAL_PROPERTIES_FOR_NODE_DISPLAY, \
+    RELATIONSHIP_PREDICATES_LOWER, METADATA_PREDICATES_LOWER, LITERAL_PROPERTIES_FOR_NODE_DISPLAY_LOWER = context.predicate_sets
+
+    start = time.perf_counter() if context.profile_pages else None
+    filename_with_ext = os.path.basename(md_file_path)
+    filename = os.path.splitext(filename_with_ext)[0]
+    file_uri_ref, should_skip_inverse_relationships = context.resolve_page_scope(filename)
+    node_cache_hits, node_cache_misses = context.node_cache.stats()
+    neighbourhood_cache_hits, neighbourhood_cache_misses = context.neighbourhood_cache.stats()
+
+    # Read, clean, and process the file
+    existing_frontmatter, raw_markdown_body = read_markdown_file(md_file_path)
+
+    clean_body = clean_markdown_body(raw_markdown_body, existing_frontmatter.get("title", filename))
+
+    # Generate Mermaid syntax and get related entities
+    # The mermaid_layers variable must be an integer from your frontmatter.
+    mermaid_layers = existing_frontmatter.get("mermaid_layers", 1)
+
+    mermaid_syntax_content, graph_node_ids, graph_node_uris = generate_mermaid_syntax(
+        current_page_title=existing_frontmatter.get("title", filename),
+        graph=context.graph,
+        RELATIONSHIP_PREDICATES=RELATIONSHIP_PREDICATES,
+        METADATA_PREDICATES=METADATA_PREDICATES,
+        LITERAL_PROPERTIES_FOR_NODE_DISPLAY=LITERAL_PROPERTIES_FOR_NODE_DISPLAY,
+        RELATIONSHIP_PREDICATES_LOWER=RELATIONSHIP_PREDICATES_LOWER,
+        METADATA_PREDICATES_LOWER=METADATA_PREDICATES_LOWER,
+        LITERAL_PROPERTIES_FOR_NODE_DISPLAY_LOWER=LITERAL_PROPERTIES_FOR_NODE_DISPLAY_LOWER,
+        current_page_full_uri=file_uri_ref,
+        should_skip_inverse_relationships=should_skip_inverse_relationships,
+        max_layers=mermaid_layers,
+        node_cache=context.node_cache,
+        neighbourhood_cache=context.neighbourhood_cache
+    )
+
+    # Generate new body content (Mermaid and wikilinks)
+    body_append_content = generate_body_content(
+        mermaid_syntax_content, graph_node_ids, context.all_source_markdown_basenames_lower)
+
+    # Update frontmatter
+    updated_frontmatter = update_frontmatter(
+        existing_frontmatter, context.graph, filename, graph_node_ids, file_uri_ref,
+        context.draft_status, context.base_uri, context.filename_uri_index)
+
+    result = {
+        "frontmatter": updated_frontmatter,
+        "body": clean_body + body_append_content,
+        "page_uri": file_uri_ref,
+        "skip_inverse": should_skip_inverse_relationships,
+        "node_ids": graph_node_ids,
+        "node_uris": graph_node_uris,
+        # Counter deltas, so the parent can total cache use across forked workers.
+        "node_cache_hits": context.node_cache.hits - node_cache_hits,
+        "node_cache_misses": context.node_cache.misses - node_cache_misses,
+        "neighbourhood_cache_hits": context.neighbourhood_cache.hits - neighbourhood_cache_hits,
+        "neighbourhood_cache_misses": context.neighbourhood_cache.misses - neighbourhood_cache_misses,
+    }
+    if context.profile_pages:
+        result["render_seconds"] = time.perf_counter() - start
+        result["node_count"] = len(graph_node_uris)
+        # One 'graph TD' line, one line per node, the rest are edges.
+        result["edge_count"] = mermaid_syntax_content.count("\n") - len(graph_node_uris)
+    return result
+
+# Set in the parent right before forking so workers inherit it instead of unpickling the graph.
+_worker_context = None
+
+def _render_page_in_worker(md_file_path: str) -> dict:
+    return render_page(md_file_path, _worker_context)
+
+def render_pages(md_file_paths: list[str], context: PageRenderContext, jobs: int = 1, batch_size: int = 16):
+    """
+    Renders pages and yields (md_file_path, result) pairs in input order. With
+    jobs > 1 the pages are rendered in batches by a pool of forked workers that
+    share the loaded graph. Rendering is identical either way, and forked workers
+    inherit the parent's hash seed, so the output is byte-identical to jobs=1.
+    """
+    global _worker_context
+    if jobs > 1 and len(md_file_paths) > 1:
+        if "fork" not in multiprocessing.get_all_start_methods():
+            print("Process forking is not available on this platform. Rendering pages serially.")
+        else:
+            # Build the adjacency before forking so every worker shares it.
+            context.neighbourhood_cache
+            _worker_context = context
+            try:
+                with multiprocessing.get_context("fork").Pool(jobs) as pool:
+                    yield from zip(md_file_paths, pool.imap(_render_page_in_worker, md_file_paths, chunksize=batch_size))
+            finally:
+                _worker_context = None
+            return
+    for md_file_path in md_file_paths:
+        yield md_file_path, render_page(md_file_path, context)
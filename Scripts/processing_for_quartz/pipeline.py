@@ -0,0 +1,241 @@
+import os
+import glob
+import time
+from contextlib import nullcontext
+from .markdown.read_write_clean_md import write_markdown_file
+from .markdown.frontmatter_sync import update_source_yaml_with_related_entities
+from .rdf.parse_graph import load_predicate_catalogue
+from .rdf.graph_cache import (ttl_cache_keys, load_parsed_ttl_files, build_graph_from_parsed_files,
+                              build_dataset_from_parsed_files, graph_cache_key)
+from .rdf.rdf_helpers import build_filename_uri_index
+from .page_renderer import PageRenderContext, render_pages
+from .copy_strategies import stage_source_file
+from .stage_timer import StageTimer
+from .profiling import PipelineProfiler
+from .build_manifest import (hash_file, compute_build_digest, load_build_manifest, save_build_manifest,
+                             DependencyDigests, build_page_entry, is_page_up_to_date)
+from .config import (DRAFT_STATUS, BASE_URI, GRAPH_CACHE_DIR, TTL_PARSE_JOBS, BUILD_MANIFEST_PATH, COPY_STRATEGY,
+                     NEIGHBOURHOOD_CACHE_SIZE, DATASET_MODE)
+
+def _untimed_stage(name: str):
+    return nullcontext()
+
+def _hit_ratio(hits: int, misses: int) -> float:
+    return hits / (hits + misses) if hits + misses else 0.0
+
+class Pipeline:
+    """
+    The stages of the preprocessing and synchronization workflow and the state they
+    share: the loaded graph, the predicate sets, the render context and the manifest
+    entry of every page. run() runs every stage once. The watch mode keeps the
+    object between runs and only repeats the stages a change affects.
+    """
+    def __init__(self, source_dir: str, destination_dir: str, ttl_dir: str, *, full_rebuild: bool = False,
+                 jobs: int = 1, copy_strategy: str = COPY_STRATEGY, graph_cache_dir: str = GRAPH_CACHE_DIR,
+                 parse_jobs: int = TTL_PARSE_JOBS, manifest_path: str = BUILD_MANIFEST_PATH,
+                 stage_timer: StageTimer = None, dataset_mode: bool = DATASET_MODE):
+        self.source_dir = source_dir
+        self.destination_dir = destination_dir
+        self.ttl_dir = ttl_dir
+        self.full_rebuild = full_rebuild
+        self.jobs = jobs
+        self.copy_strategy = copy_strategy
+        self.graph_cache_dir = graph_cache_dir
+        self.parse_jobs = parse_jobs
+        self.manifest_path = manifest_path
+        # Load each TTL file into its own named graph of a Dataset instead of one merged Graph.
+        self.dataset_mode = dataset_mode
+        self.stage = stage_timer.stage if stage_timer is not None else _untimed_stage
+        self.profiler = stage_timer if isinstance(stage_timer, PipelineProfiler) else None
+
+        self.ttl_files = []
+        self.ttl_cache_keys = {}
+        self.graph = None
+        self.predicate_catalogue = None
+        self.predicate_sets = None
+        self.all_source_markdown_basenames_lower = set()
+        self.render_context = None
+        # The rdfs:subClassOf closure a watch session keeps up to date; a full run computes class depths once.
+        self.subclass_closure = None
+        self.build_digest = None
+        self.previous_pages = {}
+        self.dependency_digests = None
+        self.manifest_pages = {}
+        self.source_hashes = {}
+        # Maps the path each page is read from to the destination path it is written to.
+        self.pages_to_render = {}
+
+    def load_graph(self):
+        # 1. Setup and RDF Graph Loading
+        os.makedirs(self.destination_dir, exist_ok=True)
+
+        # Sorted, so the triples go into the graph in the same order on every machine and run.
+        self.ttl_files = sorted(glob.glob(os.path.join(self.ttl_dir, "**/*.ttl"), recursive=True))
+        self.ttl_cache_keys = ttl_cache_keys(self.ttl_files)
+        parsed_ttl_files = load_parsed_ttl_files(self.ttl_files, self.graph_cache_dir, self.parse_jobs,
+                                                 self.ttl_cache_keys)
+        build_graph = build_dataset_from_parsed_files if self.dataset_mode else build_graph_from_parsed_files
+        self.graph = build_graph(self.ttl_files, parsed_ttl_files)
+        self.keep_ttl_triples(parsed_ttl_files)
+
+    def keep_ttl_triples(self, parsed_ttl_files: dict):
+        """Called with the parsed triples of every TTL file once they are in the graph. A full run keeps none."""
+        pass
+
+    def load_predicates(self):
+        # 2. Get Predicate Sets, cached with the parsed TTL files
+        self.predicate_catalogue = load_predicate_catalogue(
+            self.graph, self.graph_cache_dir, graph_cache_key(self.ttl_files, self.ttl_cache_keys))
+        self.predicate_sets = self.predicate_catalogue.predicate_sets
+
+    def build_indexes(self):
+        # 3. Pre-collect source file names
+        all_source_markdown_basenames_lower = set()
+        for md_file_path_in_source in glob.glob(os.path.join(self.source_dir, "**/*.md"), recursive=True):
+            filename_no_ext = os.path.splitext(os.path.basename(md_file_path_in_source))[0].lower()
+            all_source_markdown_basenames_lower.add(filename_no_ext)
+        self.all_source_markdown_basenames_lower = all_source_markdown_basenames_lower
+
+        filename_uri_index = build_filename_uri_index(self.graph)
+        self.render_context = PageRenderContext(
+            self.graph, self.predicate_catalogue, filename_uri_index, all_source_markdown_basenames_lower,
+            DRAFT_STATUS, BASE_URI, NEIGHBOURHOOD_CACHE_SIZE, self.subclass_closure)
+        self.render_context.profile_pages = self.profiler is not None
+
+        RELATIONSHIP_PREDICATES, METADATA_PREDICATES, LITERAL_PROPERTIES_FOR_NODE_DISPLAY, _, _, _ = self.predicate_sets
+        self.build_digest = compute_build_digest(
+            RELATIONSHIP_PREDICATES, METADATA_PREDICATES, LITERAL_PROPERTIES_FOR_NODE_DISPLAY, DRAFT_STATUS, BASE_URI)
+        self.dependency_digests = DependencyDigests(self.graph)
+
+    def is_up_to_date(self, relative_path: str, source_hash: str) -> bool:
+        filename = os.path.splitext(os.path.basename(relative_path))[0]
+        file_uri_ref, should_skip_inverse_relationships = self.render_context.resolve_page_scope(filename)
+        return is_page_up_to_date(
+            self.previous_pages.get(relative_path), source_hash, os.path.join(self.destination_dir, relative_path),
+            file_uri_ref, should_skip_inverse_relationships, self.all_source_markdown_basenames_lower,
+            self.render_context.resolve_uri, self.dependency_digests)
+
+    def plan_source_page(self, relative_path: str):
+        """Keeps the manifest entry of a source page that is up to date, or stages it for rendering."""
+        md_file_path_src = os.path.join(self.source_dir, relative_path)
+        source_hash = hash_file(md_file_path_src)
+        self.source_hashes[relative_path] = source_hash
+        previous_entry = self.previous_pages.get(relative_path)
+        if previous_entry is not None and self.is_up_to_date(relative_path, source_hash):
+            self.manifest_pages[relative_path] = previous_entry
+            return
+        dest_file_path = os.path.join(self.destination_dir, relative_path)
+        read_path = stage_source_file(md_file_path_src, dest_file_path, self.copy_strategy, source_hash,
+                                      previous_entry["source_hash"] if previous_entry is not None else None)
+        self.pages_to_render[read_path] = dest_file_path
+
+    def plan_destination_page(self, relative_path: str):
+        """Same as plan_source_page for a page that only exists in the destination folder."""
+        # Pages that only exist in the destination have no source hash to compare.
+        if self.previous_pages and self.is_up_to_date(relative_path, None):
+            self.manifest_pages[relative_path] = self.previous_pages[relative_path]
+            return
+        md_file_path_in_dest = os.path.join(self.destination_dir, relative_path)
+        self.pages_to_render[md_file_path_in_dest] = md_file_path_in_dest
+
+    def plan_pages(self, previous_pages: dict = None):
+        # 4. Stage changed source files for processing (see copy_strategies.py)
+        if previous_pages is None:
+            previous_pages = {} if self.full_rebuild else load_build_manifest(self.manifest_path, self.build_digest)
+        self.previous_pages = previous_pages
+        self.manifest_pages = {}
+        self.source_hashes = {}
+        self.pages_to_render = {}
+        for md_file_path_src in glob.glob(os.path.join(self.source_dir, "**/*.md"), recursive=True):
+            self.plan_source_page(os.path.relpath(md_file_path_src, self.source_dir))
+
+        # Pages that only exist in the destination folder are processed in place
+        for md_file_path_in_dest in glob.glob(os.path.join(self.destination_dir, "**/*.md"), recursive=True):
+            relative_path = os.path.relpath(md_file_path_in_dest, self.destination_dir)
+            if relative_path not in self.source_hashes:
+                self.plan_destination_page(relative_path)
+
+    def render(self):
+        # 5. Process each changed Markdown file
+        node_cache_hits = node_cache_misses = 0
+        neighbourhood_cache_hits = neighbourhood_cache_misses = 0
+        written_count = 0
+        render_context = self.render_context
+        for read_path, page in render_pages(list(self.pages_to_render), render_context, self.jobs):
+            md_file_path_in_dest = self.pages_to_render[read_path]
+            node_cache_hits += page["node_cache_hits"]
+            node_cache_misses += page["node_cache_misses"]
+            neighbourhood_cache_hits += page["neighbourhood_cache_hits"]
+            neighbourhood_cache_misses += page["neighbourhood_cache_misses"]
+
+            # Write the final file
+            write_start = time.perf_counter() if self.profiler else None
+            if write_markdown_file(md_file_path_in_dest, page["frontmatter"], page["body"]):
+                written_count += 1
+            if self.profiler:
+                self.profiler.record_page(os.path.relpath(md_file_path_in_dest, self.destination_dir),
+                                          page["render_seconds"], time.perf_counter() - write_start,
+                                          page["node_count"], page["edge_count"])
+
+            # Record what the page was built from for the next incremental run
+            relative_path = os.path.relpath(md_file_path_in_dest, self.destination_dir)
+            graph_node_ids = page["node_ids"]
+            node_uris = {node_id: str(render_context.resolve_uri(node_id)) for node_id in graph_node_ids}
+            linked_node_ids = [node_id for node_id in graph_node_ids
+                               if node_id.lower() in self.all_source_markdown_basenames_lower]
+            dependencies = page["node_uris"] | set(page["frontmatter"]["entities"]) | {str(page["page_uri"])}
+            self.manifest_pages[relative_path] = build_page_entry(
+                self.source_hashes.get(relative_path), md_file_path_in_dest, page["page_uri"], page["skip_inverse"],
+                node_uris, linked_node_ids, dependencies, self.dependency_digests, page["frontmatter"]["entities"])
+
+        print(f"Regenerated {len(self.pages_to_render)} pages, "
+              f"{len(self.manifest_pages) - len(self.pages_to_render)} were up to date.")
+        print(f"Wrote {written_count} pages, skipped {len(self.pages_to_render) - written_count} with unchanged content.")
+        print(f"Mermaid node cache: {node_cache_hits} hits, {node_cache_misses} misses "
+              f"({_hit_ratio(node_cache_hits, node_cache_misses):.1%} hit ratio).")
+        print(f"Mermaid neighbourhood cache: {neighbourhood_cache_hits} hits, {neighbourhood_cache_misses} misses "
+              f"({_hit_ratio(neighbourhood_cache_hits, neighbourhood_cache_misses):.1%} hit ratio).")
+
+    def sync(self, relative_paths: set = None) -> list[str]:
+        """
+        Step 6: synchronizes frontmatter back to the source files, or only to those of
+        'relative_paths'. Returns the relative paths of the source files rewritten.
+        """
+        # Every destination page has a manifest entry, rendered or not, so the sync needs no scan of the destination.
+        entities_by_page = {relative_path: entry["entities"] for relative_path, entry in self.manifest_pages.items()}
+        return update_source_yaml_with_related_entities(self.source_dir, self.destination_dir, entities_by_page,
+                                                        relative_paths)
+
+    def record_synced_source_hashes(self, synced_paths: list[str]):
+        # The sync only rewrites the 'related' key, which does not affect the generated
+        # pages, so record the source hashes as they are after the sync.
+        for relative_path in synced_paths:
+            entry = self.manifest_pages[relative_path]
+            if entry["source_hash"] is not None:
+                entry["source_hash"] = self.source_hashes[relative_path] = hash_file(
+                    os.path.join(self.source_dir, relative_path))
+
+    def save_manifest(self, synced_paths: list[str] = ()):
+        self.record_synced_source_hashes(synced_paths)
+        save_build_manifest(self.manifest_path, self.build_digest, self.manifest_pages)
+
+    def run(self):
+        """
+        Runs every stage. By default only pages whose source file or dependent triples
+        changed since the last run are regenerated.
+        """
+        with self.stage("load"):
+            self.load_graph()
+        with self.stage("predicates"):
+            self.load_predicates()
+        with self.stage("indexes"):
+            self.build_indexes()
+        with self.stage("copy"):
+            self.plan_pages()
+        with self.stage("render"):
+            self.render()
+        print("Preprocessing complete!")
+        with self.stage("sync"):
+            synced_paths = self.sync()
+        with self.stage("manifest"):
+            self.save_manifest(synced_paths)
@@ -0,0 +1,92 @@
+import os
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from .stage_timer import StageTimer
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+class PipelineProfiler(StageTimer):
+    """
+    A StageTimer that also records the peak traced memory of each stage and the
+    render time, write time and diagram size of each page. Memory is traced with
+    tracemalloc, which slows the run down, so wall times taken with the profiler
+    are only comparable with each other. Pages rendered by forked workers (--jobs)
+    are timed in the worker, but their allocations are not traced.
+    """
+    def __init__(self, slowest_page_count: int = 25):
+        super().__init__()
+        self.slowest_page_count = slowest_page_count
+        self.peak_memory = {}
+        self.memory_growth = {}
+        self.pages = []
+
+    def start(self):
+        tracemalloc.start()
+
+    def stop(self):
+        tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str):
+        tracemalloc.reset_peak()
+        current_before = tracemalloc.get_traced_memory()[0]
+        with super().stage(name):
+            yield
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak_memory[name] = max(self.peak_memory.get(name, 0), peak)
+        self.memory_growth[name] = self.memory_growth.get(name, 0) + current - current_before
+
+    def record_page(self, page_path: str, render_seconds: float, write_seconds: float, node_count: int, edge_count: int):
+        self.pages.append({
+            "path": page_path,
+            "seconds": round(render_seconds + write_seconds, 6),
+            "render_seconds": round(render_seconds, 6),
+            "write_seconds": round(write_seconds, 6),
+            "nodes": node_count,
+            "edges": edge_count,
+        })
+
+    def report(self) -> dict:
+        """Returns the profile as a JSON-serializable dict."""
+        render_seconds = [page["render_seconds"] for page in self.pages]
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "total_seconds": round(self.total(), 4),
+            "stages": {
+                name: {
+                    "seconds": round(seconds, 4),
+                    "peak_memory_mb": round(self.peak_memory.get(name, 0) / 2**20, 2),
+                    "memory_growth_mb": round(self.memory_growth.get(name, 0) / 2**20, 2),
+                }
+                for name, seconds in self.stages.items()
+            },
+            "pages": {
+                "count": len(self.pages),
+                "render_seconds_total": round(sum(render_seconds), 4),
+                "render_seconds_mean": round(sum(render_seconds) / len(render_seconds), 6) if render_seconds else None,
+                "write_seconds_total": round(sum(page["write_seconds"] for page in self.pages), 4),
+            },
+            "slowest_pages": sorted(self.pages, key=lambda page: page["seconds"], reverse=True)[:self.slowest_page_count],
+        }
+        if resource is not None:
+            # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            report["max_rss_mb"] = round(max_rss / (2**20 if os.uname().sysname == "Darwin" else 2**10), 2)
+        return report
+
+    def write_report(self, report_path: str):
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        print(f"Wrote profile report to {report_path}")
+
+    def print_summary(self):
+        print(f"{'stage':<12}{'seconds':>10}{'peak MB':>10}")
+        for name, seconds in self.stages.items():
+            print(f"{name:<12}{seconds:>10.3f}{self.peak_memory.get(name, 0) / 2**20:>10.1f}")
+        for page in sorted(self.pages, key=lambda page: page["seconds"], reverse=True)[:5]:
+            print(f"Slow page: {page['path']} ({page['seconds']:.3f}s, {page['nodes']} nodes, {page['edges']} edges)")
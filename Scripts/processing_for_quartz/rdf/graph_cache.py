@@ -0,0 +1,200 @@
+import os
+import hashlib
+import pickle
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+import rdflib
+from rdflib import Graph, Dataset, URIRef
+from shared_functions.rdf_io import parse_ttl_file
+
+# Bump when the on-disk entry layout changes so old entries are ignored.
+CACHE_FORMAT_VERSION = 1
+
+def _file_cache_key(ttl_file: str) -> tuple:
+    """Builds the cache key of a TTL file from its path, size, mtime and content hash."""
+    file_stat = os.stat(ttl_file)
+    with open(ttl_file, "rb") as f:
+        content_hash = hashlib.sha256(f.read()).hexdigest()
+    return (CACHE_FORMAT_VERSION, rdflib.__version__, os.path.abspath(ttl_file),
+            file_stat.st_size, file_stat.st_mtime_ns, content_hash)
+
+def _cache_entry_path(cache_dir: str, ttl_file: str) -> str:
+    """Returns the cache entry path for a TTL file. There is one entry per source path."""
+    path_hash = hashlib.sha1(os.path.abspath(ttl_file).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{path_hash}.pickle")
+
+def _read_keyed_pickle(entry_path: str, cache_key, description: str):
+    """Returns the value pickled after 'cache_key' in 'entry_path', or None if it is missing, stale or unreadable."""
+    if not os.path.exists(entry_path):
+        return None
+    try:
+        with open(entry_path, "rb") as f:
+            # The key is pickled separately so stale entries are rejected
+            # without unpickling their contents.
+            if pickle.load(f) != cache_key:
+                return None
+            return pickle.load(f)
+    except Exception as e:
+        print(f"Ignoring unreadable cache entry for {description}: {e}")
+        return None
+
+def _write_keyed_pickle(entry_path: str, cache_key, value, description: str):
+    """Writes 'cache_key' then 'value' to 'entry_path', replacing any older entry."""
+    os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+    temp_path = f"{entry_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            pickle.dump(cache_key, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, entry_path)
+    except Exception as e:
+        print(f"Could not write cache entry for {description}: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def read_cache_entry(cache_dir: str, ttl_file: str, cache_key: tuple):
+    """
+    Returns the cached (triples, namespaces) of a TTL file, or None if the entry
+    is missing, stale or unreadable.
+    """
+    return _read_keyed_pickle(_cache_entry_path(cache_dir, ttl_file), cache_key, ttl_file)
+
+def write_cache_entry(cache_dir: str, ttl_file: str, cache_key: tuple, triples: list, namespaces: list):
+    """Writes the parsed triples of a TTL file to the cache, replacing any older entry."""
+    _write_keyed_pickle(_cache_entry_path(cache_dir, ttl_file), cache_key, (triples, namespaces), ttl_file)
+
+def graph_cache_key(ttl_files: list[str], cache_keys: dict) -> str:
+    """
+    Combines the cache keys of the TTL files, in load order, into the key of the
+    graph they build. Anything derived from the whole graph and cached under this
+    key is invalidated whenever any of the files changes.
+    """
+    return hashlib.sha256(repr([cache_keys[ttl_file] for ttl_file in ttl_files
+                                if ttl_file in cache_keys]).encode("utf-8")).hexdigest()
+
+def read_graph_entry(cache_dir: str, name: str, graph_key: str):
+    """Returns the value cached under 'name' for the graph with key 'graph_key', or None."""
+    return _read_keyed_pickle(os.path.join(cache_dir, f"{name}.pickle"), (CACHE_FORMAT_VERSION, graph_key), name)
+
+def write_graph_entry(cache_dir: str, name: str, graph_key: str, value):
+    """Caches a value derived from the whole graph under 'name', replacing the entry of any older graph."""
+    _write_keyed_pickle(os.path.join(cache_dir, f"{name}.pickle"), (CACHE_FORMAT_VERSION, graph_key), value, name)
+
+def _parse_and_cache_ttl_file(ttl_file: str, cache_dir: str, cache_key: tuple) -> tuple[list, list]:
+    """Parses a TTL file and stores the result in the cache. Runs in a worker process."""
+    triples, namespaces = parse_ttl_file(ttl_file)
+    write_cache_entry(cache_dir, ttl_file, cache_key, triples, namespaces)
+    return triples, namespaces
+
+def ttl_cache_keys(ttl_files: list[str]) -> dict:
+    """
+    Returns {ttl_file: cache key} for the TTL files that could be read. A file that
+    cannot be stat'ed or read is reported and left out, so it is not loaded.
+    """
+    cache_keys = {}
+    for ttl_file in ttl_files:
+        try:
+            cache_keys[ttl_file] = _file_cache_key(ttl_file)
+        except OSError as e:
+            print(f"Skipping {ttl_file}, which could not be read: {e}")
+    return cache_keys
+
+def load_parsed_ttl_files(ttl_files: list[str], cache_dir: str, max_workers: int = 1, cache_keys: dict = None) -> dict:
+    """
+    Returns {ttl_file: (triples, namespaces)} for the TTL files that could be read,
+    reusing the parsed triples cached in 'cache_dir' for files whose path, size,
+    mtime and content hash are unchanged. Only changed files are re-parsed, in a
+    pool of 'max_workers' processes when more than one is needed. Pass the keys
+    from ttl_cache_keys to avoid hashing the files twice.
+    """
+    if cache_keys is None:
+        cache_keys = ttl_cache_keys(ttl_files)
+    loaded = {}
+    to_parse = {}
+    for ttl_file in ttl_files:
+        if ttl_file not in cache_keys:
+            continue
+        cache_key = cache_keys[ttl_file]
+        cached = read_cache_entry(cache_dir, ttl_file, cache_key)
+        if cached is None:
+            to_parse[ttl_file] = cache_key
+        else:
+            loaded[ttl_file] = cached
+    cached_count = len(loaded)
+
+    if max_workers > 1 and len(to_parse) > 1:
+        # Submit the largest files first so one big file does not finish last.
+        submit_order = sorted(to_parse, key=os.path.getsize, reverse=True)
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(to_parse))) as executor:
+            futures = {ttl_file: executor.submit(_parse_and_cache_ttl_file, ttl_file, cache_dir, to_parse[ttl_file])
+                       for ttl_file in submit_order}
+            for ttl_file in to_parse:
+                try:
+                    loaded[ttl_file] = futures[ttl_file].result()
+                except Exception as e:
+                    print(f"Error parsing {ttl_file}: {e}")
+    else:
+        for ttl_file, cache_key in to_parse.items():
+            try:
+                loaded[ttl_file] = _parse_and_cache_ttl_file(ttl_file, cache_dir, cache_key)
+            except Exception as e:
+                print(f"Error parsing {ttl_file}: {e}")
+
+    print(f"Loaded {cached_count} TTL files from cache, parsed {len(loaded) - cached_count}.")
+    return loaded
+
+def build_graph_from_parsed_files(ttl_files: list[str], parsed_files: dict) -> Graph:
+    """Merges the parsed triples of the TTL files into one Graph in one bulk step, in file order."""
+    g = Graph()
+    ordered_results = [parsed_files[ttl_file] for ttl_file in ttl_files if ttl_file in parsed_files]
+    for _, namespaces in ordered_results:
+        for prefix, namespace in namespaces:
+            g.bind(prefix, namespace)
+    g.addN((s, p, o, g) for s, p, o in chain.from_iterable(triples for triples, _ in ordered_results))
+    return g
+
+def ttl_file_context_id(ttl_file: str) -> URIRef:
+    """Returns the identifier of the named graph holding a TTL file's triples in dataset mode."""
+    return URIRef(Path(os.path.abspath(ttl_file)).as_uri())
+
+def build_dataset_from_parsed_files(ttl_files: list[str], parsed_files: dict) -> Dataset:
+    """
+    Same as build_graph_from_parsed_files, but each TTL file's triples go into
+    their own named graph. The Dataset reads as the union of all of them, so code
+    written for a single Graph works on it unchanged, and a file's triples can be
+    replaced on their own with replace_ttl_file_context.
+    """
+    dataset = Dataset(default_union=True)
+    ordered_files = [ttl_file for ttl_file in ttl_files if ttl_file in parsed_files]
+    for ttl_file in ordered_files:
+        for prefix, namespace in parsed_files[ttl_file][1]:
+            dataset.bind(prefix, namespace)
+    for ttl_file in ordered_files:
+        context = dataset.graph(ttl_file_context_id(ttl_file))
+        dataset.addN((s, p, o, context) for s, p, o in parsed_files[ttl_file][0])
+    return dataset
+
+def replace_ttl_file_context(dataset: Dataset, ttl_file: str, triples: list = None, namespaces: list = ()):
+    """
+    Drops the named graph of a TTL file and, unless 'triples' is None, refills it
+    with the file's newly parsed triples. Triples also asserted by another file
+    stay in the union.
+    """
+    context_id = ttl_file_context_id(ttl_file)
+    dataset.remove_graph(context_id)
+    if triples is None:
+        return
+    for prefix, namespace in namespaces:
+        dataset.bind(prefix, namespace)
+    context = dataset.graph(context_id)
+    dataset.addN((s, p, o, context) for s, p, o in triples)
+
+def load_ttl_files_cached(ttl_files: list[str], cache_dir: str, max_workers: int = 1) -> Graph:
+    """
+    Loads TTL files into a single Graph, reusing the parsed triples cached in
+    'cache_dir' for files whose path, size, mtime and content hash are unchanged.
+    Only changed files are re-parsed, in a pool of 'max_workers' processes when
+    more than one is needed. Deleting 'cache_dir' simply forces a full parse.
+    """
+    return build_graph_from_parsed_files(ttl_files, load_parsed_ttl_files(ttl_files, cache_dir, max_workers))
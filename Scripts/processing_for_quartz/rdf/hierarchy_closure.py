@@ -0,0 +1,163 @@
+from collections import deque
+from rdflib import Graph, URIRef, Literal
+from rdflib.namespace import RDFS, SKOS
+
+# Transitive hierarchy predicates indexed by default.
+HIERARCHY_PREDICATES = (SKOS.broader, RDFS.subClassOf)
+# Predicate used when exporting a closure as triples. skos:broader is not transitive
+# itself, so its closure is published as skos:broaderTransitive.
+EXPORT_PREDICATES = {SKOS.broader: SKOS.broaderTransitive}
+
+class TransitiveClosure:
+    """
+    Materialized transitive closure of one hierarchy predicate, with the shortest
+    distance of every (node, ancestor) pair. Looking up a node's ancestors,
+    descendants or depth below a set of roots needs no traversal, and edges can be
+    added or removed afterwards without rebuilding. A node on a cycle is its own
+    ancestor; cycles never make a walk loop.
+    """
+    def __init__(self, edges=()):
+        self._parents = {}
+        self._children = {}
+        # node -> {ancestor: shortest distance} and the mirror image.
+        self._ancestors = {}
+        self._descendants = {}
+        for child, parent in edges:
+            self._link(child, parent)
+        for node in list(self._parents):
+            self._set_ancestors(node, self._walk_up(node))
+
+    def _link(self, child, parent) -> bool:
+        parents = self._parents.setdefault(child, set())
+        if parent in parents:
+            return False
+        parents.add(parent)
+        self._children.setdefault(parent, set()).add(child)
+        return True
+
+    def _walk_up(self, node) -> dict:
+        """Breadth-first search over the parent edges; returns {ancestor: shortest distance}."""
+        distances = {}
+        queue = deque([(node, 0)])
+        while queue:
+            current, distance = queue.popleft()
+            for parent in self._parents.get(current, ()):
+                if parent not in distances:
+                    distances[parent] = distance + 1
+                    queue.append((parent, distance + 1))
+        return distances
+
+    def _set_ancestors(self, node, ancestors: dict):
+        self._ancestors[node] = ancestors
+        for ancestor, distance in ancestors.items():
+            self._descendants.setdefault(ancestor, {})[node] = distance
+
+    def add_edge(self, child, parent):
+        """Records that 'parent' is a direct parent of 'child' (child broader/subClassOf parent)."""
+        if not self._link(child, parent):
+            return
+        # A new shortest path uses the new edge once: child's descendants, the edge, parent's ancestors.
+        lower = [(child, 0)] + list(self._descendants.get(child, {}).items())
+        upper = [(parent, 0)] + list(self._ancestors.get(parent, {}).items())
+        for node, distance_below in lower:
+            ancestors = self._ancestors.setdefault(node, {})
+            for ancestor, distance_above in upper:
+                distance = distance_below + 1 + distance_above
+                if ancestors.get(ancestor, distance + 1) > distance:
+                    ancestors[ancestor] = distance
+                    self._descendants.setdefault(ancestor, {})[node] = distance
+
+    def remove_edge(self, child, parent):
+        """Removes a direct edge. Only the ancestors of 'child' and of its descendants are recomputed."""
+        parents = self._parents.get(child)
+        if not parents or parent not in parents:
+            return
+        parents.discard(parent)
+        self._children[parent].discard(child)
+        affected = {child, *self._descendants.get(child, ())}
+        for node in affected:
+            for ancestor in self._ancestors.pop(node, {}):
+                del self._descendants[ancestor][node]
+        for node in affected:
+            self._set_ancestors(node, self._walk_up(node))
+
+    def parents(self, node) -> set:
+        return self._parents.get(node, set())
+
+    def children(self, node) -> set:
+        return self._children.get(node, set())
+
+    def ancestors(self, node) -> dict:
+        """Returns {ancestor: shortest distance} for 'node'. Do not modify the result."""
+        return self._ancestors.get(node, {})
+
+    def descendants(self, node) -> dict:
+        """Returns {descendant: shortest distance} for 'node'. Do not modify the result."""
+        return self._descendants.get(node, {})
+
+    def is_ancestor(self, ancestor, node) -> bool:
+        return ancestor in self._ancestors.get(node, ())
+
+    def depth(self, node, root_nodes: set) -> int:
+        """
+        Shortest distance from 'node' up to any of 'root_nodes', 0 for a root and
+        -1 if no root can be reached, as get_subclass_depth computes it.
+        """
+        if node in root_nodes:
+            return 0
+        ancestors = self._ancestors.get(node, {})
+        if len(root_nodes) < len(ancestors):
+            distances = [ancestors[root] for root in root_nodes if root in ancestors]
+        else:
+            distances = [distance for ancestor, distance in ancestors.items() if ancestor in root_nodes]
+        return min(distances) if distances else -1
+
+    def closure_edges(self, include_asserted: bool = False, include_reflexive: bool = False):
+        """Yields the (node, ancestor) pairs of the closure, by default without the direct edges and self pairs."""
+        for node, ancestors in self._ancestors.items():
+            for ancestor, distance in ancestors.items():
+                if node == ancestor and not include_reflexive:
+                    continue
+                if distance == 1 and not include_asserted:
+                    continue
+                yield node, ancestor
+
+class HierarchyClosureIndex:
+    """
+    One TransitiveClosure per hierarchy predicate (skos:broader and rdfs:subClassOf
+    by default), built from a graph and kept up to date with add_triples and
+    remove_triples as triples arrive or go. Triples of other predicates and triples
+    with a literal object are ignored.
+    """
+    def __init__(self, graph: Graph = None, predicates=HIERARCHY_PREDICATES):
+        self.closures = {}
+        for predicate in predicates:
+            edges = () if graph is None else (
+                (s, o) for s, o in graph.subject_objects(predicate) if not isinstance(o, Literal))
+            self.closures[predicate] = TransitiveClosure(edges)
+
+    def __getitem__(self, predicate: URIRef) -> TransitiveClosure:
+        return self.closures[predicate]
+
+    def add_triples(self, triples):
+        for s, p, o in triples:
+            closure = self.closures.get(p)
+            if closure is not None and not isinstance(o, Literal):
+                closure.add_edge(s, o)
+
+    def remove_triples(self, triples):
+        for s, p, o in triples:
+            closure = self.closures.get(p)
+            if closure is not None:
+                closure.remove_edge(s, o)
+
+    def triples(self, include_asserted: bool = False):
+        """
+        Yields the closure as triples to publish, using EXPORT_PREDICATES where a
+        hierarchy predicate is not transitive itself. Direct edges are left out
+        unless 'include_asserted' is set, since the graph already has them.
+        """
+        for predicate, closure in self.closures.items():
+            export_predicate = EXPORT_PREDICATES.get(predicate, predicate)
+            for node, ancestor in closure.closure_edges(include_asserted or export_predicate != predicate):
+                yield node, export_predicate, ancestor
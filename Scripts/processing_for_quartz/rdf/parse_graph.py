@@ -1,69 +1,119 @@
+from collections import Counter
 from rdflib import Graph, URIRef, RDFS, OWL, RDF
-from .rdf_helpers import get_uri_last_part
+from .rdf_helpers import get_uri_last_part, get_term_last_part, label_sort_key
+from .graph_cache import read_graph_entry, write_graph_entry
 
 CORE_LITERAL_PROPERTIES_FOR_NODE_DISPLAY = {
     "birthDate", "nationality", "type", "field", "description",
-    "comment", "versionInfo", "label", "name" 
-} 
+    "comment", "versionInfo", "label", "name"
+}
+
+# Name of the predicate catalogue's entry in the graph cache.
+PREDICATE_CATALOGUE_CACHE_NAME = "predicate_catalogue"
+
+class PredicateCatalogue:
+    """
+    What the pipeline needs to know about the predicates of a graph, computed in
+    one pass: each distinct predicate's triple count and URI last part, the labels
+    of the owl:DatatypeProperty subjects and owl:inverseOf pairs, and the six
+    predicate sets of load_dynamic_predicates. Picklable, so it can be cached with
+    the parsed graph. Only the graph-derived fields are pickled; the predicate sets
+    are classified again on unpickling, so a cached catalogue always follows the
+    current classification rules.
+    """
+    GRAPH_DERIVED_FIELDS = ("predicate_counts", "predicate_labels", "datatype_property_labels", "inverse_of_labels")
+
+    def __init__(self, graph: Graph):
+        # graph.predicates() yields once per triple; everything else works on distinct predicates.
+        self.predicate_counts = {str(p_uri): count for p_uri, count in Counter(graph.predicates()).items()}
+        self.predicate_labels = {p_uri: get_uri_last_part(p_uri) for p_uri in self.predicate_counts}
+
+        first_labels = {}
+        def label_of(node) -> str:
+            # The last part of the node's first rdfs:label (see label_sort_key), else of the node itself.
+            if node not in first_labels:
+                labels = list(graph.objects(node, RDFS.label))
+                first_labels[node] = (get_term_last_part(min(labels, key=label_sort_key)) if labels
+                                      else get_uri_last_part(str(node)))
+            return first_labels[node]
+
+        self.datatype_property_labels = {label_of(s) for s in graph.subjects(RDF.type, OWL.DatatypeProperty)}
+        self.inverse_of_labels = set()
+        for s, o in graph.subject_objects(OWL.inverseOf):
+            self.inverse_of_labels.add(label_of(s))
+            self.inverse_of_labels.add(label_of(o))
+        self.predicate_sets = self._classify()
+
+    def __getstate__(self) -> dict:
+        return {field: getattr(self, field) for field in self.GRAPH_DERIVED_FIELDS}
+
+    def __setstate__(self, state: dict):
+        for field in self.GRAPH_DERIVED_FIELDS:
+            setattr(self, field, state[field])
+        self.predicate_sets = self._classify()
+
+    def _classify(self) -> tuple:
+        dynamic_relationship_predicates = set()
+        dynamic_metadata_predicates = set()
+        dynamic_literal_properties = set(CORE_LITERAL_PROPERTIES_FOR_NODE_DISPLAY)
+
+        # Add common RDF/OWL vocabulary terms to metadata predicates.
+        dynamic_metadata_predicates.update({
+            get_uri_last_part(str(RDF.type)),
+            get_uri_last_part(str(RDFS.domain)),
+            get_uri_last_part(str(RDFS.range)),
+            get_uri_last_part(str(OWL.inverseOf)),
+            get_uri_last_part(str(OWL.Ontology)),
+            get_uri_last_part(str(OWL.ObjectProperty)),
+            get_uri_last_part(str(OWL.DatatypeProperty)),
+            get_uri_last_part(str(RDFS.label)),
+            get_uri_last_part(str(RDFS.comment)),
+            get_uri_last_part(str(OWL.versionInfo)),
+            "isDefinedBy"
+        })
+
+        dynamic_literal_properties.update(self.datatype_property_labels)
+
+        for predicate_label in self.predicate_labels.values():
+            if predicate_label not in dynamic_metadata_predicates and \
+               predicate_label not in dynamic_literal_properties:
+                dynamic_relationship_predicates.add(predicate_label)
+
+        dynamic_relationship_predicates.update(self.inverse_of_labels)
+
+        dynamic_relationship_predicates.update({
+            "subClassOf", str(RDFS.subClassOf), "creator", "subject", "seeAlso", "hasTopic", "title", "influencedBy", "hasField",
+            "defines", "drives", "interactsWith", "delivers", "hasPart", "partOf"
+        })
+        dynamic_metadata_predicates.update({
+            "comment", "versionInfo", "label"
+        })
+
+        dynamic_relationship_predicates_lower = {p.lower() for p in dynamic_relationship_predicates}
+        dynamic_metadata_predicates_lower = {p.lower() for p in dynamic_metadata_predicates}
+        dynamic_literal_properties_lower = {p.lower() for p in dynamic_literal_properties}
+
+        return (dynamic_relationship_predicates, dynamic_metadata_predicates, dynamic_literal_properties,
+                dynamic_relationship_predicates_lower, dynamic_metadata_predicates_lower, dynamic_literal_properties_lower)
+
+def load_predicate_catalogue(graph: Graph, cache_dir: str = None, graph_key: str = None) -> PredicateCatalogue:
+    """
+    Returns the predicate catalogue of 'graph'. With a cache directory and the
+    graph's key (see graph_cache.graph_cache_key) it is read from the graph cache,
+    or built and stored there, so it is only rebuilt when a TTL file changes.
+    """
+    if cache_dir is None or graph_key is None:
+        return PredicateCatalogue(graph)
+    catalogue = read_graph_entry(cache_dir, PREDICATE_CATALOGUE_CACHE_NAME, graph_key)
+    if catalogue is None:
+        catalogue = PredicateCatalogue(graph)
+        write_graph_entry(cache_dir, PREDICATE_CATALOGUE_CACHE_NAME, graph_key, catalogue)
+    return catalogue
 
 def load_dynamic_predicates(graph: Graph) -> tuple:
     """
     Dynamically loads relationship predicates and metadata predicates from the RDF graph.
     """
-    # (Implementation remains the same)
     # The function is self-contained and only needs the 'graph' object.
     # It returns all the predicate sets for other modules to use.
-    dynamic_relationship_predicates = set()
-    dynamic_metadata_predicates = set()
-    dynamic_literal_properties = set(CORE_LITERAL_PROPERTIES_FOR_NODE_DISPLAY)
-
-    # Add common RDF/OWL vocabulary terms to metadata predicates.
-    dynamic_metadata_predicates.update({
-        get_uri_last_part(str(RDF.type)), 
-        get_uri_last_part(str(RDFS.domain)),
-        get_uri_last_part(str(RDFS.range)),
-        get_uri_last_part(str(OWL.inverseOf)),
-        get_uri_last_part(str(OWL.Ontology)),
-        get_uri_last_part(str(OWL.ObjectProperty)),
-        get_uri_last_part(str(OWL.DatatypeProperty)),
-        get_uri_last_part(str(RDFS.label)), 
-        get_uri_last_part(str(RDFS.comment)), 
-        get_uri_last_part(str(OWL.versionInfo)),
-        "isDefinedBy"
-    })
-
-    for s, p, o in graph.triples((None, RDF.type, OWL.DatatypeProperty)):
-        label_triples = list(graph.triples((s, RDFS.label, None)))
-        if label_triples:
-            literal_prop_label = get_uri_last_part(str(label_triples[0][2]))
-            dynamic_literal_properties.add(literal_prop_label)
-        else:
-            literal_prop_label = get_uri_last_part(str(s))
-            dynamic_literal_properties.add(literal_prop_label)
-
-    for p_uri in graph.predicates():
-        predicate_label = get_uri_last_part(str(p_uri))
-        if predicate_label not in dynamic_metadata_predicates and \
-           predicate_label not in dynamic_literal_properties:
-            dynamic_relationship_predicates.add(predicate_label)
-
-    for s, p, o in graph.triples((None, OWL.inverseOf, None)):
-        label_s = next((get_uri_last_part(str(l[2])) for l in graph.triples((s, RDFS.label, None))), get_uri_last_part(str(s)))
-        label_o = next((get_uri_last_part(str(l[2])) for l in graph.triples((o, RDFS.label, None))), get_uri_last_part(str(o)))
-        dynamic_relationship_predicates.add(label_s)
-        dynamic_relationship_predicates.add(label_o)
-    
-    dynamic_relationship_predicates.update({
-        "subClassOf", str(RDFS.subClassOf), "creator", "subject", "seeAlso", "hasTopic", "title", "influencedBy", "hasField",
-        "defines", "drives", "interactsWith", "delivers", "hasPart", "partOf"
-    })
-    dynamic_metadata_predicates.update({
-        "comment", "versionInfo", "label"
-    })
-    
-    dynamic_relationship_predicates_lower = {p.lower() for p in dynamic_relationship_predicates}
-    dynamic_metadata_predicates_lower = {p.lower() for p in dynamic_metadata_predicates}
-    dynamic_literal_properties_lower = {p.lower() for p in dynamic_literal_properties}
-    
-    return (dynamic_relationship_predicates, dynamic_metadata_predicates, dynamic_literal_properties, 
-            dynamic_relationship_predicates_lower, dynamic_metadata_predicates_lower, dynamic_literal_properties_lower)
\ No newline at end of file
+    return PredicateCatalogue(graph).predicate_sets
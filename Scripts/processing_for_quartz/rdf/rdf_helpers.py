@@ -1,16 +1,25 @@
 import re
+from collections import OrderedDict, deque
 from rdflib import Graph, URIRef, Literal, RDFS
 from urllib.parse import urlparse
 
+def label_sort_key(label) -> tuple:
+    """
+    Orders the rdfs:label values of a term: labels without a language first, then by
+    language and text. rdflib yields them in no fixed order, so the first label under
+    this key is the one shown, whatever the hash seed or the order triples were added in.
+    """
+    return (getattr(label, "language", None) or "", str(label))
+
 def find_label_for_uri(uri: URIRef, graph: Graph) -> str:
     """Finds a human-readable label for a given URI."""
-    for _, _, label in graph.triples((uri, RDFS.label, None)):
-        if isinstance(label, Literal):
-            return str(label)
+    labels = [label for label in graph.objects(uri, RDFS.label) if isinstance(label, Literal)]
+    if labels:
+        return str(min(labels, key=label_sort_key))
     return get_uri_last_part(str(uri))
 
-def get_uri_last_part(uri: str) -> str:
-    """Helper function to robustly extract the last part of a URI."""
+def _compute_uri_last_part(uri: str) -> str:
+    """Extracts the last part of a URI without consulting the term table."""
     if ':' in uri and not uri.startswith('http'):
         return uri.split(':', 1)[1]
     
@@ -27,24 +36,131 @@ def get_uri_last_part(uri: str) -> str:
         pass
     return uri
 
-def find_uri_for_filename(filename: str, graph: Graph, base_uri: str) -> URIRef:
-    """Finds the URI reference in the graph that corresponds to the given filename."""
-    normalized_filename = filename.lower().replace(" ", "_").replace("-", "_")
+def normalize_filename(filename: str) -> str:
+    """Normalizes a filename or URI last part for case-, space- and hyphen-insensitive matching."""
+    return filename.lower().replace(" ", "_").replace("-", "_")
+
+# Size of the shared URI term table until set_uri_term_table_size is called.
+DEFAULT_URI_TERM_TABLE_SIZE = 100000
+
+class UriTermTable:
+    """
+    Interned table of URI terms. Each URI's last part, lowercased last part and
+    normalized filename form are computed once and handed back from the table on
+    every later call. The least recently used terms are evicted once 'max_size'
+    terms are held, so memory stays flat on very large graphs; pass None for a
+    table that keeps every term.
+    """
+    def __init__(self, max_size: int = DEFAULT_URI_TERM_TABLE_SIZE):
+        if max_size is not None and max_size < 1:
+            raise ValueError(f"URI term table size must be at least 1 or None, got {max_size}.")
+        self.max_size = max_size
+        self._terms = OrderedDict() if max_size is not None else {}
+
+    def get(self, uri: str) -> tuple[str, str, str]:
+        """Returns (last part, lowercased last part, normalized last part) for a URI."""
+        terms = self._terms
+        try:
+            entry = terms[uri]
+        except KeyError:
+            last_part = _compute_uri_last_part(uri)
+            entry = (last_part, last_part.lower(), normalize_filename(last_part))
+            terms[uri] = entry
+            if self.max_size is not None and len(terms) > self.max_size:
+                terms.popitem(last=False)
+            return entry
+        if self.max_size is not None:
+            terms.move_to_end(uri)
+        return entry
+
+    def clear(self):
+        self._terms.clear()
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+_uri_terms = UriTermTable()
+
+def set_uri_term_table_size(max_size: int = DEFAULT_URI_TERM_TABLE_SIZE):
+    """Replaces the shared URI term table. Pass None for an unbounded table."""
+    global _uri_terms
+    _uri_terms = UriTermTable(max_size)
+
+def get_uri_term(uri: str) -> tuple[str, str, str]:
+    """Returns the cached (last part, lowercased, normalized) forms of a URI."""
+    return _uri_terms.get(uri)
+
+def get_uri_last_part(uri: str) -> str:
+    """Helper function to robustly extract the last part of a URI."""
+    return _uri_terms.get(uri)[0]
+
+def get_term_last_part(term) -> str:
+    """
+    Same as get_uri_last_part for an rdflib term, but literals are worked out each
+    time instead of going through the term table, so their values do not fill it.
+    """
+    if isinstance(term, Literal):
+        return _compute_uri_last_part(str(term))
+    return _uri_terms.get(str(term))[0]
+
+def _index_term(uri_index: dict, term):
+    # Of the terms with the same normalized last part, the smallest URI wins.
+    key = get_uri_term(str(term))[2]
+    current = uri_index.get(key)
+    if current is None or str(term) < str(current):
+        uri_index[key] = term
+
+def build_filename_uri_index(graph: Graph) -> dict:
+    """
+    Builds a normalized URI last part -> URI index over every subject and URIRef
+    object in the graph. Where several terms normalize to the same name, the one
+    with the smallest URI is kept, as in 'find_uri_for_filename'. rdflib walks the
+    whole graph in an order that depends on the hash seed, so taking the first
+    match would not give the same page URIs from run to run.
+    """
+    uri_index = {}
+    seen_terms = set()
     for s, _, o in graph.triples((None, None, None)):
-        if get_uri_last_part(str(s)).lower().replace(" ", "_").replace("-", "_") == normalized_filename:
-            return s
-        if isinstance(o, URIRef) and get_uri_last_part(str(o)).lower().replace(" ", "_").replace("-", "_") == normalized_filename:
-            return o
+        if s not in seen_terms:
+            seen_terms.add(s)
+            _index_term(uri_index, s)
+        if isinstance(o, URIRef) and o not in seen_terms:
+            seen_terms.add(o)
+            _index_term(uri_index, o)
+    return uri_index
+
+def find_uri_for_filename(filename: str, graph: Graph, base_uri: str, uri_index: dict = None) -> URIRef:
+    """
+    Finds the URI reference in the graph that corresponds to the given filename,
+    the smallest URI if several match. Pass the index from 'build_filename_uri_index'
+    to avoid scanning the whole graph.
+    """
+    normalized_filename = normalize_filename(filename)
+    if uri_index is not None:
+        uri = uri_index.get(normalized_filename)
+        if uri is not None:
+            return uri
+        return URIRef(f"{base_uri}{normalized_filename}")
+    matches = [term for s, _, o in graph.triples((None, None, None))
+               for term in ((s, o) if isinstance(o, URIRef) else (s,))
+               if get_uri_term(str(term))[2] == normalized_filename]
+    if matches:
+        return min(matches, key=str)
     return URIRef(f"{base_uri}{normalized_filename}")
 
-def get_subclass_depth(entity_uri: URIRef, graph: Graph, root_classes: set) -> int:
-    """Finds the shortest path depth of an entity from a root class."""
-    # (Implementation remains the same)
+def get_subclass_depth(entity_uri: URIRef, graph: Graph, root_classes: set, closure=None) -> int:
+    """
+    Finds the shortest path depth of an entity from a root class. Pass the
+    rdfs:subClassOf TransitiveClosure (see hierarchy_closure.py) to look the depth
+    up instead of walking the graph.
+    """
+    if closure is not None:
+        return closure.depth(entity_uri, root_classes)
     RDFS_SUBCLASSOF = URIRef("http://www.w3.org/2000/01/rdf-schema#subClassOf")
-    queue = [(entity_uri, 0)]
+    queue = deque([(entity_uri, 0)])
     visited = set()
     while queue:
-        current_uri, depth = queue.pop(0)
+        current_uri, depth = queue.popleft()
         if current_uri in root_classes:
             return depth
         if current_uri in visited:
@@ -52,4 +168,27 @@ def get_subclass_depth(entity_uri: URIRef, graph: Graph, root_classes: set) -> i
         visited.add(current_uri)
         for _, _, super_class in graph.triples((current_uri, RDFS_SUBCLASSOF, None)):
             queue.append((super_class, depth + 1))
-    return -1
\ No newline at end of file
+    return -1
+
+def compute_subclass_depths(graph: Graph, root_classes: set) -> dict:
+    """
+    Computes the depth of every entity reachable from a root class with a single
+    breadth-first search over inverted rdfs:subClassOf edges. The depths match
+    'get_subclass_depth'; look entities up with .get(entity_uri, -1) to keep its
+    -1 sentinel for entities that cannot reach a root.
+    """
+    RDFS_SUBCLASSOF = URIRef("http://www.w3.org/2000/01/rdf-schema#subClassOf")
+    subclasses = {}
+    for sub_class, _, super_class in graph.triples((None, RDFS_SUBCLASSOF, None)):
+        subclasses.setdefault(super_class, []).append(sub_class)
+
+    depths = {root_class: 0 for root_class in root_classes}
+    queue = deque(root_classes)
+    while queue:
+        current_uri = queue.popleft()
+        child_depth = depths[current_uri] + 1
+        for sub_class in subclasses.get(current_uri, ()):
+            if sub_class not in depths:
+                depths[sub_class] = child_depth
+                queue.append(sub_class)
+    return depths
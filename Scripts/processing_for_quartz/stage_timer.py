@@ -0,0 +1,18 @@
+import time
+from contextlib import contextmanager
+
+class StageTimer:
+    """Records the wall time of each named pipeline stage, in the order the stages ran."""
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def total(self) -> float:
+        return sum(self.stages.values())
@@ -0,0 +1,293 @@
+import os
+import glob
+import time
+import bisect
+import threading
+from rdflib.namespace import RDFS
+from .pipeline import Pipeline
+from .rdf.graph_cache import load_parsed_ttl_files, replace_ttl_file_context
+from .rdf.parse_graph import load_predicate_catalogue
+from .rdf.hierarchy_closure import HierarchyClosureIndex
+from .config import WATCH_POLL_INTERVAL, WATCH_DEBOUNCE_SECONDS
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # Changes are picked up by polling instead
+    Observer = None
+    FileSystemEventHandler = object
+
+def _is_within(path: str, directory: str) -> bool:
+    return os.path.commonpath([path, directory]) == directory
+
+class _ChangeCollector(FileSystemEventHandler):
+    """Collects the paths of watched files named by file system events."""
+    def __init__(self, suffixes_by_dir: dict):
+        self.suffixes_by_dir = suffixes_by_dir
+        self.changed_paths = set()
+        self.lock = threading.Lock()
+        self.changed = threading.Event()
+
+    def on_any_event(self, event):
+        # Reading a file also raises events on some platforms; only content changes count.
+        if event.is_directory or event.event_type not in ("created", "modified", "deleted", "moved"):
+            return
+        for path in (event.src_path, getattr(event, "dest_path", "")):
+            path = os.path.abspath(os.fsdecode(path)) if path else ""
+            if any(path.endswith(suffix) and _is_within(path, directory)
+                   for directory, suffix in self.suffixes_by_dir.items()):
+                with self.lock:
+                    self.changed_paths.add(path)
+                self.changed.set()
+
+    def wait_for_changes(self, timeout: float, debounce_seconds: float) -> set[str]:
+        """Returns the paths changed once no event arrived for 'debounce_seconds', or an empty set after 'timeout'."""
+        if not self.changed.wait(timeout):
+            return set()
+        # Editors often save in several steps; wait until the events stop.
+        while self.changed.is_set():
+            self.changed.clear()
+            time.sleep(debounce_seconds)
+        with self.lock:
+            changed_paths, self.changed_paths = self.changed_paths, set()
+        return changed_paths
+
+class EventWatcher:
+    """Waits for changes with file system notifications (inotify on Linux) through watchdog."""
+    def __init__(self, suffixes_by_dir: dict, debounce_seconds: float = WATCH_DEBOUNCE_SECONDS):
+        self.collector = _ChangeCollector(suffixes_by_dir)
+        self.debounce_seconds = debounce_seconds
+        self.observer = Observer()
+        for directory in suffixes_by_dir:
+            self.observer.schedule(self.collector, directory, recursive=True)
+
+    def start(self):
+        self.observer.start()
+
+    def stop(self):
+        self.observer.stop()
+        self.observer.join()
+
+    def wait_for_changes(self, timeout: float) -> set[str]:
+        return self.collector.wait_for_changes(timeout, self.debounce_seconds)
+
+class PollingWatcher:
+    """Waits for changes by comparing the size and mtime of the watched files every 'interval' seconds."""
+    def __init__(self, suffixes_by_dir: dict, interval: float = WATCH_POLL_INTERVAL):
+        self.suffixes_by_dir = suffixes_by_dir
+        self.interval = interval
+        self.snapshot = {}
+
+    def _take_snapshot(self) -> dict:
+        snapshot = {}
+        for directory, suffix in self.suffixes_by_dir.items():
+            for path in glob.glob(os.path.join(directory, "**", "*" + suffix), recursive=True):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def start(self):
+        self.snapshot = self._take_snapshot()
+
+    def stop(self):
+        pass
+
+    def wait_for_changes(self, timeout: float) -> set[str]:
+        """Returns the paths added, removed or modified since the last call, polling for at most 'timeout' seconds."""
+        deadline = time.monotonic() + timeout
+        while True:
+            time.sleep(self.interval)
+            snapshot = self._take_snapshot()
+            changed_paths = {path for path in snapshot.keys() | self.snapshot.keys()
+                             if snapshot.get(path) != self.snapshot.get(path)}
+            self.snapshot = snapshot
+            if changed_paths or time.monotonic() >= deadline:
+                return changed_paths
+
+class WatchSession(Pipeline):
+    """
+    A pipeline that stays loaded between changes. After the first full run it keeps
+    the graph, predicate sets, indexes and manifest entries in memory. A changed
+    Markdown file regenerates that page and the pages linking to a note that was
+    added or removed. A changed TTL file replaces only that file's triples in the
+    graph (its named graph in dataset mode), after which the pages whose dependent
+    triples changed are regenerated.
+    The parse, the triple replacement and the class depths, read from an
+    rdfs:subClassOf closure updated with the added and removed triples, are per file.
+    A TTL change that alters the graph still rebuilds the predicate catalogue, the
+    indexes and the rest of the render context (adjacency and caches) from the whole
+    graph, so it costs about as much as those stages of a full run.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The set of triples of each TTL file, to tell which triples a changed file added or removed.
+        self.ttl_triple_sets = {}
+        self.hierarchy_closure = None
+
+    def keep_ttl_triples(self, parsed_ttl_files: dict):
+        # Only the sets are kept; the parsed triple lists go once the graph is built.
+        self.ttl_triple_sets = {ttl_file: set(triples) for ttl_file, (triples, _) in parsed_ttl_files.items()}
+        self.hierarchy_closure = HierarchyClosureIndex(self.graph, (RDFS.subClassOf,))
+        self.subclass_closure = self.hierarchy_closure[RDFS.subClassOf]
+
+    def reload_ttl_file(self, ttl_file: str) -> bool:
+        """Replaces the triples of one TTL file in the graph. Returns True if the graph changed."""
+        file_exists = os.path.exists(ttl_file)
+        if file_exists:
+            parsed = load_parsed_ttl_files([ttl_file], self.graph_cache_dir).get(ttl_file)
+            if parsed is None:
+                # Keep the triples of the last version that parsed until the file is fixed.
+                return False
+        else:
+            parsed = ([], [])
+        new_triples, namespaces = parsed
+
+        old_triples = self.ttl_triple_sets.get(ttl_file, set())
+        new_triple_set = set(new_triples)
+        if self.dataset_mode:
+            # The file has its own named graph; the union keeps triples other files also assert.
+            removed_triples = old_triples - new_triple_set
+            added_triples = new_triple_set - old_triples
+            replace_ttl_file_context(self.graph, ttl_file, new_triples if file_exists else None, namespaces)
+        else:
+            other_triple_sets = [triple_set for other_file, triple_set in self.ttl_triple_sets.items()
+                                 if other_file != ttl_file]
+            removed_triples = [triple for triple in old_triples - new_triple_set
+                               if not any(triple in triple_set for triple_set in other_triple_sets)]
+            added_triples = [triple for triple in new_triples if triple not in old_triples]
+
+            for triple in removed_triples:
+                self.graph.remove(triple)
+            for prefix, namespace in namespaces:
+                self.graph.bind(prefix, namespace)
+            self.graph.addN((s, p, o, self.graph) for s, p, o in added_triples)
+        # An edge stays in the closure while another file still asserts it.
+        self.hierarchy_closure.remove_triples(triple for triple in removed_triples if triple not in self.graph)
+        self.hierarchy_closure.add_triples(added_triples)
+
+        if file_exists:
+            self.ttl_triple_sets[ttl_file] = new_triple_set
+            if ttl_file not in self.ttl_files:
+                bisect.insort(self.ttl_files, ttl_file)
+        else:
+            self.ttl_triple_sets.pop(ttl_file, None)
+            if ttl_file in self.ttl_files:
+                self.ttl_files.remove(ttl_file)
+        print(f"Reloaded {ttl_file}: {len(added_triples)} triples added, {len(removed_triples)} removed.")
+        return bool(added_triples or removed_triples)
+
+    def _update_source_basenames(self) -> set:
+        """Recollects the source basenames in place and returns those that were added or removed."""
+        basenames = {os.path.splitext(os.path.basename(md_file_path_in_source))[0].lower()
+                     for md_file_path_in_source in glob.glob(os.path.join(self.source_dir, "**/*.md"), recursive=True)}
+        changed_basenames = basenames ^ self.all_source_markdown_basenames_lower
+        # The render context shares this set, so it is updated rather than replaced.
+        self.all_source_markdown_basenames_lower.clear()
+        self.all_source_markdown_basenames_lower.update(basenames)
+        return changed_basenames
+
+    def _plan_changed_pages(self, relative_paths: set):
+        """Same as plan_pages, restricted to 'relative_paths' and checked against the entries in memory."""
+        self.previous_pages = self.manifest_pages
+        self.manifest_pages = dict(self.previous_pages)
+        self.pages_to_render = {}
+        for relative_path in sorted(relative_paths):
+            self.manifest_pages.pop(relative_path, None)
+            self.source_hashes.pop(relative_path, None)
+            if os.path.exists(os.path.join(self.source_dir, relative_path)):
+                self.plan_source_page(relative_path)
+            elif os.path.exists(os.path.join(self.destination_dir, relative_path)):
+                # A deleted note's page stays in the destination, as in a full run.
+                self.plan_destination_page(relative_path)
+
+    def apply_changes(self, changed_paths: set) -> bool:
+        """
+        Brings the destination and the source frontmatter up to date with the changed
+        files. Returns True if the manifest in memory changed.
+        """
+        start = time.perf_counter()
+        source_dir = os.path.abspath(self.source_dir)
+        ttl_dir = os.path.abspath(self.ttl_dir)
+        changed_md_files = set()
+        changed_ttl_files = set()
+        for path in changed_paths:
+            if path.endswith(".md") and _is_within(path, source_dir):
+                changed_md_files.add(os.path.relpath(path, source_dir))
+            elif path.endswith(".ttl") and _is_within(path, ttl_dir):
+                changed_ttl_files.add(os.path.join(self.ttl_dir, os.path.relpath(path, ttl_dir)))
+
+        graph_changed = False
+        for ttl_file in sorted(changed_ttl_files):
+            graph_changed = self.reload_ttl_file(ttl_file) or graph_changed
+
+        previous_page_paths = set(self.manifest_pages)
+        if graph_changed:
+            # Predicates and labels may have changed; rebuild them from the whole graph in memory
+            # (class depths come from the closure updated above) and let the dependency digests
+            # find the affected pages.
+            previous_build_digest = self.build_digest
+            # The graph was patched in place, so its catalogue is built from it rather than read from the cache.
+            self.predicate_catalogue = load_predicate_catalogue(self.graph)
+            self.predicate_sets = self.predicate_catalogue.predicate_sets
+            self.build_indexes()
+            self.plan_pages(self.manifest_pages if self.build_digest == previous_build_digest else {})
+        elif changed_md_files:
+            changed_basenames = self._update_source_basenames()
+            affected_pages = set(changed_md_files)
+            if changed_basenames:
+                affected_pages.update(
+                    relative_path for relative_path, entry in self.manifest_pages.items()
+                    if any(node_id.lower() in changed_basenames for node_id in entry["node_uris"]))
+            self._plan_changed_pages(affected_pages)
+        else:
+            return False
+
+        if not self.pages_to_render and set(self.manifest_pages) == previous_page_paths:
+            return False
+        if self.pages_to_render:
+            self.render()
+        page_paths_changed = set(self.manifest_pages) != previous_page_paths
+        # The related links of every page only change when a page is added or removed.
+        rendered_paths = None if graph_changed or page_paths_changed else {
+            os.path.relpath(dest_file_path, self.destination_dir) for dest_file_path in self.pages_to_render.values()}
+        self.record_synced_source_hashes(self.sync(rendered_paths))
+        print(f"Updated in {time.perf_counter() - start:.2f}s.")
+        return True
+
+def watch(session: WatchSession, poll_interval: float = None):
+    """
+    Runs the pipeline once, then keeps it loaded and applies every change to the
+    source and TTL folders until interrupted. File system notifications are used
+    when watchdog is installed and 'poll_interval' is not given; otherwise the
+    folders are polled. The manifest is saved whenever the session goes idle.
+    """
+    session.run()
+
+    suffixes_by_dir = {os.path.abspath(session.source_dir): ".md", os.path.abspath(session.ttl_dir): ".ttl"}
+    if Observer is not None and poll_interval is None:
+        watcher = EventWatcher(suffixes_by_dir)
+    else:
+        if Observer is None and poll_interval is None:
+            print("watchdog is not installed. Polling for changes instead.")
+        watcher = PollingWatcher(suffixes_by_dir, poll_interval or WATCH_POLL_INTERVAL)
+    watcher.start()
+    print(f"Watching '{session.source_dir}' and '{session.ttl_dir}' for changes. Press Ctrl+C to stop.")
+
+    manifest_changed = False
+    try:
+        while True:
+            changed_paths = watcher.wait_for_changes(WATCH_POLL_INTERVAL)
+            if changed_paths:
+                manifest_changed = session.apply_changes(changed_paths) or manifest_changed
+            elif manifest_changed:
+                session.save_manifest()
+                manifest_changed = False
+    except KeyboardInterrupt:
+        print("Stopping watch mode.")
+    finally:
+        watcher.stop()
+        if manifest_changed:
+            session.save_manifest()
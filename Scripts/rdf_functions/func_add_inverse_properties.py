@@ -1,46 +1,109 @@
-from rdflib import Graph, URIRef
-from rdflib.namespace import SKOS, OWL # OWL for owl:inverseOf if we were to use it directly
+from rdflib import Graph, URIRef, Literal
+from rdflib.namespace import SKOS, OWL, RDF
 
-def add_inverse_properties(graph: Graph) -> Graph:
+# Inverse pairs and symmetric properties applied even if the graph does not declare them.
+# The graph's own owl:inverseOf and owl:SymmetricProperty declarations are added to these.
+SKOS_INVERSE_PAIRS = [
+    (SKOS.broader, SKOS.narrower),
+    (SKOS.hasTopConcept, SKOS.topConceptOf),
+    # Add more inverse pairs here if needed, e.g.:
+    # (URIRef("http://example.org/myvocab/hasPart"), URIRef("http://example.org/myvocab/isPartOf")),
+]
+SKOS_SYMMETRIC_PROPERTIES = {SKOS.related}
+
+def build_inverse_rules(graph: Graph, include_skos_defaults: bool = True) -> dict[URIRef, set[URIRef]]:
+    """
+    Maps each predicate to the predicates of the triples it implies in the other
+    direction: (s p o) implies (o q s) for every q in rules[p]. Read from the
+    graph's owl:inverseOf and owl:SymmetricProperty declarations, plus the SKOS
+    defaults. Only the declaration triples are visited.
+    """
+    rules = {}
+    inverse_pairs = list(SKOS_INVERSE_PAIRS) if include_skos_defaults else []
+    symmetric_properties = set(SKOS_SYMMETRIC_PROPERTIES) if include_skos_defaults else set()
+    inverse_pairs.extend(graph.subject_objects(OWL.inverseOf))
+    symmetric_properties.update(graph.subjects(RDF.type, OWL.SymmetricProperty))
+
+    for p, q in inverse_pairs:
+        if isinstance(p, Literal) or isinstance(q, Literal):
+            continue
+        # owl:inverseOf works both ways.
+        rules.setdefault(p, set()).add(q)
+        rules.setdefault(q, set()).add(p)
+    for p in symmetric_properties:
+        rules.setdefault(p, set()).add(p)
+    return rules
+
+def _declared_predicates(triples) -> set[URIRef]:
+    """Returns the predicates that the owl:inverseOf and owl:SymmetricProperty triples among 'triples' declare."""
+    declared = set()
+    for s, p, o in triples:
+        if p == OWL.inverseOf:
+            declared.update((s, o))
+        elif p == RDF.type and o == OWL.SymmetricProperty:
+            declared.add(s)
+    return declared
+
+def infer_inverse_triples(graph: Graph, rules: dict[URIRef, set[URIRef]], delta: list) -> list[tuple]:
+    """
+    Adds the closure of 'delta' under 'rules' to the graph, semi-naively: each round
+    only looks at the triples the previous round added, and adds its results with
+    one addN call. Triples already in the graph and triples that would have a
+    literal subject are skipped. Returns the triples added, in the order added.
     """
-    Reviews an RDF graph and adds inverse properties based on common SKOS relationships.
+    inferred = []
+    seen = set()
+    while delta:
+        next_delta = []
+        for s, p, o in delta:
+            inverse_predicates = rules.get(p)
+            if not inverse_predicates or isinstance(o, Literal):
+                continue
+            for q in inverse_predicates:
+                inverse_triple = (o, q, s)
+                if inverse_triple in seen or inverse_triple in graph:
+                    continue
+                seen.add(inverse_triple)
+                next_delta.append(inverse_triple)
+        graph.addN((s, p, o, graph) for s, p, o in next_delta)
+        inferred.extend(next_delta)
+        delta = next_delta
+    return inferred
+
+def add_inverse_properties(graph: Graph, new_triples: list = None, include_skos_defaults: bool = True) -> Graph:
+    """
+    Reviews an RDF graph and adds the inverse of every triple whose predicate has an
+    inverse or is symmetric, until no more triples follow. Inverse pairs come from
+    owl:inverseOf, symmetric properties from owl:SymmetricProperty, both on top of
+    the common SKOS relationships.
 
     Args:
         graph (Graph): The rdflib Graph object to modify.
+        new_triples (list): Triples added to the graph since the last call. When given,
+                            only they (and every triple of a predicate they declare an
+                            inverse for) are looked at instead of the whole graph.
+        include_skos_defaults (bool): Whether to apply the SKOS inverse pairs even
+                                      when the graph does not declare them.
 
     Returns:
         Graph: The modified graph with inverse properties added.
     """
-    # Define a mapping of properties to their inverse properties.
-    # This dictionary can be extended with more inverse pairs as needed.
-    # Note: For symmetric properties like skos:related, the property is its own inverse.
-    inverse_map = {
-        SKOS.broader: SKOS.narrower,
-        SKOS.narrower: SKOS.broader,
-        SKOS.related: SKOS.related, # skos:related is symmetric
-        SKOS.hasTopConcept: SKOS.topConceptOf,
-        SKOS.topConceptOf: SKOS.hasTopConcept,
-        # Add more inverse pairs here if needed, e.g.:
-        # URIRef("http://example.org/myvocab/hasPart"): URIRef("http://example.org/myvocab/isPartOf"),
-    }
-
-    triples_to_add = []
-    
-    # Iterate over a copy of the graph's triples to avoid modification issues
     print("Checking for inverse properties to add...")
-    for s, p, o in list(graph): # Using list(graph) creates a copy of triples
-        if p in inverse_map:
-            inverse_predicate = inverse_map[p]
-            # Check if the inverse triple already exists to avoid duplicates
-            if (o, inverse_predicate, s) not in graph:
-                triples_to_add.append((o, inverse_predicate, s))
-                # print(f"  Adding inverse: ({o}, {inverse_predicate}, {s})") # Uncomment for verbose output
+    rules = build_inverse_rules(graph, include_skos_defaults)
+    if new_triples is None:
+        affected_predicates = rules.keys()
+        delta = []
+    else:
+        # A new declaration applies to the triples already in the graph as well.
+        affected_predicates = _declared_predicates(new_triples) & rules.keys()
+        delta = list(new_triples)
+    for p in affected_predicates:
+        delta.extend(graph.triples((None, p, None)))
 
+    triples_to_add = infer_inverse_triples(graph, rules, delta)
     if triples_to_add:
-        for t in triples_to_add:
-            graph.add(t)
         print(f"Added {len(triples_to_add)} inverse triples to the graph.")
     else:
         print("No new inverse triples found to add.")
 
-    return graph
\ No newline at end of file
+    return graph
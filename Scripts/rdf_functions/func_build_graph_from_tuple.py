@@ -1,11 +1,76 @@
+import re
+from itertools import islice
 from rdflib import Graph, URIRef, Literal, Namespace
-from rdflib.namespace import SKOS, RDF, DCTERMS
-from typing import Any
+from rdflib.namespace import SKOS, RDF, DCTERMS, NamespaceManager
+from typing import Any, Iterator
+
+# Number of triples added to the graph per addN call.
+BUILD_BATCH_SIZE = 50000
+
+# Turtle's PN_LOCAL production, without the backslash escapes: the local parts a
+# prefixed name can have. Any other URI is written in full.
+_PN_CHARS_BASE = ("A-Za-z\u00C0-\u00D6\u00D8-\u00F6\u00F8-\u02FF\u0370-\u037D\u037F-\u1FFF"
+                  "\u200C-\u200D\u2070-\u218F\u2C00-\u2FEF\u3001-\uD7FF\uF900-\uFDCF\uFDF0-\uFFFD"
+                  "\U00010000-\U000EFFFF")
+_PN_CHARS_U = _PN_CHARS_BASE + "_"
+_PN_CHARS = _PN_CHARS_U + "\\-0-9\u00B7\u0300-\u036F\u203F-\u2040"
+_PLX = "%[0-9A-Fa-f]{2}"
+PN_LOCAL_REGEX = re.compile(f"(?:[{_PN_CHARS_U}:0-9]|{_PLX})(?:(?:[{_PN_CHARS}.:]|{_PLX})*(?:[{_PN_CHARS}:]|{_PLX}))?")
+
+def _concept_scheme_uri(config: dict[str, Any]) -> URIRef:
+    # Use the configurable namespace for the concept scheme URI
+    return URIRef(config["main_namespace"][""])
+
+def generate_triples_from_tuple(concepts_data: dict[URIRef, dict[str, Any]],
+                                config: dict[str, Any],
+                                subject_categories: set[str],
+                                terms_to_uri: dict[str, URIRef]) -> Iterator[tuple]:
+    """
+    Yields the triples of the thesaurus graph one concept at a time, in the order
+    build_graph_from_tuple adds them. The subject category URIs are looked up once,
+    so the whole run is linear in the number of triples.
+
+    Args:
+        concepts_data (dict[URIRef, dict[str, Any]]): The data structure of concepts,
+                                                     labels, and relationships.
+        config (dict[str, Any]): A dictionary containing configurable graph properties.
+        subject_categories (set[str]): Set of subject category terms.
+        terms_to_uri (dict[str, URIRef]): Mapping of all terms to their URI references.
+
+    Yields:
+        tuple: (subject, predicate, object) triples.
+    """
+    concept_scheme_uri = _concept_scheme_uri(config)
+    yield concept_scheme_uri, RDF.type, SKOS.ConceptScheme
+    yield concept_scheme_uri, DCTERMS.title, Literal(config["title"], lang=config["default_lang"])
+
+    category_uris = {terms_to_uri[cat] for cat in subject_categories if cat in terms_to_uri}
+    default_lang = config["default_lang"]
+    for subject_uri, data in concepts_data.items():
+        for t in data['type']:
+            yield subject_uri, RDF.type, t
+        if subject_uri in category_uris:
+            yield subject_uri, RDF.type, SKOS.Collection
+
+        yield subject_uri, SKOS.inScheme, concept_scheme_uri
+
+        # Add prefLabels
+        for lang, label in data['prefLabel'].items():
+            yield subject_uri, SKOS.prefLabel, Literal(label, lang=lang)
+
+        # Add altLabels
+        for alt_label in data['altLabel']:
+            yield subject_uri, SKOS.altLabel, Literal(alt_label, lang=default_lang)
+
+        # Add relationships
+        for predicate, obj in data['relationships']:
+            yield subject_uri, predicate, obj
 
 def build_graph_from_tuple(concepts_data: dict[URIRef, dict[str, Any]],
                       config: dict[str, Any],
                       subject_categories: set[str],
-                      terms_to_uri: dict[str, URIRef]) -> Graph:
+                      terms_to_uri: dict[str, URIRef],
+                      batch_size: int = BUILD_BATCH_SIZE) -> Graph:
     """
     Builds a final rdflib Graph from a processed data dictionary and a configuration.
 
@@ -15,44 +80,112 @@ def build_graph_from_tuple(concepts_data: dict[URIRef, dict[str, Any]],
         config (dict[str, Any]): A dictionary containing configurable graph properties.
         subject_categories (set[str]): Set of subject category terms.
         terms_to_uri (dict[str, URIRef]): Mapping of all terms to their URI references.
+        batch_size (int): Number of triples inserted per bulk addN call.
 
     Returns:
         Graph: The final, populated RDF graph.
     """
     g = Graph()
-    
+
     # Dynamically bind all namespaces from the config dictionary
     for prefix, namespace in config["namespaces"].items():
         g.bind(prefix, namespace)
 
-    # Note: SKOS, RDF, DCTERMS are standard rdflib objects, so we can still use them directly
-    # even if they are bound dynamically.
-    
-    # Use the configurable namespace for the concept scheme URI
-    concept_scheme_uri = config["main_namespace"][""]
-    g.add((concept_scheme_uri, RDF.type, SKOS.ConceptScheme))
-    g.add((concept_scheme_uri, DCTERMS.title, Literal(config["title"], lang=config["default_lang"])))
-
     print("Building the RDF graph...")
-    for subject_uri, data in concepts_data.items():
-        if subject_uri in [terms_to_uri[cat] for cat in subject_categories if cat in terms_to_uri]:
-            data['type'].append(SKOS.Collection)
+    triples = generate_triples_from_tuple(concepts_data, config, subject_categories, terms_to_uri)
+    while True:
+        batch = [(s, p, o, g) for s, p, o in islice(triples, batch_size)]
+        if not batch:
+            break
+        g.addN(batch)
 
-        for t in data['type']:
-            g.add((subject_uri, RDF.type, t))
-        
-        g.add((subject_uri, SKOS.inScheme, concept_scheme_uri))
-        
-        # Add prefLabels
-        for lang, label in data['prefLabel'].items():
-            g.add((subject_uri, SKOS.prefLabel, Literal(label, lang=lang)))
-        
-        # Add altLabels
-        for alt_label in data['altLabel']:
-            g.add((subject_uri, SKOS.altLabel, Literal(alt_label, lang=config["default_lang"])))
+    return g
 
-        # Add relationships
-        for predicate, obj in data['relationships']:
-            g.add((subject_uri, predicate, obj))
-    
-    return g
\ No newline at end of file
+def _nt_term(term) -> str:
+    """Writes a term as N-Triples, escaping literals the way rdflib's N-Triples serializer does."""
+    if not isinstance(term, Literal):
+        return term.n3()
+    encoded = '"%s"' % str(term).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"').replace("\r", "\\r")
+    if term.language:
+        return f"{encoded}@{term.language}"
+    if term.datatype:
+        return f"{encoded}^^<{term.datatype}>"
+    return encoded
+
+def _turtle_term(term, namespaces: list[tuple[str, str]], namespace_manager: NamespaceManager) -> str:
+    """
+    Writes a term as Turtle. A URI is written as a prefixed name when it starts
+    with one of 'namespaces', tried longest first, and the rest is a valid local
+    name (not e.g. 'canada.' or 'b(c)'); otherwise it is written as <iri>.
+    """
+    if isinstance(term, Literal):
+        return term.n3(namespace_manager)
+    for prefix, namespace in namespaces:
+        if term.startswith(namespace):
+            local_name = term[len(namespace):]
+            if not local_name or PN_LOCAL_REGEX.fullmatch(local_name):
+                return f"{prefix}:{local_name}"
+    return term.n3()
+
+def write_graph_from_tuple(concepts_data: dict[URIRef, dict[str, Any]],
+                           config: dict[str, Any],
+                           subject_categories: set[str],
+                           terms_to_uri: dict[str, URIRef],
+                           output_path: str,
+                           rdf_format: str = "nt") -> int:
+    """
+    Writes the graph build_graph_from_tuple would build straight to 'output_path'
+    as N-Triples ("nt") or Turtle ("turtle"), without building an rdflib Graph, so
+    memory does not grow with the size of the thesaurus. Turtle output uses the
+    config's namespaces as prefixes, where the local name allows it, and groups
+    each concept's triples under its subject.
+
+    Returns:
+        int: The number of triples written.
+    """
+    if rdf_format not in ("nt", "turtle"):
+        raise ValueError(f"Unsupported format '{rdf_format}', expected 'nt' or 'turtle'.")
+
+    namespace_manager = NamespaceManager(Graph(), bind_namespaces="none")
+    for prefix, namespace in config["namespaces"].items():
+        namespace_manager.bind(prefix, namespace)
+    namespaces = sorted(((prefix, str(namespace)) for prefix, namespace in namespace_manager.namespaces()),
+                        key=lambda item: len(item[1]), reverse=True)
+
+    print(f"Writing the RDF graph to {output_path}...")
+    triple_count = 0
+    current_subject = None
+    # Each concept's triples come out together, so duplicates are only looked for within a subject.
+    subject_triples = set()
+    # Only a handful of predicates are used, so their prefixed names are worked out once.
+    predicate_names = {}
+    with open(output_path, "w", encoding="utf-8") as f:
+        if rdf_format == "turtle":
+            for prefix, namespace in namespace_manager.namespaces():
+                f.write(f"@prefix {prefix}: <{namespace}> .\n")
+            f.write("\n")
+        for s, p, o in generate_triples_from_tuple(concepts_data, config, subject_categories, terms_to_uri):
+            if s != current_subject:
+                if rdf_format == "turtle" and current_subject is not None:
+                    f.write(" .\n\n")
+                current_subject = s
+                subject_triples = set()
+            elif (p, o) in subject_triples:
+                continue
+            subject_triples.add((p, o))
+            triple_count += 1
+            if rdf_format == "nt":
+                f.write(f"{_nt_term(s)} {_nt_term(p)} {_nt_term(o)} .\n")
+            else:
+                if p not in predicate_names:
+                    predicate_names[p] = _turtle_term(p, namespaces, namespace_manager)
+                if len(subject_triples) == 1:
+                    f.write(f"{_turtle_term(s, namespaces, namespace_manager)}\n"
+                            f"    {predicate_names[p]} {_turtle_term(o, namespaces, namespace_manager)}")
+                else:
+                    f.write(f" ;\n    {predicate_names[p]} {_turtle_term(o, namespaces, namespace_manager)}")
+        if rdf_format == "turtle" and current_subject is not None:
+            f.write(" .\n")
+
+    print(f"Wrote {triple_count} triples.")
+    return triple_count
@@ -1,12 +1,75 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 from rdflib import Graph
+from shared_functions.rdf_io import parse_ttl_file
 
-def combine_ttls_to_graphs(file_paths: list[str]) -> Graph:
+# RDF formats read by combine_ttls_to_graphs, by file extension.
+RDF_FORMATS_BY_EXTENSION = {".ttl": "turtle", ".nt": "nt"}
+# Number of parsed triples added to the graph per addN call.
+INGEST_BATCH_SIZE = 50000
+# A progress line is printed every time this many more triples were parsed from a file.
+PROGRESS_INTERVAL = 1000000
+
+class _BatchingSink(Graph):
+    """
+    Graph handed to the parser that forwards triples to 'target' in batches of
+    'batch_size' through one addN call each, instead of storing them. Keeps a
+    running count of the triples parsed and reports it every 'progress_interval'.
+    """
+    def __init__(self, target: Graph, batch_size: int = INGEST_BATCH_SIZE,
+                 progress_interval: int = PROGRESS_INTERVAL):
+        super().__init__()
+        self.target = target
+        # Prefixes are bound on the target as the parser declares them, like parsing into it directly.
+        self.namespace_manager = target.namespace_manager
+        self.batch_size = batch_size
+        self.progress_interval = progress_interval
+        self.batch = []
+        self.triple_count = 0
+
+    def add(self, triple):
+        s, p, o = triple
+        self.batch.append((s, p, o, self.target))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+        return self
+
+    def flush(self):
+        if not self.batch:
+            return
+        self.target.addN(self.batch)
+        previous_count = self.triple_count
+        self.triple_count += len(self.batch)
+        self.batch = []
+        if self.triple_count // self.progress_interval > previous_count // self.progress_interval:
+            print(f"    ... {self.triple_count} triples")
+
+def _stream_file_into_graph(file_path: str, rdf_format: str, g: Graph, batch_size: int) -> int:
+    """
+    Parses one file straight into 'g' in batches and returns the number of triples
+    parsed. N-Triples are read line by line; Turtle is read whole by the parser,
+    but its triples are not collected anywhere before reaching 'g'.
     """
-    Parses a list of Turtle (.ttl) files into a single rdflib Graph.
+    sink = _BatchingSink(g, batch_size)
+    try:
+        sink.parse(file_path, format=rdf_format)
+    finally:
+        # As with parsing into 'g' directly, the triples read before an error are kept.
+        sink.flush()
+    return sink.triple_count
+
+def combine_ttls_to_graphs(file_paths: list[str], max_workers: int = 1,
+                           batch_size: int = INGEST_BATCH_SIZE) -> Graph:
+    """
+    Parses a list of Turtle (.ttl) and N-Triples (.nt) files into a single rdflib Graph.
 
     Args:
-        file_paths (list[str]): A list of paths to the TTL files.
+        file_paths (list[str]): A list of paths to the TTL and N-Triples files.
+        max_workers (int): Number of processes used to parse files in parallel.
+                           Defaults to 1, which streams the files one after another.
+        batch_size (int): Number of triples added to the graph at a time when
+                          streaming, so memory stays near the graph's own size.
 
     Returns:
         Graph: A single rdflib Graph containing all parsed triples.
@@ -14,24 +77,53 @@ def combine_ttls_to_graphs(file_paths: list[str]) -> Graph:
     """
     g = Graph()
     parsed_files_count = 0
-    
+
     if not file_paths:
         print("No files to parse.")
         return g
 
+    rdf_file_paths = []
     for file_path in file_paths:
-        # A simple check to ensure the file has the correct extension
-        if not file_path.lower().endswith('.ttl'):
-            print(f"Skipping non-TTL file: {file_path}")
+        # A simple check to ensure the file has a supported extension
+        rdf_format = RDF_FORMATS_BY_EXTENSION.get(os.path.splitext(file_path)[1].lower())
+        if rdf_format is None:
+            print(f"Skipping unsupported file: {file_path}")
             continue
-            
-        try:
-            g.parse(file_path, format="turtle")
-            parsed_files_count += 1
-            print(f"  Successfully parsed {os.path.basename(file_path)}. Triples: {len(g)}")
-        except Exception as e:
-            print(f"  Error parsing {file_path}: {e}")
-            
-    print(f"\nFinished parsing {parsed_files_count} TTL files.")
+        rdf_file_paths.append((file_path, rdf_format))
+
+    if max_workers > 1 and len(rdf_file_paths) > 1:
+        # Parse the files in a process pool, then merge all triples in one bulk step.
+        parsed_results = []
+        total_triple_count = 0
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(rdf_file_paths))) as executor:
+            futures = [executor.submit(parse_ttl_file, file_path, rdf_format) for file_path, rdf_format in rdf_file_paths]
+            for (file_path, _), future in zip(rdf_file_paths, futures):
+                try:
+                    triples, namespaces = future.result()
+                    parsed_results.append((triples, namespaces))
+                    total_triple_count += len(triples)
+                    parsed_files_count += 1
+                    print(f"  Successfully parsed {os.path.basename(file_path)}. "
+                          f"Triples: {len(triples)} (running total: {total_triple_count})")
+                except Exception as e:
+                    print(f"  Error parsing {file_path}: {e}")
+
+        for _, namespaces in parsed_results:
+            for prefix, namespace in namespaces:
+                g.bind(prefix, namespace)
+        g.addN((s, p, o, g) for s, p, o in chain.from_iterable(triples for triples, _ in parsed_results))
+    else:
+        total_triple_count = 0
+        for file_path, rdf_format in rdf_file_paths:
+            try:
+                triple_count = _stream_file_into_graph(file_path, rdf_format, g, batch_size)
+                total_triple_count += triple_count
+                parsed_files_count += 1
+                print(f"  Successfully parsed {os.path.basename(file_path)}. "
+                      f"Triples: {triple_count} (running total: {total_triple_count})")
+            except Exception as e:
+                print(f"  Error parsing {file_path}: {e}")
+
+    print(f"\nFinished parsing {parsed_files_count} RDF files.")
     print(f"Total triples in the combined graph: {len(g)}")
-    return g
\ No newline at end of file
+    return g
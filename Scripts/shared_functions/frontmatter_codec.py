@@ -0,0 +1,119 @@
+import re
+import pickle
+import hashlib
+from collections import OrderedDict
+import yaml
+
+# Frontmatter parsing and dumping shared by obsidian_functions and processing_for_quartz.
+
+# libyaml's loader and emitter when PyYAML was built with them, else the pure-Python ones.
+try:
+    from yaml import CSafeLoader as FrontmatterLoader, CDumper as FastFrontmatterDumper
+except ImportError:
+    from yaml import SafeLoader as FrontmatterLoader
+    FastFrontmatterDumper = None
+
+# The frontmatter block as the sync has always matched it: an opening '---' line, the
+# YAML, then the first later '---' line. Group 2 is the body after the closing line.
+FRONTMATTER_BLOCK_REGEX = re.compile(r"^-{3}\s*\n(.*?)\n-{3}\s*\n(.*)", re.DOTALL)
+# Tried when FRONTMATTER_BLOCK_REGEX does not match. As python-frontmatter does, it also
+# takes an empty block (group 1 is then None) and a closing line that ends the file.
+FRONTMATTER_BLOCK_FALLBACK_REGEX = re.compile(r"^-{3}\s*\n(?:(.*?)\n)?-{3}(?:\s*\n|[^\S\n]*\Z)(.*)", re.DOTALL)
+
+# Number of parsed frontmatter blocks kept by the parse cache.
+PARSE_CACHE_SIZE = 50000
+
+class FrontmatterParseCache:
+    """
+    LRU cache of parsed frontmatter keyed by the hash of the YAML text, so a block
+    read by both the rendering stage and the sync in one run is only parsed once.
+    The text is stripped before it is hashed and parsed, since the two stages cut
+    the block out of the file with different surrounding whitespace. Entries are
+    stored pickled and every lookup returns a fresh copy, which callers may modify
+    freely.
+    """
+    def __init__(self, max_size: int = PARSE_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, yaml_text: str):
+        yaml_text = yaml_text.strip()
+        key = hashlib.sha1(yaml_text.encode("utf-8")).digest()
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return pickle.loads(entry)
+        self.misses += 1
+        data = yaml.load(yaml_text, Loader=FrontmatterLoader)
+        self._entries[key] = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return data
+
+    def clear(self):
+        self._entries.clear()
+
+_parse_cache = FrontmatterParseCache()
+
+def load_frontmatter_yaml(yaml_text: str):
+    """Parses a frontmatter YAML block like yaml.safe_load(yaml_text.strip()), through the shared parse cache."""
+    return _parse_cache.load(yaml_text)
+
+def _emits_identically_with_libyaml(data, allow_unicode: bool) -> bool:
+    """
+    Whether libyaml's emitter writes exactly what PyYAML's would. They differ in how
+    they wrap and escape double-quoted scalars (non-printable characters, non-ASCII
+    without allow_unicode, characters outside the BMP) and in how they write empty keys.
+    """
+    if isinstance(data, str):
+        return data.isprintable() and (data.isascii() or (allow_unicode and max(data) < "\U00010000"))
+    if isinstance(data, dict):
+        return all(key != "" and _emits_identically_with_libyaml(key, allow_unicode) and
+                   _emits_identically_with_libyaml(value, allow_unicode) for key, value in data.items())
+    if isinstance(data, (list, tuple)):
+        return all(_emits_identically_with_libyaml(item, allow_unicode) for item in data)
+    return True
+
+def dump_frontmatter_yaml(data: dict, **options) -> str:
+    """
+    Dumps frontmatter like yaml.dump(data, sort_keys=False, **options). libyaml's
+    emitter is used only where its output is identical, so files come out the same
+    whether or not it is installed.
+    """
+    options.setdefault("sort_keys", False)
+    if FastFrontmatterDumper is not None and _emits_identically_with_libyaml(data, options.get("allow_unicode", False)):
+        return yaml.dump(data, Dumper=FastFrontmatterDumper, **options)
+    return yaml.dump(data, **options)
+
+def match_frontmatter_block(content: str) -> tuple[str, str]:
+    """
+    Returns the (YAML text, body) of the frontmatter block at the start of 'content',
+    or None if there is none. Blocks the sync has always found are split exactly as
+    before; empty blocks and blocks closed on the last line are found as well.
+    """
+    match = FRONTMATTER_BLOCK_REGEX.match(content) or FRONTMATTER_BLOCK_FALLBACK_REGEX.match(content)
+    if not match:
+        return None
+    return match.group(1) or "", match.group(2)
+
+def parse_frontmatter(content: str) -> tuple[dict, str]:
+    """
+    Splits Markdown content into its parsed frontmatter and body. Content without a
+    frontmatter block gives an empty dict and the whole content; an empty block, or
+    one whose YAML is not a mapping, gives an empty dict and the body after it.
+    """
+    block = match_frontmatter_block(content)
+    if block is None:
+        return {}, content
+    yaml_text, body = block
+    metadata = load_frontmatter_yaml(yaml_text)
+    if not isinstance(metadata, dict):
+        metadata = {}
+    return metadata, body
+
+def compose_frontmatter(frontmatter: dict, body: str, **options) -> str:
+    """Joins frontmatter and body back into Markdown content, as the sync writes source files."""
+    return f"---\n{dump_frontmatter_yaml(frontmatter, **options)}---\n{body}"
@@ -0,0 +1,24 @@
+from rdflib import Graph
+
+# RDF reading shared by rdf_functions and processing_for_quartz, so neither
+# package has to import the other.
+
+class _TripleRecorder(Graph):
+    """
+    Graph handed to the Turtle parser that records triples in parse order.
+    Iterating a Graph does not follow insertion order, and the Mermaid output
+    depends on it, so cached triples must be replayed in the order they were parsed.
+    """
+    def __init__(self):
+        super().__init__()
+        self.parsed_triples = []
+
+    def add(self, triple):
+        self.parsed_triples.append(triple)
+        return self
+
+def parse_ttl_file(ttl_file: str, rdf_format: str = "turtle") -> tuple[list, list]:
+    """Parses a single TTL (or other RDF) file and returns its triples (in parse order) and namespace bindings."""
+    file_graph = _TripleRecorder()
+    file_graph.parse(ttl_file, format=rdf_format)
+    return file_graph.parsed_triples, list(file_graph.namespaces())
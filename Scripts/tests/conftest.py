@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The packages under test are imported from the Scripts directory, as when running them.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,43 @@
+"""
+Copies the sample vault in fixtures/sample_vault (notes and TTL files) to a
+temporary directory and runs the pipeline on it, for tests that need a whole build.
+"""
+import io
+import os
+import shutil
+from contextlib import redirect_stdout
+from processing_for_quartz.pipeline import Pipeline
+
+SAMPLE_VAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "sample_vault")
+
+class SampleVault:
+    def __init__(self, root_dir: str):
+        self.source_dir = os.path.join(root_dir, "notes")
+        self.destination_dir = os.path.join(root_dir, "content")
+        self.ttl_dir = os.path.join(root_dir, "ttl")
+        self.graph_cache_dir = os.path.join(root_dir, "graph_cache")
+        self.manifest_path = os.path.join(root_dir, "content.build_manifest.json")
+        shutil.copytree(os.path.join(SAMPLE_VAULT_DIR, "notes"), self.source_dir)
+        shutil.copytree(os.path.join(SAMPLE_VAULT_DIR, "ttl"), self.ttl_dir)
+
+    def pipeline(self, pipeline_class=Pipeline, **options) -> Pipeline:
+        options.setdefault("graph_cache_dir", self.graph_cache_dir)
+        options.setdefault("manifest_path", self.manifest_path)
+        options.setdefault("parse_jobs", 1)
+        return pipeline_class(self.source_dir, self.destination_dir, self.ttl_dir, **options)
+
+    def run(self, **options) -> str:
+        """Runs the whole pipeline once and returns what it printed."""
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.pipeline(**options).run()
+        return output.getvalue()
+
+    def read_outputs(self) -> dict:
+        """Returns {relative path: content} of every page in the destination folder."""
+        return {os.path.relpath(os.path.join(root, name), self.destination_dir): read_text(os.path.join(root, name))
+                for root, _, names in os.walk(self.destination_dir) for name in names}
+
+def read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
@@ -0,0 +1,136 @@
+"""
+Tests for add_inverse_properties and infer_inverse_triples: inverse and symmetric
+properties, literal objects, and updates given only the new triples, which must
+close the graph exactly as a full pass does.
+
+Run from the Scripts directory:
+    python -m unittest discover -s tests
+"""
+import io
+import random
+import unittest
+from contextlib import redirect_stdout
+from rdflib import Graph, URIRef, Literal
+from rdflib.namespace import OWL, RDF, SKOS
+from rdf_functions.func_add_inverse_properties import add_inverse_properties, build_inverse_rules, infer_inverse_triples
+
+EX = "http://example.org/"
+HAS_PART = URIRef(EX + "hasPart")
+IS_PART_OF = URIRef(EX + "isPartOf")
+SIBLING_OF = URIRef(EX + "siblingOf")
+NAME = URIRef(EX + "name")
+
+def node(name) -> URIRef:
+    return URIRef(f"{EX}{name}")
+
+def graph_of(triples) -> Graph:
+    graph = Graph()
+    for triple in triples:
+        graph.add(triple)
+    return graph
+
+def add_inverses(graph: Graph, new_triples: list = None, include_skos_defaults: bool = True) -> Graph:
+    with redirect_stdout(io.StringIO()):
+        return add_inverse_properties(graph, new_triples, include_skos_defaults)
+
+class AddInversePropertiesTest(unittest.TestCase):
+    def test_declared_inverse_and_skos_defaults(self):
+        graph = add_inverses(graph_of([
+            (HAS_PART, OWL.inverseOf, IS_PART_OF),
+            (node("car"), HAS_PART, node("wheel")),
+            (node("door"), IS_PART_OF, node("car")),
+            (node("tree"), SKOS.broader, node("plant")),
+        ]))
+        self.assertIn((node("wheel"), IS_PART_OF, node("car")), graph)
+        self.assertIn((node("car"), HAS_PART, node("door")), graph)
+        self.assertIn((node("plant"), SKOS.narrower, node("tree")), graph)
+
+        without_defaults = add_inverses(graph_of([(node("tree"), SKOS.broader, node("plant"))]),
+                                        include_skos_defaults=False)
+        self.assertEqual(len(without_defaults), 1)
+
+    def test_symmetric_property(self):
+        graph = add_inverses(graph_of([
+            (SIBLING_OF, RDF.type, OWL.SymmetricProperty),
+            (node("ann"), SIBLING_OF, node("ben")),
+            (node("ben"), SIBLING_OF, node("cat")),
+            (node("ann"), SKOS.related, node("ben")),
+        ]))
+        self.assertIn((node("ben"), SIBLING_OF, node("ann")), graph)
+        self.assertIn((node("cat"), SIBLING_OF, node("ben")), graph)
+        self.assertIn((node("ben"), SKOS.related, node("ann")), graph)
+        # Symmetry is not transitivity, and a triple is only ever added once.
+        self.assertNotIn((node("ann"), SIBLING_OF, node("cat")), graph)
+        self.assertEqual(len(graph), 7)
+
+    def test_literal_objects_are_skipped(self):
+        graph = graph_of([
+            (NAME, OWL.inverseOf, URIRef(EX + "nameOf")),
+            (NAME, RDF.type, OWL.SymmetricProperty),
+            (node("ann"), NAME, Literal("Ann")),
+            (node("ann"), SKOS.related, Literal("a note")),
+        ])
+        rules = build_inverse_rules(graph)
+        self.assertEqual(infer_inverse_triples(graph, rules, list(graph)), [])
+        self.assertEqual(len(graph), 4)
+
+    def test_inverse_of_a_symmetric_property_is_closed(self):
+        # (a p b) gives (b q a), which as q is symmetric gives (a q b), which gives (b p a).
+        graph = graph_of([
+            (HAS_PART, OWL.inverseOf, IS_PART_OF),
+            (IS_PART_OF, RDF.type, OWL.SymmetricProperty),
+            (node("a"), HAS_PART, node("b")),
+        ])
+        added = infer_inverse_triples(graph, build_inverse_rules(graph), [(node("a"), HAS_PART, node("b"))])
+        self.assertEqual(set(added), {(node("b"), IS_PART_OF, node("a")), (node("a"), IS_PART_OF, node("b")),
+                                      (node("b"), HAS_PART, node("a"))})
+        self.assertEqual(infer_inverse_triples(graph, build_inverse_rules(graph), list(graph)), [])
+
+class DeltaUpdateTest(unittest.TestCase):
+    def test_only_new_triples_are_looked_at(self):
+        # The old triple's inverse is missing on purpose: a delta update does not revisit it.
+        old_triple = (node("house"), HAS_PART, node("roof"))
+        graph = graph_of([(HAS_PART, OWL.inverseOf, IS_PART_OF), old_triple])
+        new_triples = [(node("car"), HAS_PART, node("wheel")), (node("car"), NAME, Literal("Car"))]
+        for triple in new_triples:
+            graph.add(triple)
+        add_inverses(graph, new_triples)
+        self.assertIn((node("wheel"), IS_PART_OF, node("car")), graph)
+        self.assertNotIn((node("roof"), IS_PART_OF, node("house")), graph)
+        self.assertEqual(len(graph), 5)
+
+    def test_new_declaration_applies_to_existing_triples(self):
+        graph = add_inverses(graph_of([(node("ann"), SIBLING_OF, node("ben")),
+                                       (node("car"), HAS_PART, node("wheel"))]))
+        self.assertEqual(len(graph), 2)
+        new_triples = [(SIBLING_OF, RDF.type, OWL.SymmetricProperty), (IS_PART_OF, OWL.inverseOf, HAS_PART)]
+        for triple in new_triples:
+            graph.add(triple)
+        add_inverses(graph, new_triples)
+        self.assertIn((node("ben"), SIBLING_OF, node("ann")), graph)
+        self.assertIn((node("wheel"), IS_PART_OF, node("car")), graph)
+
+    def test_delta_update_matches_full_pass_on_random_graphs(self):
+        rng = random.Random(23)
+        predicates = [HAS_PART, IS_PART_OF, SIBLING_OF, NAME, SKOS.broader, SKOS.related, node("other")]
+        declarations = [(HAS_PART, OWL.inverseOf, IS_PART_OF), (SIBLING_OF, RDF.type, OWL.SymmetricProperty),
+                        (NAME, OWL.inverseOf, node("other"))]
+
+        def random_triple():
+            obj = Literal("value") if rng.random() < 0.1 else node(rng.randrange(12))
+            return node(rng.randrange(12)), rng.choice(predicates), obj
+
+        for _ in range(100):
+            old_triples = [random_triple() for _ in range(rng.randint(0, 20))]
+            new_triples = [random_triple() for _ in range(rng.randint(0, 10))]
+            for declaration in declarations:
+                rng.choice((old_triples, new_triples, [])).append(declaration)
+            updated = add_inverses(graph_of(old_triples))
+            for triple in new_triples:
+                updated.add(triple)
+            add_inverses(updated, new_triples)
+            full = add_inverses(graph_of(old_triples + new_triples))
+            self.assertEqual(set(updated), set(full))
+
+if __name__ == "__main__":
+    unittest.main()
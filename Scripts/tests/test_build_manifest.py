@@ -0,0 +1,129 @@
+"""
+Tests for the incremental build manifest: the dependency digests, the checks of
+is_page_up_to_date, and rejection of manifests written with other build inputs.
+
+Run from the Scripts directory:
+    python -m unittest discover -s tests
+"""
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from rdflib import Graph, URIRef, Literal
+from rdflib.namespace import RDFS
+from processing_for_quartz.build_manifest import (hash_file, compute_build_digest, load_build_manifest,
+                                                  save_build_manifest, DependencyDigests, build_page_entry,
+                                                  is_page_up_to_date)
+
+EX = "http://example.org/"
+ALICE, BOB, CAROL = URIRef(EX + "alice"), URIRef(EX + "bob"), URIRef(EX + "carol")
+KNOWS = URIRef(EX + "knows")
+
+class DependencyDigestsTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = Graph()
+        self.graph.add((ALICE, KNOWS, BOB))
+        self.graph.add((ALICE, RDFS.label, Literal("Alice")))
+
+    def test_digest_follows_triples_around_the_uri(self):
+        before = DependencyDigests(self.graph).digest([str(BOB)])
+        self.graph.add((CAROL, RDFS.label, Literal("Carol")))
+        self.assertEqual(DependencyDigests(self.graph).digest([str(BOB)]), before)
+        # BOB as object changes its digest as much as BOB as subject.
+        self.graph.add((CAROL, KNOWS, BOB))
+        self.assertNotEqual(DependencyDigests(self.graph).digest([str(BOB)]), before)
+
+    def test_digest_does_not_depend_on_uri_order(self):
+        digests = DependencyDigests(self.graph)
+        self.assertEqual(digests.digest([str(ALICE), str(BOB)]), digests.digest([str(BOB), str(ALICE)]))
+        self.assertNotEqual(digests.digest([str(ALICE)]), digests.digest([str(BOB)]))
+
+class IsPageUpToDateTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.output_path = os.path.join(self.temp_dir.name, "alice.md")
+        with open(self.output_path, "w", encoding="utf-8") as f:
+            f.write("# Alice\n")
+        self.graph = Graph()
+        self.graph.add((ALICE, KNOWS, BOB))
+        self.uris = {"alice": ALICE, "bob": BOB}
+        self.basenames = {"alice", "bob"}
+        self.entry = build_page_entry("source-hash", self.output_path, ALICE, False,
+                                      {"alice": str(ALICE), "bob": str(BOB)}, ["alice", "bob"],
+                                      {str(ALICE), str(BOB)}, DependencyDigests(self.graph), [str(BOB)])
+
+    def is_up_to_date(self, entry=..., source_hash="source-hash", page_uri=ALICE, skip_inverse=False) -> bool:
+        return is_page_up_to_date(self.entry if entry is ... else entry, source_hash, self.output_path, page_uri,
+                                  skip_inverse, self.basenames, lambda node_id: self.uris.get(node_id),
+                                  DependencyDigests(self.graph))
+
+    def test_unchanged_page(self):
+        self.assertTrue(self.is_up_to_date())
+
+    def test_missing_entry_or_output(self):
+        self.assertFalse(self.is_up_to_date(entry=None))
+        os.remove(self.output_path)
+        self.assertFalse(self.is_up_to_date())
+
+    def test_changed_source_or_output(self):
+        self.assertFalse(self.is_up_to_date(source_hash="other-hash"))
+        with open(self.output_path, "a", encoding="utf-8") as f:
+            f.write("Edited by hand.\n")
+        self.assertFalse(self.is_up_to_date())
+
+    def test_changed_page_scope(self):
+        self.assertFalse(self.is_up_to_date(page_uri=BOB))
+        self.assertFalse(self.is_up_to_date(skip_inverse=True))
+
+    def test_changed_links_and_node_uris(self):
+        self.basenames.discard("bob")
+        self.assertFalse(self.is_up_to_date())
+        self.basenames.add("bob")
+        self.uris["bob"] = CAROL
+        self.assertFalse(self.is_up_to_date())
+
+    def test_changed_dependency_triples(self):
+        self.graph.add((CAROL, KNOWS, ALICE))
+        self.assertFalse(self.is_up_to_date())
+
+class BuildManifestFileTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.manifest_path = os.path.join(self.temp_dir.name, "build_manifest.json")
+
+    def load(self, build_digest: str) -> tuple[dict, str]:
+        output = io.StringIO()
+        with redirect_stdout(output):
+            pages = load_build_manifest(self.manifest_path, build_digest)
+        return pages, output.getvalue()
+
+    def test_build_digest_ignores_set_order(self):
+        self.assertEqual(compute_build_digest({"a", "b", "c"}, "draft"), compute_build_digest({"c", "b", "a"}, "draft"))
+        self.assertNotEqual(compute_build_digest({"a", "b"}, "draft"), compute_build_digest({"a", "b"}, "final"))
+
+    def test_manifest_from_other_build_inputs_is_ignored(self):
+        self.assertEqual(self.load("digest")[0], {})
+        save_build_manifest(self.manifest_path, "digest", {"alice.md": {"source_hash": "hash"}})
+        self.assertEqual(self.load("digest")[0], {"alice.md": {"source_hash": "hash"}})
+        pages, output = self.load("other-digest")
+        self.assertEqual(pages, {})
+        self.assertIn("Rebuilding every page", output)
+
+    def test_unreadable_manifest_is_ignored(self):
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        pages, output = self.load("digest")
+        self.assertEqual(pages, {})
+        self.assertIn("Ignoring unreadable build manifest", output)
+
+    def test_hash_file(self):
+        with open(self.manifest_path, "wb") as f:
+            f.write(b"content")
+        self.assertEqual(hash_file(self.manifest_path),
+                         "ed7002b439e9ac845f22357d822bac1444730fbdb6016d3ec9432297b9ec9f73")
+
+if __name__ == "__main__":
+    unittest.main()
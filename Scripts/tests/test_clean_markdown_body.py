@@ -0,0 +1,46 @@
+"""
+Regression tests for clean_markdown_body against a fixture set of pathological
+Markdown bodies. Each fixtures/clean_markdown_body/<name>.md is cleaned and
+compared with <name>.expected.md. The expected files hold the output of the
+regex cascade that clean_markdown_body replaced, quirks included, so any change
+in behaviour shows up here.
+
+Run from the Scripts directory:
+    python -m unittest discover -s tests
+"""
+import os
+import glob
+import unittest
+from processing_for_quartz.markdown.read_write_clean_md import clean_markdown_body
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "clean_markdown_body")
+DEFAULT_TITLE = "Sample Title"
+# Fixtures cleaned with a title other than DEFAULT_TITLE.
+TITLES = {
+    "title_special_characters": "C++ (notes) [draft]",
+    # A heading of 40,000 spaces that fails and one that matches; the old line scan took seconds.
+    "whitespace_title_long_run": " ",
+}
+
+def read_fixture(path: str) -> str:
+    # newline="" keeps the fixture's whitespace exactly as written.
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return f.read()
+
+class CleanMarkdownBodyFixtureTest(unittest.TestCase):
+    def test_fixtures(self):
+        input_paths = sorted(path for path in glob.glob(os.path.join(FIXTURE_DIR, "*.md"))
+                             if not path.endswith(".expected.md"))
+        self.assertTrue(input_paths, f"No fixtures found in {FIXTURE_DIR}")
+        for input_path in input_paths:
+            name = os.path.basename(input_path)[:-len(".md")]
+            with self.subTest(fixture=name):
+                expected = read_fixture(os.path.join(FIXTURE_DIR, f"{name}.expected.md"))
+                self.assertEqual(clean_markdown_body(read_fixture(input_path), TITLES.get(name, DEFAULT_TITLE)), expected)
+
+    def test_without_title(self):
+        body = read_fixture(os.path.join(FIXTURE_DIR, "typical_page.md"))
+        self.assertTrue(clean_markdown_body(body, "").startswith("# Sample Title\n\nSome introduction text"))
+
+if __name__ == "__main__":
+    unittest.main()
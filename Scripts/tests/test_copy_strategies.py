@@ -0,0 +1,86 @@
+"""
+Tests for the copy strategies: "skip-unchanged" decides from the source content
+hashes in the build manifest, not from mtimes, and no strategy renders a page
+from its previous output.
+
+Run from the Scripts directory:
+    python -m unittest discover -s tests
+"""
+import os
+import tempfile
+import unittest
+from processing_for_quartz.copy_strategies import COPY_STRATEGIES, stage_source_file
+from processing_for_quartz.build_manifest import hash_file
+from sample_vault import SampleVault, read_text
+
+class StageSourceFileTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.source_path = os.path.join(self.temp_dir.name, "source", "page.md")
+        self.dest_path = os.path.join(self.temp_dir.name, "dest", "page.md")
+        os.makedirs(os.path.dirname(self.source_path))
+        with open(self.source_path, "w", encoding="utf-8") as f:
+            f.write("source\n")
+
+    def test_skip_unchanged_reads_unchanged_source_without_copying(self):
+        source_hash = hash_file(self.source_path)
+        self.assertEqual(stage_source_file(self.source_path, self.dest_path, "skip-unchanged",
+                                           source_hash, source_hash), self.source_path)
+        self.assertFalse(os.path.exists(self.dest_path))
+
+    def test_skip_unchanged_copies_changed_or_unrecorded_source(self):
+        for previous_source_hash in ("other hash", None):
+            with self.subTest(previous_source_hash=previous_source_hash):
+                with open(self.source_path, "w", encoding="utf-8") as f:
+                    f.write(f"source after {previous_source_hash}\n")
+                # Older than any destination, as after a checkout or a restore from backup.
+                os.utime(self.source_path, ns=(1, 1))
+                read_path = stage_source_file(self.source_path, self.dest_path, "skip-unchanged",
+                                              hash_file(self.source_path), previous_source_hash)
+                self.assertEqual(read_path, self.dest_path)
+                self.assertEqual(read_text(self.dest_path), read_text(self.source_path))
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            stage_source_file(self.source_path, self.dest_path, "move")
+
+class CopyStrategyBuildTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def build(self, name: str, **options) -> SampleVault:
+        vault = SampleVault(os.path.join(self.temp_dir.name, name))
+        vault.run(full_rebuild=True, **options)
+        return vault
+
+    def test_edit_with_older_mtime_is_not_lost(self):
+        for strategy in COPY_STRATEGIES:
+            with self.subTest(strategy=strategy):
+                vault = self.build(strategy, copy_strategy=strategy)
+                alice_path = os.path.join(vault.source_dir, "alice.md")
+                with open(alice_path, "a", encoding="utf-8") as f:
+                    f.write("\nAn edit restored from a backup.\n")
+                os.utime(alice_path, ns=(1, 1))
+                vault.run(copy_strategy=strategy)
+                self.assertIn("An edit restored from a backup.",
+                              read_text(os.path.join(vault.destination_dir, "alice.md")))
+
+    def test_pages_are_rendered_from_source_not_previous_output(self):
+        # A TTL change re-renders every page while the notes stay unchanged. The result
+        # must equal a cold build; rendering the previous output would keep stale links.
+        for strategy in COPY_STRATEGIES:
+            with self.subTest(strategy=strategy):
+                vault = self.build(strategy, copy_strategy=strategy)
+                with open(os.path.join(vault.ttl_dir, "people.ttl"), "a", encoding="utf-8") as f:
+                    f.write("\nex:carol ex:knows ex:alice .\n")
+                vault.run(copy_strategy=strategy)
+                cold_vault = SampleVault(os.path.join(self.temp_dir.name, f"{strategy}_cold"))
+                with open(os.path.join(cold_vault.ttl_dir, "people.ttl"), "a", encoding="utf-8") as f:
+                    f.write("\nex:carol ex:knows ex:alice .\n")
+                cold_vault.run(full_rebuild=True, copy_strategy=strategy)
+                self.assertEqual(vault.read_outputs(), cold_vault.read_outputs())
+
+if __name__ == "__main__":
+    unittest.main()
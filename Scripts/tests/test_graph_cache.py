@@ -0,0 +1,106 @@
+"""
+Tests for the parsed-graph cache: entries are keyed on each TTL file's path,
+size, mtime and content, stale or unreadable entries are ignored, and only
+changed files are parsed again.
+
+Run from the Scripts directory:
+    python -m unittest discover -s tests
+"""
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+from processing_for_quartz.rdf import graph_cache
+from processing_for_quartz.rdf.graph_cache import (ttl_cache_keys, read_cache_entry, write_cache_entry,
+                                                   graph_cache_key, read_graph_entry, write_graph_entry,
+                                                   load_parsed_ttl_files, build_graph_from_parsed_files)
+
+TTL_A = "@prefix ex: <http://example.org/> .\nex:a ex:knows ex:b .\n"
+TTL_B = "@prefix ex: <http://example.org/> .\nex:b ex:knows ex:c .\n"
+
+class GraphCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.cache_dir = os.path.join(self.temp_dir.name, "cache")
+        self.ttl_a = self.write_ttl("a.ttl", TTL_A)
+        self.ttl_b = self.write_ttl("b.ttl", TTL_B)
+
+    def write_ttl(self, name: str, content: str) -> str:
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def load(self, ttl_files: list) -> tuple[dict, str]:
+        output = io.StringIO()
+        with redirect_stdout(output):
+            loaded = load_parsed_ttl_files(ttl_files, self.cache_dir)
+        return loaded, output.getvalue()
+
+    def test_cache_key_follows_content_with_same_size_and_mtime(self):
+        key_before = ttl_cache_keys([self.ttl_a])[self.ttl_a]
+        file_stat = os.stat(self.ttl_a)
+        self.write_ttl("a.ttl", TTL_A.replace("ex:b", "ex:z"))
+        os.utime(self.ttl_a, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns))
+        key_after = ttl_cache_keys([self.ttl_a])[self.ttl_a]
+        self.assertEqual(os.stat(self.ttl_a).st_size, file_stat.st_size)
+        self.assertNotEqual(key_before, key_after)
+
+    def test_stale_entry_is_rejected(self):
+        cache_key = ttl_cache_keys([self.ttl_a])[self.ttl_a]
+        write_cache_entry(self.cache_dir, self.ttl_a, cache_key, ["triple"], [("ex", "http://example.org/")])
+        self.assertEqual(read_cache_entry(self.cache_dir, self.ttl_a, cache_key),
+                         (["triple"], [("ex", "http://example.org/")]))
+        self.assertIsNone(read_cache_entry(self.cache_dir, self.ttl_a, cache_key[:-1] + ("other hash",)))
+        self.assertIsNone(read_cache_entry(self.cache_dir, self.ttl_b, ttl_cache_keys([self.ttl_b])[self.ttl_b]))
+
+    def test_unreadable_entry_is_ignored(self):
+        cache_key = ttl_cache_keys([self.ttl_a])[self.ttl_a]
+        write_cache_entry(self.cache_dir, self.ttl_a, cache_key, [], [])
+        entry_path, = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)]
+        with open(entry_path, "wb") as f:
+            f.write(b"not a pickle")
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertIsNone(read_cache_entry(self.cache_dir, self.ttl_a, cache_key))
+        self.assertIn("Ignoring unreadable cache entry", output.getvalue())
+
+    def test_only_changed_files_are_parsed_again(self):
+        first, output = self.load([self.ttl_a, self.ttl_b])
+        self.assertIn("Loaded 0 TTL files from cache, parsed 2.", output)
+        with mock.patch.object(graph_cache, "parse_ttl_file", side_effect=AssertionError("parsed again")):
+            second, output = self.load([self.ttl_a, self.ttl_b])
+        self.assertIn("Loaded 2 TTL files from cache, parsed 0.", output)
+        self.assertEqual(second, first)
+
+        self.write_ttl("b.ttl", TTL_B + "ex:c ex:knows ex:d .\n")
+        third, output = self.load([self.ttl_a, self.ttl_b])
+        self.assertIn("Loaded 1 TTL files from cache, parsed 1.", output)
+        self.assertEqual(len(build_graph_from_parsed_files([self.ttl_a, self.ttl_b], third)), 3)
+
+    def test_unreadable_file_is_reported_and_skipped(self):
+        missing = os.path.join(self.temp_dir.name, "missing.ttl")
+        output = io.StringIO()
+        with redirect_stdout(output):
+            cache_keys = ttl_cache_keys([self.ttl_a, missing])
+        self.assertEqual(list(cache_keys), [self.ttl_a])
+        self.assertIn(f"Skipping {missing}, which could not be read", output.getvalue())
+        self.assertNotIn("Error parsing", output.getvalue())
+
+    def test_graph_entries_follow_every_file(self):
+        cache_keys = ttl_cache_keys([self.ttl_a, self.ttl_b])
+        graph_key = graph_cache_key([self.ttl_a, self.ttl_b], cache_keys)
+        self.assertNotEqual(graph_key, graph_cache_key([self.ttl_b, self.ttl_a], cache_keys))
+        write_graph_entry(self.cache_dir, "catalogue", graph_key, {"value": 1})
+        self.assertEqual(read_graph_entry(self.cache_dir, "catalogue", graph_key), {"value": 1})
+
+        self.write_ttl("b.ttl", TTL_B + "ex:c ex:knows ex:d .\n")
+        changed_key = graph_cache_key([self.ttl_a, self.ttl_b], ttl_cache_keys([self.ttl_a, self.ttl_b]))
+        self.assertNotEqual(changed_key, graph_key)
+        self.assertIsNone(read_graph_entry(self.cache_dir, "catalogue", changed_key))
+
+if __name__ == "__main__":
+    unittest.main()
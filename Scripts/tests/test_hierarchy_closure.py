@@ -0,0 +1,158 @@
+"""
+Tests for the hierarchy closure: after any sequence of edge additions and
+removals, including cycles, every node's ancestors, descendants and depth must
+match a breadth-first search over the current edges, and a watch session must
+read the class depths a full run computes.
+
+Run from the Scripts directory:
+    python -m unittest discover -s tests
+"""
+import io
+import os
+import random
+import tempfile
+import unittest
+from collections import deque
+from contextlib import redirect_stdout
+from rdflib import Graph, URIRef, Literal
+from rdflib.namespace import RDFS, SKOS
+from processing_for_quartz.rdf.hierarchy_closure import TransitiveClosure, HierarchyClosureIndex
+from processing_for_quartz.rdf.rdf_helpers import get_subclass_depth, compute_subclass_depths
+from processing_for_quartz.page_renderer import GENERIC_ROOT_CLASSES
+from processing_for_quartz.watch import WatchSession
+from sample_vault import SampleVault
+
+EX = "http://example.org/"
+
+def node(index: int) -> URIRef:
+    return URIRef(f"{EX}class{index}")
+
+def walk(edges: set, start, forward: bool = True) -> dict:
+    """Breadth-first search from 'start' over (child, parent) edges; returns {node: shortest distance}."""
+    neighbours = {}
+    for child, parent in edges:
+        if forward:
+            neighbours.setdefault(child, set()).add(parent)
+        else:
+            neighbours.setdefault(parent, set()).add(child)
+    distances = {}
+    queue = deque([(start, 0)])
+    while queue:
+        current, distance = queue.popleft()
+        for neighbour in neighbours.get(current, ()):
+            if neighbour not in distances:
+                distances[neighbour] = distance + 1
+                queue.append((neighbour, distance + 1))
+    return distances
+
+def subclass_graph(edges) -> Graph:
+    graph = Graph()
+    for child, parent in edges:
+        graph.add((child, RDFS.subClassOf, parent))
+    return graph
+
+class TransitiveClosureTest(unittest.TestCase):
+    def assertMatchesSearch(self, closure: TransitiveClosure, edges: set, nodes, root_nodes: set):
+        graph = subclass_graph(edges)
+        for current in nodes:
+            self.assertEqual(closure.ancestors(current), walk(edges, current), current)
+            self.assertEqual(closure.descendants(current), walk(edges, current, forward=False), current)
+            self.assertEqual(closure.depth(current, root_nodes), get_subclass_depth(current, graph, root_nodes), current)
+
+    def test_cycle(self):
+        edges = {(node(1), node(0)), (node(2), node(1)), (node(3), node(2)), (node(1), node(3))}
+        closure = TransitiveClosure(edges)
+        # Every node on the cycle is its own ancestor, at the length of the cycle.
+        for index in (1, 2, 3):
+            self.assertEqual(closure.ancestors(node(index))[node(index)], 3)
+        self.assertEqual(closure.ancestors(node(3)), {node(2): 1, node(1): 2, node(0): 3, node(3): 3})
+        self.assertEqual([closure.depth(node(index), {node(0)}) for index in range(4)], [0, 1, 2, 3])
+        self.assertEqual(closure.depth(node(2), {node(3)}), 2)
+
+        closure.remove_edge(node(1), node(3))
+        self.assertFalse(closure.is_ancestor(node(3), node(3)))
+        self.assertEqual(closure.descendants(node(3)), {})
+        self.assertMatchesSearch(closure, edges - {(node(1), node(3))}, [node(index) for index in range(4)], {node(0)})
+
+    def test_removal_keeps_other_paths(self):
+        # A diamond under the root, with a shortcut from the bottom to the root.
+        edges = {(node(1), node(0)), (node(2), node(0)), (node(3), node(1)), (node(3), node(2)),
+                 (node(4), node(3)), (node(4), node(0))}
+        closure = TransitiveClosure(edges)
+        self.assertEqual(closure.depth(node(4), {node(0)}), 1)
+        for removed in [(node(4), node(0)), (node(3), node(1)), (node(3), node(2))]:
+            edges.discard(removed)
+            closure.remove_edge(*removed)
+            self.assertMatchesSearch(closure, edges, [node(index) for index in range(5)], {node(0)})
+        self.assertEqual(closure.depth(node(4), {node(0)}), -1)
+        # Removing an edge that is not there, or adding one twice, changes nothing.
+        closure.remove_edge(node(4), node(0))
+        closure.add_edge(node(1), node(0))
+        self.assertMatchesSearch(closure, edges, [node(index) for index in range(5)], {node(0)})
+
+    def test_matches_search_after_random_changes(self):
+        rng = random.Random(24)
+        for _ in range(60):
+            node_count = rng.randint(2, 12)
+            nodes = [node(index) for index in range(node_count)]
+            root_nodes = set(rng.sample(nodes, rng.randint(1, 2)))
+            edges = {(rng.choice(nodes), rng.choice(nodes)) for _ in range(rng.randint(0, 2 * node_count))}
+            closure = TransitiveClosure(edges)
+            self.assertMatchesSearch(closure, edges, nodes, root_nodes)
+            for _ in range(15):
+                if edges and rng.random() < 0.4:
+                    edge = rng.choice(sorted(edges))
+                    edges.discard(edge)
+                    closure.remove_edge(*edge)
+                else:
+                    edge = (rng.choice(nodes), rng.choice(nodes))
+                    edges.add(edge)
+                    closure.add_edge(*edge)
+                self.assertMatchesSearch(closure, edges, nodes, root_nodes)
+            self.assertEqual(set(closure.closure_edges(include_asserted=True, include_reflexive=True)),
+                             {(current, ancestor) for current in nodes for ancestor in walk(edges, current)})
+
+class HierarchyClosureIndexTest(unittest.TestCase):
+    def test_follows_triples_of_hierarchy_predicates_only(self):
+        graph = Graph()
+        graph.add((node(1), SKOS.broader, node(0)))
+        graph.add((node(1), RDFS.subClassOf, Literal("not a class")))
+        graph.add((node(2), URIRef(EX + "partOf"), node(1)))
+        index = HierarchyClosureIndex(graph)
+        self.assertEqual(index[SKOS.broader].ancestors(node(1)), {node(0): 1})
+        self.assertEqual(index[RDFS.subClassOf].ancestors(node(1)), {})
+
+        index.add_triples([(node(2), SKOS.broader, node(1)), (node(3), URIRef(EX + "partOf"), node(2)),
+                           (node(1), RDFS.subClassOf, Literal("still not a class"))])
+        self.assertEqual(index[SKOS.broader].ancestors(node(2)), {node(1): 1, node(0): 2})
+        self.assertEqual(index[SKOS.broader].ancestors(node(3)), {})
+        # skos:broader is not transitive, so its whole closure is published as skos:broaderTransitive.
+        self.assertEqual(set(index.triples()), {(node(1), SKOS.broaderTransitive, node(0)),
+                                                (node(2), SKOS.broaderTransitive, node(1)),
+                                                (node(2), SKOS.broaderTransitive, node(0))})
+
+        index.remove_triples([(node(1), SKOS.broader, node(0))])
+        self.assertEqual(index[SKOS.broader].ancestors(node(2)), {node(1): 1})
+
+class WatchSessionClosureTest(unittest.TestCase):
+    def test_class_depths_follow_ttl_changes(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            vault = SampleVault(os.path.join(temp_dir, "watched"))
+            session = vault.pipeline(WatchSession)
+            ttl_file = os.path.join(vault.ttl_dir, "extra.ttl")
+            with redirect_stdout(io.StringIO()):
+                session.run()
+                for ttl in ("<http://example.org/people/alice> <http://www.w3.org/2000/01/rdf-schema#subClassOf> "
+                            "<http://example.org/people/Person> .\n", ""):
+                    with open(ttl_file, "w", encoding="utf-8") as f:
+                        f.write(ttl)
+                    session.apply_changes({os.path.abspath(ttl_file)})
+                    context = session.render_context
+                    depths = compute_subclass_depths(session.graph, GENERIC_ROOT_CLASSES)
+                    for entity in set(session.graph.subjects()) | set(session.graph.objects()):
+                        self.assertEqual(get_subclass_depth(entity, context.graph, GENERIC_ROOT_CLASSES,
+                                                            context.subclass_closure), depths.get(entity, -1))
+            self.assertIs(context.subclass_closure, session.hierarchy_closure[RDFS.subClassOf])
+
+if __name__ == "__main__":
+    unittest.main()
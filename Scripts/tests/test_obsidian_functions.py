@@ -0,0 +1,79 @@
+"""
+Tests for the standalone obsidian_functions helpers, which share the frontmatter
+codec with processing_for_quartz through shared_functions and must not need the
+pipeline package.
+
+Run from the Scripts directory:
+    python -m unittest discover -s tests
+"""
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from shared_functions.frontmatter_codec import parse_frontmatter
+from obsidian_functions.func_create_markdown_files_from_list import create_markdown_files_from_list
+from obsidian_functions.func_normalize_rename_update_aliases import normalize_rename_update_aliases
+from sample_vault import read_text
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class ObsidianFunctionsTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.output_dir = os.path.join(self.temp_dir.name, "notes")
+
+    def test_helpers_do_not_import_the_pipeline(self):
+        code = ("import sys, obsidian_functions.func_create_markdown_files_from_list, "
+                "obsidian_functions.func_normalize_rename_update_aliases, rdf_functions.func_combine_ttls_to_graph; "
+                "print(sorted(m for m in sys.modules if m.startswith('processing_for_quartz')))")
+        result = subprocess.run([sys.executable, "-c", code], cwd=SCRIPTS_DIR, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "[]")
+
+    def test_create_markdown_files_from_list(self):
+        with redirect_stdout(io.StringIO()):
+            create_markdown_files_from_list(["Pay_rate", "Café menu", "!!!"], self.output_dir)
+        self.assertEqual(sorted(os.listdir(self.output_dir)), ["caf__menu.md", "pay_rate.md", "untitled_document_3.md"])
+        self.assertEqual(read_text(os.path.join(self.output_dir, "caf__menu.md")), "---\ntitle: Café Menu\n---\n")
+
+    def test_normalize_rename_update_aliases(self):
+        os.makedirs(self.output_dir)
+        with open(os.path.join(self.output_dir, "Pay Rate.md"), "w", encoding="utf-8") as f:
+            f.write("---\naliases: Rate\n---\nBody text.\n")
+        with redirect_stdout(io.StringIO()):
+            normalize_rename_update_aliases(self.output_dir)
+        self.assertEqual(os.listdir(self.output_dir), ["pay_rate.md"])
+        metadata, body = parse_frontmatter(read_text(os.path.join(self.output_dir, "pay_rate.md")))
+        self.assertEqual(metadata, {"aliases": ["Rate", "Pay Rate"]})
+        self.assertEqual(body, "Body text.\n")
+
+    @unittest.skipIf(pd is None, "pandas is not installed")
+    def test_df_to_md_files(self):
+        from obsidian_functions.func_df_to_md_files import df_to_md_files
+        df = pd.DataFrame({
+            "name": ["Pay rate", "Café (menu)", "???"],
+            "broader": ["Compensation", None, "Other"],
+            "related": [["Salary", "Wage"], None, None],
+            "count": [3, 4, 5],
+            "body": ["Pay rate text.", float("nan"), "Ignored."],
+        })
+        with redirect_stdout(io.StringIO()):
+            df_to_md_files(df, self.output_dir, "name", ["broader", "related", "count"], main_content_col="body")
+        # '???' cleans to an empty name and is skipped.
+        self.assertEqual(sorted(os.listdir(self.output_dir)), ["Caf_menu.md", "Pay_rate.md"])
+        self.assertEqual(read_text(os.path.join(self.output_dir, "Pay_rate.md")),
+                         "---\nbroader:\n- '[[Compensation]]'\nrelated:\n- '[[Salary]]'\n- '[[Wage]]'\ncount: 3\n---\n"
+                         "\n# Pay rate\n\nPay rate text.")
+        self.assertEqual(read_text(os.path.join(self.output_dir, "Caf_menu.md")),
+                         "---\ncount: 4\n---\n\n# Café (menu)\n\n")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Tests that a cached PredicateCatalogue is classified by the current rules: only
+the graph-derived fields go into the graph cache, and the predicate sets are
+computed again when an entry is read.
+
+Run from the Scripts directory:
+    python -m unittest discover -s tests
+"""
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+from rdflib import Graph
+from processing_for_quartz.rdf.parse_graph import PredicateCatalogue, load_predicate_catalogue
+
+GRAPH_TTL = """
+@prefix ex: <http://example.org/> .
+@prefix owl: <http://www.w3.org/2002/07/owl#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+
+ex:hasAge a owl:DatatypeProperty ; rdfs:label "age" .
+ex:employs owl:inverseOf ex:employedBy .
+ex:alice ex:employs ex:bob ; ex:hasAge 42 ; ex:knows ex:carol .
+"""
+
+class PredicateCatalogueCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = Graph()
+        self.graph.parse(data=GRAPH_TTL, format="turtle")
+
+    def test_pickle_holds_only_graph_derived_fields(self):
+        catalogue = PredicateCatalogue(self.graph)
+        self.assertEqual(set(catalogue.__getstate__()), set(PredicateCatalogue.GRAPH_DERIVED_FIELDS))
+        restored = pickle.loads(pickle.dumps(catalogue))
+        self.assertEqual(restored.predicate_sets, catalogue.predicate_sets)
+
+    def test_cached_catalogue_is_reclassified(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = load_predicate_catalogue(self.graph, cache_dir, "graph-key")
+            self.assertIn("knows", first.predicate_sets[0])
+            # A rule change between runs must reach catalogues already in the cache.
+            original_classify = PredicateCatalogue._classify
+            def classify_without_knows(catalogue):
+                predicate_sets = original_classify(catalogue)
+                predicate_sets[0].discard("knows")
+                return predicate_sets
+            with mock.patch.object(PredicateCatalogue, "_classify", classify_without_knows), \
+                 mock.patch.object(PredicateCatalogue, "__init__", side_effect=AssertionError("cache missed")):
+                cached = load_predicate_catalogue(self.graph, cache_dir, "graph-key")
+            self.assertNotIn("knows", cached.predicate_sets[0])
+            self.assertEqual(cached.predicate_counts, first.predicate_counts)
+
+if __name__ == "__main__":
+    unittest.main()
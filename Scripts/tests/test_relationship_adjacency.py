@@ -0,0 +1,48 @@
+"""
+Tests for RelationshipAdjacency: the relationship predicates come from the
+predicate catalogue rather than a scan of the graph, and each row is sorted by
+predicate label, then neighbour URI.
+
+Run from the Scripts directory:
+    python -m unittest discover -s tests
+"""
+import os
+import unittest
+from unittest import mock
+from rdflib import Graph, URIRef
+from processing_for_quartz.rdf.parse_graph import PredicateCatalogue
+from processing_for_quartz.mermaid.relationship_adjacency import RelationshipAdjacency
+from sample_vault import SAMPLE_VAULT_DIR
+
+EX = "http://example.org/people/"
+
+class RelationshipAdjacencyTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = Graph()
+        self.graph.parse(os.path.join(SAMPLE_VAULT_DIR, "ttl", "people.ttl"), format="turtle")
+        self.catalogue = PredicateCatalogue(self.graph)
+        RELATIONSHIP_PREDICATES, METADATA_PREDICATES, _, RELATIONSHIP_PREDICATES_LOWER, METADATA_PREDICATES_LOWER, _ = \
+            self.catalogue.predicate_sets
+        with mock.patch.object(self.graph, "predicates", side_effect=AssertionError("graph scanned for predicates")):
+            self.adjacency = RelationshipAdjacency(self.graph, self.catalogue, RELATIONSHIP_PREDICATES,
+                                                   METADATA_PREDICATES, RELATIONSHIP_PREDICATES_LOWER,
+                                                   METADATA_PREDICATES_LOWER)
+
+    def edges(self, name: str, direction: str) -> list[tuple[str, str]]:
+        node = self.adjacency.lookup(EX + name)
+        edges = self.adjacency.forward_edges(node) if direction == "forward" else self.adjacency.inverse_edges(node)
+        return [(self.adjacency.node_strs[other_node], predicate_label) for other_node, predicate_label in edges]
+
+    def test_rows_are_sorted(self):
+        self.assertEqual(self.edges("alice", "forward"), [(EX + "bob", "knows"), (EX + "carol", "worksWith")])
+        self.assertEqual(self.edges("carol", "inverse"), [(EX + "bob", "knows"), (EX + "alice", "worksWith")])
+
+    def test_only_relationship_predicates(self):
+        # rdf:type, rdfs:label, owl:inverseOf and the literal property birthDate are not edges.
+        self.assertEqual(sorted(self.adjacency.predicate_labels), ["knows", "subClassOf", "worksWith"])
+        self.assertEqual(self.adjacency.edge_count(), 4)
+        self.assertEqual(self.edges("Person", "forward"), [("https://schema.org/Thing", "subClassOf")])
+        self.assertIsNone(self.adjacency.lookup(EX + "knows"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Tests for the build-scoped caches used while rendering: eviction and hit/miss
+counting of the neighbourhood cache and the URI term table, size validation,
+and the hit/miss counting of the Mermaid node cache.
+
+Run from the Scripts directory:
+    python -m unittest discover -s tests
+"""
+import os
+import unittest
+from rdflib import Graph, URIRef
+from processing_for_quartz.rdf.parse_graph import PredicateCatalogue
+from processing_for_quartz.rdf.rdf_helpers import UriTermTable
+from processing_for_quartz.mermaid.relationship_adjacency import RelationshipAdjacency
+from processing_for_quartz.mermaid.node_cache import MermaidNodeCache
+from processing_for_quartz.mermaid.neighbourhood_cache import NeighbourhoodCache
+from sample_vault import SAMPLE_VAULT_DIR
+
+EX = "http://example.org/people/"
+
+class RenderCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.graph = Graph()
+        self.graph.parse(os.path.join(SAMPLE_VAULT_DIR, "ttl", "people.ttl"), format="turtle")
+        catalogue = PredicateCatalogue(self.graph)
+        RELATIONSHIP_PREDICATES, METADATA_PREDICATES, LITERAL_PROPERTIES_FOR_NODE_DISPLAY, \
+        RELATIONSHIP_PREDICATES_LOWER, METADATA_PREDICATES_LOWER, _ = catalogue.predicate_sets
+        self.adjacency = RelationshipAdjacency(self.graph, catalogue, RELATIONSHIP_PREDICATES, METADATA_PREDICATES,
+                                               RELATIONSHIP_PREDICATES_LOWER, METADATA_PREDICATES_LOWER)
+        self.node_cache = MermaidNodeCache(self.graph, RELATIONSHIP_PREDICATES, METADATA_PREDICATES,
+                                           LITERAL_PROPERTIES_FOR_NODE_DISPLAY)
+
+    def node(self, name: str) -> int:
+        return self.adjacency.lookup(EX + name)
+
+class NeighbourhoodCacheTest(RenderCacheTestCase):
+    def test_least_recently_used_hop_is_evicted(self):
+        cache = NeighbourhoodCache(self.adjacency, self.node_cache, max_size=2)
+        alice_hop = cache.get_hop(self.node("alice"), False)
+        cache.get_hop(self.node("bob"), False)
+        self.assertIs(cache.get_hop(self.node("alice"), False), alice_hop)
+        self.assertEqual(cache.stats(), (1, 2))
+        # bob is now the least recently used and makes room for carol.
+        cache.get_hop(self.node("carol"), False)
+        self.assertEqual(len(cache), 2)
+        self.assertIs(cache.get_hop(self.node("alice"), False), alice_hop)
+        cache.get_hop(self.node("bob"), False)
+        self.assertEqual(cache.stats(), (2, 4))
+
+    def test_skip_inverse_is_part_of_the_key(self):
+        cache = NeighbourhoodCache(self.adjacency, self.node_cache)
+        carol = self.node("carol")
+        self.assertEqual([(is_forward, uri, label) for is_forward, uri, label, _ in cache.get_hop(carol, False)],
+                         [(False, EX + "bob", "knows"), (False, EX + "alice", "worksWith")])
+        self.assertEqual(cache.get_hop(carol, True), [])
+        self.assertEqual(cache.stats(), (0, 2))
+
+    def test_unbounded_cache_keeps_every_hop(self):
+        cache = NeighbourhoodCache(self.adjacency, self.node_cache, max_size=None)
+        for _ in range(2):
+            for node in range(len(self.adjacency)):
+                cache.get_hop(node, False)
+        self.assertEqual(len(cache), len(self.adjacency))
+        self.assertEqual(cache.stats(), (len(self.adjacency), len(self.adjacency)))
+
+    def test_sizes_below_one_are_rejected(self):
+        for max_size in (0, -1):
+            with self.subTest(max_size=max_size), self.assertRaises(ValueError):
+                NeighbourhoodCache(self.adjacency, self.node_cache, max_size=max_size)
+
+class MermaidNodeCacheTest(RenderCacheTestCase):
+    def test_hits_and_misses(self):
+        alice = URIRef(EX + "alice")
+        self.assertEqual(self.node_cache.get_labels(alice), ("Alice", "Alice"))
+        self.node_cache.get_labels(alice)
+        properties = self.node_cache.get_properties(str(alice))
+        self.assertIn("birthDate: 1970-01-01", properties)
+        self.assertEqual(self.node_cache.get_properties(str(alice)), properties)
+        self.assertEqual(self.node_cache.stats(), (2, 2))
+
+class UriTermTableTest(unittest.TestCase):
+    def test_least_recently_used_term_is_evicted(self):
+        table = UriTermTable(max_size=2)
+        self.assertEqual(table.get(EX + "alice"), ("alice", "alice", "alice"))
+        table.get(EX + "Big-Hub")
+        table.get(EX + "alice")
+        table.get(EX + "carol")
+        self.assertEqual(len(table), 2)
+        self.assertEqual(list(table._terms), [EX + "alice", EX + "carol"])
+        self.assertEqual(table.get(EX + "Big-Hub"), ("Big-Hub", "big-hub", "big_hub"))
+
+    def test_sizes(self):
+        table = UriTermTable(max_size=None)
+        for index in range(100):
+            table.get(f"{EX}term{index}")
+        self.assertEqual(len(table), 100)
+        for max_size in (0, -1):
+            with self.subTest(max_size=max_size), self.assertRaises(ValueError):
+                UriTermTable(max_size=max_size)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+"""
+Tests that compute_subclass_depths, one breadth-first search from the root
+classes, gives every entity the depth get_subclass_depth finds for it alone.
+
+Run from the Scripts directory:
+    python -m unittest discover -s tests
+"""
+import random
+import unittest
+from rdflib import Graph, URIRef
+from rdflib.namespace import RDFS
+from processing_for_quartz.rdf.rdf_helpers import get_subclass_depth, compute_subclass_depths
+
+EX = "http://example.org/"
+
+def node(index: int) -> URIRef:
+    return URIRef(f"{EX}class{index}")
+
+class SubclassDepthsTest(unittest.TestCase):
+    def test_chain_with_cycle_and_unreachable_class(self):
+        graph = Graph()
+        for sub_class, super_class in [(1, 0), (2, 1), (3, 2), (2, 3), (5, 4)]:
+            graph.add((node(sub_class), RDFS.subClassOf, node(super_class)))
+        depths = compute_subclass_depths(graph, {node(0)})
+        self.assertEqual([depths.get(node(index), -1) for index in range(6)], [0, 1, 2, 3, -1, -1])
+
+    def test_matches_per_entity_search_on_random_graphs(self):
+        rng = random.Random(8)
+        for _ in range(50):
+            graph = Graph()
+            node_count = rng.randint(1, 30)
+            for _ in range(rng.randint(0, 3 * node_count)):
+                graph.add((node(rng.randrange(node_count)), RDFS.subClassOf, node(rng.randrange(node_count))))
+            root_classes = {node(index) for index in rng.sample(range(node_count), rng.randint(1, min(3, node_count)))}
+            depths = compute_subclass_depths(graph, root_classes)
+            for index in range(node_count):
+                self.assertEqual(depths.get(node(index), -1), get_subclass_depth(node(index), graph, root_classes))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+"""
+Tests for the watch mode: the polling watcher's snapshot diff, the event
+collector's filtering and debounce, the --poll option, and a WatchSession
+applying a TTL change against a fresh full run.
+
+Run from the Scripts directory:
+    python -m unittest discover -s tests
+"""
+import io
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+from types import SimpleNamespace
+from rdflib import URIRef
+from processing_for_quartz.watch import PollingWatcher, WatchSession, _ChangeCollector
+from processing_for_quartz.rdf.graph_cache import load_parsed_ttl_files
+from processing_for_quartz.main import parse_args
+from sample_vault import SampleVault
+
+def write_text(path: str, text: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def file_event(event_type: str, src_path: str, dest_path: str = "", is_directory: bool = False):
+    return SimpleNamespace(event_type=event_type, src_path=src_path, dest_path=dest_path, is_directory=is_directory)
+
+class PollingWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.source_dir = os.path.join(self.temp_dir.name, "notes")
+        self.ttl_dir = os.path.join(self.temp_dir.name, "ttl")
+        write_text(os.path.join(self.source_dir, "kept.md"), "kept\n")
+        write_text(os.path.join(self.source_dir, "edited.md"), "before\n")
+        write_text(os.path.join(self.source_dir, "deleted.md"), "deleted\n")
+        write_text(os.path.join(self.ttl_dir, "graph.ttl"), "")
+        self.watcher = PollingWatcher({self.source_dir: ".md", self.ttl_dir: ".ttl"}, interval=0.01)
+        self.watcher.start()
+
+    def test_reports_added_removed_and_modified_files(self):
+        edited = os.path.join(self.source_dir, "edited.md")
+        write_text(edited, "after, and longer\n")
+        os.remove(os.path.join(self.source_dir, "deleted.md"))
+        write_text(os.path.join(self.source_dir, "sub", "added.md"), "added\n")
+        write_text(os.path.join(self.ttl_dir, "graph.ttl"), "<a:x> <a:y> <a:z> .\n")
+        # Files without the watched suffix of their folder are not watched.
+        write_text(os.path.join(self.source_dir, "image.png"), "png")
+        write_text(os.path.join(self.ttl_dir, "notes.md"), "md")
+
+        self.assertEqual(self.watcher.wait_for_changes(1.0), {
+            edited,
+            os.path.join(self.source_dir, "deleted.md"),
+            os.path.join(self.source_dir, "sub", "added.md"),
+            os.path.join(self.ttl_dir, "graph.ttl"),
+        })
+        # The snapshot moved on, so the same changes are not reported twice.
+        self.assertEqual(self.watcher.wait_for_changes(0.05), set())
+
+    def test_same_size_edit_is_found_by_mtime(self):
+        edited = os.path.join(self.source_dir, "edited.md")
+        stat = os.stat(edited)
+        write_text(edited, "BEFORE\n")
+        os.utime(edited, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertEqual(self.watcher.wait_for_changes(1.0), {edited})
+
+    def test_returns_empty_set_after_timeout(self):
+        start = time.monotonic()
+        self.assertEqual(self.watcher.wait_for_changes(0.05), set())
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+class ChangeCollectorTest(unittest.TestCase):
+    def setUp(self):
+        self.source_dir = os.path.abspath(os.path.join(os.sep, "vault", "notes"))
+        self.ttl_dir = os.path.abspath(os.path.join(os.sep, "vault", "ttl"))
+        self.collector = _ChangeCollector({self.source_dir: ".md", self.ttl_dir: ".ttl"})
+
+    def test_keeps_content_changes_of_watched_files(self):
+        note = os.path.join(self.source_dir, "note.md")
+        renamed = os.path.join(self.source_dir, "renamed.md")
+        for event in (file_event("opened", note), file_event("closed", note),
+                      file_event("modified", self.source_dir, is_directory=True),
+                      file_event("modified", os.path.join(self.source_dir, "note.ttl")),
+                      file_event("modified", os.path.join(os.sep, "elsewhere", "note.md"))):
+            self.collector.on_any_event(event)
+        self.assertFalse(self.collector.changed.is_set())
+
+        self.collector.on_any_event(file_event("moved", note, renamed))
+        self.collector.on_any_event(file_event("deleted", os.path.join(self.ttl_dir, "graph.ttl")))
+        self.assertEqual(self.collector.wait_for_changes(0.1, 0.01),
+                         {note, renamed, os.path.join(self.ttl_dir, "graph.ttl")})
+
+    def test_waits_until_events_stop(self):
+        paths = [os.path.join(self.source_dir, f"note_{i}.md") for i in range(8)]
+
+        def save_in_steps():
+            for path in paths:
+                self.collector.on_any_event(file_event("modified", path))
+                time.sleep(0.02)
+
+        saver = threading.Thread(target=save_in_steps)
+        saver.start()
+        self.addCleanup(saver.join)
+        # No gap between events reaches the debounce delay, so every save comes back in one call.
+        self.assertEqual(self.collector.wait_for_changes(5.0, 0.1), set(paths))
+        self.assertFalse(saver.is_alive())
+        self.assertEqual(self.collector.wait_for_changes(0.01, 0.1), set())
+
+class PollOptionTest(unittest.TestCase):
+    def test_poll_requires_watch(self):
+        with redirect_stderr(io.StringIO()) as stderr, self.assertRaises(SystemExit):
+            parse_args(["--poll", "2"])
+        self.assertIn("--poll requires --watch", stderr.getvalue())
+        self.assertEqual(parse_args(["--watch", "--poll", "2"]).poll, 2.0)
+
+class WatchSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.vault = SampleVault(os.path.join(self.temp_dir.name, "watched"))
+        self.session = self.vault.pipeline(WatchSession)
+        with redirect_stdout(io.StringIO()):
+            self.session.run()
+        self.ttl_file = os.path.join(self.vault.ttl_dir, "people.ttl")
+
+    def apply_changes(self, *paths) -> bool:
+        with redirect_stdout(io.StringIO()):
+            return self.session.apply_changes({os.path.abspath(path) for path in paths})
+
+    def test_keeps_only_the_triple_sets(self):
+        self.assertEqual(set(self.session.ttl_triple_sets), {self.ttl_file})
+        self.assertFalse(hasattr(self.session, "parsed_ttl_files"))
+
+    def test_ttl_change_matches_a_full_run(self):
+        with open(self.ttl_file, "r", encoding="utf-8") as f:
+            ttl = f.read()
+        # Bob no longer knows Carol; a second file asserts a triple the first one also has.
+        write_text(self.ttl_file, ttl.replace("    rdfs:label \"Bob\" ;\n    ex:knows ex:carol .",
+                                              "    rdfs:label \"Bob\" ."))
+        extra_file = os.path.join(self.vault.ttl_dir, "extra.ttl")
+        write_text(extra_file, "<http://example.org/people/alice> <http://example.org/people/knows> "
+                               "<http://example.org/people/bob> .\n")
+        self.assertTrue(self.apply_changes(self.ttl_file, extra_file))
+
+        knows = URIRef("http://example.org/people/knows")
+        alice, bob, carol = (URIRef(f"http://example.org/people/{name}") for name in ("alice", "bob", "carol"))
+        self.assertNotIn((bob, knows, carol), self.session.graph)
+        parsed = load_parsed_ttl_files([self.ttl_file, extra_file], self.vault.graph_cache_dir)
+        self.assertEqual(self.session.ttl_triple_sets, {ttl_file: set(triples) for ttl_file, (triples, _) in parsed.items()})
+
+        # Removing the shared triple from one file keeps it in the graph while the other still asserts it.
+        os.remove(extra_file)
+        self.apply_changes(extra_file)
+        self.assertIn((alice, knows, bob), self.session.graph)
+
+        fresh = SampleVault(os.path.join(self.temp_dir.name, "fresh"))
+        shutil.copyfile(self.ttl_file, os.path.join(fresh.ttl_dir, "people.ttl"))
+        fresh.run()
+        self.assertEqual(self.vault.read_outputs(), fresh.read_outputs())
+
+if __name__ == "__main__":
+    unittest.main()
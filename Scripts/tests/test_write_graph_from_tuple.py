@@ -0,0 +1,84 @@
+"""
+Round-trip tests for write_graph_from_tuple: the N-Triples and Turtle files it
+writes must parse back into the graph build_graph_from_tuple builds from the
+same data, including URIs whose local part cannot be a prefixed name.
+
+Run from the Scripts directory:
+    python -m unittest discover -s tests
+"""
+import os
+import tempfile
+import unittest
+from rdflib import Graph, URIRef, Literal
+from rdflib.namespace import SKOS
+from rdf_functions.func_build_graph_from_tuple import build_graph_from_tuple, write_graph_from_tuple
+
+GC = "http://example.org/gc/"
+GCT = "http://example.org/gc/terms/"
+CONFIG = {
+    "main_namespace": {"": GC},
+    "namespaces": {"gc": GC, "gct": GCT, "skos": str(SKOS)},
+    "title": "Sample thesaurus",
+    "default_lang": "en",
+}
+
+def concept(pref_label: str, relationships: list, alt_labels: list = ()) -> dict:
+    return {"type": [SKOS.Concept], "prefLabel": {"en": pref_label},
+            "altLabel": list(alt_labels), "relationships": relationships}
+
+# Local parts a prefixed name cannot have (a trailing '.', brackets, a leading
+# '-'), next to ones it can (inner dots, percent escapes).
+CANADA = URIRef(GCT + "canada.")
+US = URIRef(GCT + "u.s.")
+BRACKETS = URIRef(GC + "b(c)")
+DASH = URIRef(GCT + "-leading-dash")
+PERCENT = URIRef(GCT + "caf%C3%A9")
+PLAIN = URIRef(GCT + "bargaining_agent")
+DOTTED = URIRef(GCT + "u.s.a")
+CONCEPTS_DATA = {
+    CANADA: concept("Canada.", [(SKOS.related, US), (SKOS.broader, BRACKETS)], ["CA"]),
+    US: concept("U.S.", [(SKOS.related, CANADA), (SKOS.related, CANADA)]),
+    BRACKETS: concept("b (c)", [(SKOS.narrower, CANADA), (URIRef(GC + "see(also)"), PLAIN)]),
+    DASH: concept("Leading dash", [(SKOS.related, PERCENT)]),
+    PERCENT: concept("Café", [(SKOS.related, DOTTED)]),
+    PLAIN: concept('Bargaining "agent"\nname', [(SKOS.related, DASH)]),
+    DOTTED: concept("U.S.A", []),
+}
+SUBJECT_CATEGORIES = {"plain"}
+TERMS_TO_URI = {"plain": PLAIN}
+
+class WriteGraphFromTupleRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.expected = set(build_graph_from_tuple(CONCEPTS_DATA, CONFIG, SUBJECT_CATEGORIES, TERMS_TO_URI))
+
+    def round_trip(self, rdf_format: str) -> tuple[Graph, str]:
+        with tempfile.TemporaryDirectory() as output_dir:
+            output_path = os.path.join(output_dir, f"thesaurus.{rdf_format}")
+            triple_count = write_graph_from_tuple(CONCEPTS_DATA, CONFIG, SUBJECT_CATEGORIES, TERMS_TO_URI,
+                                                  output_path, rdf_format=rdf_format)
+            with open(output_path, encoding="utf-8") as f:
+                text = f.read()
+            graph = Graph()
+            graph.parse(output_path, format=rdf_format)
+        self.assertEqual(triple_count, len(self.expected))
+        return graph, text
+
+    def test_ntriples_round_trip(self):
+        graph, _ = self.round_trip("nt")
+        self.assertEqual(set(graph), self.expected)
+
+    def test_turtle_round_trip(self):
+        graph, text = self.round_trip("turtle")
+        self.assertEqual(set(graph), self.expected)
+        self.assertIn("<http://example.org/gc/terms/canada.>", text)
+        self.assertIn("<http://example.org/gc/b(c)>", text)
+        self.assertIn("gct:bargaining_agent", text)
+        self.assertIn("gct:u.s.a", text)
+        self.assertIn("gct:caf%C3%A9", text)
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            write_graph_from_tuple(CONCEPTS_DATA, CONFIG, SUBJECT_CATEGORIES, TERMS_TO_URI, os.devnull, rdf_format="xml")
+
+if __name__ == "__main__":
+    unittest.main()
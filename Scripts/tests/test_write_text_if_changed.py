@@ -0,0 +1,69 @@
+"""
+Tests that unchanged pages are not rewritten: write_text_if_changed leaves files
+with the same content alone, and a rebuild with the default copy strategy
+writes no page whose content did not change.
+
+Run from the Scripts directory:
+    python -m unittest discover -s tests
+"""
+import os
+import stat
+import tempfile
+import unittest
+from processing_for_quartz.config import COPY_STRATEGY
+from processing_for_quartz.markdown.read_write_clean_md import write_text_if_changed, NEW_FILE_MODE
+from sample_vault import SampleVault
+
+def page_mtimes(directory: str) -> dict:
+    return {os.path.join(root, name): os.stat(os.path.join(root, name)).st_mtime_ns
+            for root, _, names in os.walk(directory) for name in names}
+
+class WriteTextIfChangedTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = os.path.join(self.temp_dir.name, "page.md")
+
+    def test_new_file_mode(self):
+        self.assertTrue(write_text_if_changed(self.path, "text\n"))
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), NEW_FILE_MODE)
+
+    def test_replaced_file_keeps_its_mode(self):
+        write_text_if_changed(self.path, "text\n")
+        os.chmod(self.path, 0o600)
+        self.assertTrue(write_text_if_changed(self.path, "other text\n"))
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+    def test_unchanged_content_is_not_written(self):
+        write_text_if_changed(self.path, "text\n")
+        os.utime(self.path, ns=(1, 1))
+        self.assertFalse(write_text_if_changed(self.path, "text\n"))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 1)
+        self.assertEqual(os.listdir(self.temp_dir.name), ["page.md"])
+
+class RebuildWritesTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.vault = SampleVault(self.temp_dir.name)
+
+    def test_full_rebuild_with_default_strategy_rewrites_nothing(self):
+        self.assertEqual(COPY_STRATEGY, "direct")
+        self.vault.run(full_rebuild=True)
+        outputs = self.vault.read_outputs()
+        for path in page_mtimes(self.vault.destination_dir):
+            os.utime(path, ns=(1, 1))
+        output = self.vault.run(full_rebuild=True)
+        self.assertIn("Wrote 0 pages, skipped 4 with unchanged content.", output)
+        self.assertEqual(set(page_mtimes(self.vault.destination_dir).values()), {1})
+        self.assertEqual(self.vault.read_outputs(), outputs)
+
+    def test_default_strategy_matches_copy(self):
+        self.vault.run(full_rebuild=True, copy_strategy="copy")
+        copied_outputs = self.vault.read_outputs()
+        other_vault = SampleVault(os.path.join(self.temp_dir.name, "direct"))
+        other_vault.run(full_rebuild=True)
+        self.assertEqual(other_vault.read_outputs(), copied_outputs)
+
+if __name__ == "__main__":
+    unittest.main()